@@ -0,0 +1,2 @@
+"""Benchmarks for Puggle. Run each one from the root of the repository,
+e.g. ``python -m benchmarks.parallel_load``."""
@@ -0,0 +1,71 @@
+"""Benchmark whole-Dataset operations on Document objects and on the
+columnar backend.
+
+Usage: python -m benchmarks.columnar_ops [n_docs]
+"""
+import random
+import sys
+import time
+
+from puggle import Dataset, Document
+from puggle.utils import build_annotation
+from benchmarks.synthetic import make_spert_document
+
+OPERATIONS = [
+    ("get_entity_label_counts", []),
+    ("get_unique_tokens_count", []),
+    ("convert_entity_class", ["Item", "Thing"]),
+    ("flatten_all_entities", []),
+    ("drop_entity_class", ["Activity"]),
+    ("drop_relation_class", ["Cause"]),
+]
+
+
+def main(n_docs: int = 100000):
+    """Time each operation on the same synthetic Dataset stored as objects
+    and as arrays, and print the memory used by each.
+
+    Args:
+        n_docs (int, optional): The number of documents in the Dataset.
+    """
+    rng = random.Random(0)
+    datasets = {}
+    for backend in ["objects", "columnar"]:
+        d = Dataset()
+        d._add_documents(
+            [
+                Document(
+                    None, build_annotation(make_spert_document(rng), "spert")
+                )
+                for _ in range(n_docs)
+            ]
+        )
+        if backend == "columnar":
+            start = time.perf_counter()
+            d.to_columnar()
+            print(f"to_columnar: {time.perf_counter() - start:.2f}s")
+        datasets[backend] = d
+
+    for backend, d in datasets.items():
+        usage = d.memory_usage()
+        print(
+            f"{backend:9} {usage['total'] / 1024**2:8.1f} MB "
+            f"({usage['per_document']:.0f} bytes/doc, "
+            f"{usage['per_mention']:.0f} bytes/mention)"
+        )
+
+    for name, args in OPERATIONS:
+        times = {}
+        for backend, d in datasets.items():
+            start = time.perf_counter()
+            getattr(d, name)(*args)
+            times[backend] = time.perf_counter() - start
+        print(
+            f"{name:24} objects {times['objects']:6.3f}s  "
+            f"columnar {times['columnar']:6.3f}s  "
+            f"({times['objects'] / times['columnar']:.1f}x)"
+        )
+
+
+if __name__ == "__main__":
+    main(*[int(a) for a in sys.argv[1:]])
@@ -0,0 +1,86 @@
+"""Benchmark building and querying the inverted index of a Dataset, and
+querying and manipulating a Dataset with and without an index.
+
+Usage: python -m benchmarks.inverted_index [n_docs]
+"""
+import random
+import sys
+import time
+
+from puggle import Dataset, Document
+from puggle.utils import build_annotation
+from benchmarks.synthetic import make_spert_document
+
+LOOKUPS = [
+    ("documents_with_token", ["word42"]),
+    ("documents_with_entity", ["Item"]),
+    ("documents_with_relation", ["Cause"]),
+    ("documents_with_triple", ["Activity", "Cause", "Item"]),
+]
+
+QUERIES = [
+    {"triples": [("Activity", "Cause", "Item")], "tokens": ["word42"]},
+    {"entities": ["Item", "Activity"], "min_length": 30},
+]
+
+OPERATIONS = [
+    ("convert_entity_class", ["Item", "Thing"]),
+    ("drop_entity_class", ["Activity"]),
+    ("drop_relation_class", ["Cause"]),
+]
+
+
+def main(n_docs: int = 100000):
+    """Time building the index of a synthetic Dataset, each lookup, and each
+    query and manipulation with and without the index.
+
+    Args:
+        n_docs (int, optional): The number of documents in the Dataset.
+    """
+    rng = random.Random(0)
+    records = [make_spert_document(rng) for _ in range(n_docs)]
+    datasets = {}
+    for name in ["no index", "index"]:
+        d = Dataset()
+        d._add_documents(
+            [Document(None, build_annotation(r, "spert")) for r in records]
+        )
+        datasets[name] = d
+
+    start = time.perf_counter()
+    index = datasets["index"].build_index()
+    print(f"build_index: {time.perf_counter() - start:.2f}s ({index})")
+
+    for name, args in LOOKUPS:
+        n = 1000
+        start = time.perf_counter()
+        for _ in range(n):
+            ids = getattr(index, name)(*args)
+        elapsed = (time.perf_counter() - start) / n
+        print(f"{name:24} {elapsed * 1e6:6.2f}us ({len(ids)} documents)")
+
+    for criteria in QUERIES:
+        times = {}
+        for backend, d in datasets.items():
+            start = time.perf_counter()
+            ids = d.query(**criteria)
+            times[backend] = time.perf_counter() - start
+        print(
+            f"query {len(ids):6} documents: no index "
+            f"{times['no index']:6.3f}s  index {times['index']:6.3f}s"
+        )
+
+    for name, args in OPERATIONS:
+        times = {}
+        for backend, d in datasets.items():
+            start = time.perf_counter()
+            getattr(d, name)(*args)
+            times[backend] = time.perf_counter() - start
+        print(
+            f"{name:24} no index {times['no index']:6.3f}s  "
+            f"index {times['index']:6.3f}s"
+        )
+
+
+if __name__ == "__main__":
+    main(*[int(a) for a in sys.argv[1:]])
@@ -0,0 +1,45 @@
+"""Benchmark loading a synthetic corpus with different numbers of workers.
+
+Usage: python -m benchmarks.parallel_load [n_docs]
+"""
+import os
+import sys
+import tempfile
+import time
+
+from puggle import Dataset
+from benchmarks.synthetic import write_spert_corpus
+
+
+def main(n_docs: int = 100000):
+    """Time load_documents on a synthetic corpus for 1, 2, 4, ... workers
+    (up to the number of available cores) and print the speedup of each.
+
+    Args:
+        n_docs (int, optional): The number of documents in the corpus.
+    """
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        for ext in ["json", "jsonl"]:
+            filename = os.path.join(tmp_dir, f"corpus.{ext}")
+            write_spert_corpus(filename, n_docs)
+
+            workers = 1
+            baseline = None
+            while workers <= (os.cpu_count() or 1):
+                d = Dataset()
+                start = time.perf_counter()
+                d.load_documents(
+                    anns_filename=filename, anns_format="spert", workers=workers
+                )
+                elapsed = time.perf_counter() - start
+                baseline = baseline or elapsed
+                print(
+                    f"{ext:5} workers={workers:<3} {elapsed:7.2f}s "
+                    f"({n_docs / elapsed:9.0f} docs/s, "
+                    f"speedup {baseline / elapsed:.2f}x)"
+                )
+                workers *= 2
+
+
+if __name__ == "__main__":
+    main(*[int(a) for a in sys.argv[1:]])
@@ -0,0 +1,112 @@
+"""Benchmark a long cleanup recipe of manipulations, applied one after
+another and as a single Pipeline, on Document objects and on the columnar
+backend. Also times remapping entity labels with a table of rules, compared
+with converting each label in turn.
+
+Usage: python -m benchmarks.pipeline [n_docs] [n_steps]
+"""
+import random
+import sys
+import time
+
+from puggle import Dataset, Document, Pipeline
+from puggle.utils import build_annotation
+from benchmarks.synthetic import (
+    ENTITY_LABELS,
+    RELATION_LABELS,
+    make_spert_document,
+)
+
+
+def make_recipe(rng: random.Random, n_steps: int) -> Pipeline:
+    """Make a random recipe of manipulations, most of which rename labels
+    back and forth (as in an ontology migration).
+
+    Args:
+        rng (random.Random): The random number generator to use.
+        n_steps (int): The number of manipulations.
+
+    Returns:
+        Pipeline: The recipe.
+    """
+    entity_labels = ENTITY_LABELS + ["Thing", "Event"]
+    relation_labels = RELATION_LABELS + ["partOf"]
+    pipeline = Pipeline()
+    for _ in range(n_steps - 3):
+        if rng.random() < 0.7:
+            pipeline.convert_entity_class(*rng.sample(entity_labels, 2))
+        else:
+            pipeline.convert_relation_class(*rng.sample(relation_labels, 2))
+    pipeline.flatten_all_entities()
+    pipeline.drop_entity_class(rng.choice(entity_labels))
+    pipeline.drop_relation_class(rng.choice(relation_labels))
+    return pipeline
+
+
+def main(n_docs: int = 20000, n_steps: int = 30):
+    """Time the recipe applied step by step and as a Pipeline, on the same
+    synthetic Dataset, and check that the results are identical.
+
+    Args:
+        n_docs (int, optional): The number of documents in the Dataset.
+        n_steps (int, optional): The number of manipulations.
+    """
+    rng = random.Random(0)
+    docs = [
+        Document(None, build_annotation(make_spert_document(rng), "spert"))
+        for _ in range(n_docs)
+    ]
+    pipeline = make_recipe(rng, n_steps)
+
+    for backend in ["objects", "columnar"]:
+        results = {}
+        times = {}
+        for mode in ["step by step", "pipeline"]:
+            d = Dataset()
+            d._add_documents([doc.copy() for doc in docs])
+            if backend == "columnar":
+                d.to_columnar()
+            start = time.perf_counter()
+            if mode == "pipeline":
+                d.apply_pipeline(pipeline)
+            else:
+                for name, args in pipeline.steps:
+                    getattr(d, name)(*args)
+            times[mode] = time.perf_counter() - start
+            results[mode] = d.to_list()
+        assert results["step by step"] == results["pipeline"]
+        print(
+            f"{backend:9} {n_steps} steps: "
+            f"step by step {times['step by step']:6.3f}s  "
+            f"pipeline {times['pipeline']:6.3f}s  "
+            f"({times['step by step'] / times['pipeline']:.1f}x)"
+        )
+
+    # A migration table with a rule for every label (most of which do not
+    # occur in the Dataset)
+    mapping = {f"Label{i}": f"New{i}" for i in range(300)}
+    mapping.update({label: f"New/{label}" for label in ENTITY_LABELS})
+    results = {}
+    times = {}
+    for mode in ["convert", "remap"]:
+        d = Dataset()
+        d._add_documents([doc.copy() for doc in docs])
+        start = time.perf_counter()
+        if mode == "remap":
+            d.remap_entity_labels(mapping)
+        else:
+            for old, new in mapping.items():
+                d.convert_entity_class(old, new)
+        times[mode] = time.perf_counter() - start
+        results[mode] = d.to_list()
+    assert results["convert"] == results["remap"]
+    print(
+        f"{len(mapping)} label rules: "
+        f"convert_entity_class {times['convert']:6.3f}s  "
+        f"remap_entity_labels {times['remap']:6.3f}s  "
+        f"({times['convert'] / times['remap']:.1f}x)"
+    )
+
+
+if __name__ == "__main__":
+    main(*[int(a) for a in sys.argv[1:]])
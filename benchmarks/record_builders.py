@@ -0,0 +1,52 @@
+"""Benchmark building Annotations from SPERT records, comparing normalising
+each record and then calling Annotation.from_dict with building each
+Annotation directly from the record.
+
+Usage: python -m benchmarks.record_builders [n_docs]
+"""
+import json
+import random
+import sys
+import time
+
+from puggle import Annotation
+from puggle.utils import build_annotation, normalise_annotation_format
+from benchmarks.synthetic import make_spert_document
+
+
+def main(n_docs: int = 100000):
+    """Time both ways of building Annotations from the same records and
+    print the per-document cost of each.
+
+    Args:
+        n_docs (int, optional): The number of documents to build.
+    """
+    rng = random.Random(0)
+    lines = [json.dumps(make_spert_document(rng)) for _ in range(n_docs)]
+
+    def normalise_then_from_dict(doc):
+        return Annotation.from_dict(normalise_annotation_format(doc, "spert"))
+
+    results = {}
+    for name, build in [
+        ("json.loads only", lambda doc: doc),
+        ("normalise + from_dict", normalise_then_from_dict),
+        ("build_annotation", lambda doc: build_annotation(doc, "spert")),
+    ]:
+        # The records are decoded each time, as normalising modifies them
+        start = time.perf_counter()
+        for line in lines:
+            build(json.loads(line))
+        results[name] = time.perf_counter() - start
+
+    decode = results.pop("json.loads only")
+    print(f"{'json.loads only':22} {decode / n_docs * 1e6:7.2f} us/doc")
+    for name, elapsed in results.items():
+        print(
+            f"{name:22} {(elapsed - decode) / n_docs * 1e6:7.2f} us/doc "
+            "(excluding json.loads)"
+        )
+
+
+if __name__ == "__main__":
+    main(*[int(a) for a in sys.argv[1:]])
@@ -0,0 +1,142 @@
+"""Benchmark Document.split_sentences on long documents with many sentences,
+comparing it with the previous implementation, which checked every mention
+and relation against each sentence.
+
+Also times Dataset.split_sentences with 1, 2, 4, ... workers (up to the
+number of available cores).
+
+Usage: python -m benchmarks.sentence_splitting [n_docs] [n_tokens]
+"""
+import os
+import random
+import sys
+import time
+
+from puggle import Annotation, Dataset, Document
+from puggle.size_limits import Limits
+from puggle.utils import build_annotation
+from benchmarks.synthetic import make_spert_document
+
+
+def split_sentences_quadratic(doc: Document, delimiter: str):
+    """The previous implementation of Document.split_sentences, which takes
+    time proportional to the number of sentences times the number of
+    mentions and relations.
+
+    Args:
+        doc (Document): The Document to split.
+        delimiter (str): The delimiter to use.
+
+    Returns:
+        Tuple[List[Document], List[Relation]]: See
+           :func:`puggle.Document.Document.split_sentences`.
+    """
+    tokens = doc.annotation.tokens
+    new_docs = []
+    sent_tokens = []
+    sent_start_idx = 0
+    seen_rels = set()
+    for i, token in enumerate(tokens):
+        if token != delimiter:
+            sent_tokens.append(token)
+        if token == delimiter or i == len(tokens) - 1:
+            sent_end_idx = i + 1 if i == len(tokens) - 1 else i
+            sent_mentions = []
+            sent_mention_ids = {}
+            for m in doc.annotation.mentions:
+                if m.start < sent_start_idx or m.end > sent_end_idx:
+                    continue
+                m_dict = m.to_dict()
+                m_dict["start"] -= sent_start_idx
+                m_dict["end"] -= sent_start_idx
+                sent_mentions.append(m_dict)
+                sent_mention_ids[m] = len(sent_mentions) - 1
+            sent_relations = []
+            for r in doc.annotation.relations:
+                if not (
+                    sent_start_idx <= r.start.start <= sent_end_idx
+                    and sent_start_idx <= r.end.start <= sent_end_idx
+                ):
+                    continue
+                seen_rels.add(r)
+                r_dict = r.to_dict()
+                r_dict["start"] = sent_mention_ids[r.start]
+                r_dict["end"] = sent_mention_ids[r.end]
+                sent_relations.append(r_dict)
+            new_docs.append(
+                Document(
+                    doc.fields,
+                    Annotation(sent_tokens, sent_mentions, sent_relations),
+                )
+            )
+            sent_tokens = []
+            sent_start_idx = i + 1
+    removed = [r for r in doc.annotation.relations if r not in seen_rels]
+    return new_docs, removed
+
+
+def main(n_docs: int = 20, n_tokens: int = 20000):
+    """Time both implementations on the same long documents (with a
+    sentence every ten tokens) and check that their outputs are identical.
+
+    Args:
+        n_docs (int, optional): The number of documents.
+        n_tokens (int, optional): The number of tokens in each document.
+    """
+    rng = random.Random(0)
+    limits = Limits(max_sent_length=n_tokens)
+    docs = [
+        Document(
+            None,
+            build_annotation(
+                make_spert_document(rng, n_tokens, delimiter="."),
+                "spert",
+                limits,
+            ),
+        )
+        for _ in range(n_docs)
+    ]
+    n_mentions = sum(len(d.annotation.mentions) for d in docs)
+    print(
+        f"{n_docs} documents of {n_tokens} tokens "
+        f"(~{n_tokens // 10} sentences, "
+        f"{n_mentions // n_docs} mentions each)"
+    )
+
+    results = {}
+    for name, split in [
+        ("quadratic", split_sentences_quadratic),
+        ("sweep", Document.split_sentences),
+    ]:
+        start = time.perf_counter()
+        results[name] = [split(d, ".") for d in docs]
+        elapsed = time.perf_counter() - start
+        print(f"{name:9} {elapsed / n_docs * 1e3:9.2f} ms/doc")
+
+    for (old_docs, old_removed), (new_docs, new_removed) in zip(
+        results["quadratic"], results["sweep"]
+    ):
+        assert [d.to_dict() for d in old_docs] == [
+            d.to_dict() for d in new_docs
+        ]
+        assert old_removed == new_removed
+    print("Outputs are identical.")
+
+    d = Dataset()
+    d._add_documents(docs)
+    workers = 1
+    baseline = None
+    while workers <= (os.cpu_count() or 1):
+        start = time.perf_counter()
+        d.split_sentences(delimiter=".", workers=workers)
+        elapsed = time.perf_counter() - start
+        baseline = baseline or elapsed
+        print(
+            f"Dataset.split_sentences workers={workers:<3} {elapsed:7.2f}s "
+            f"(speedup {baseline / elapsed:.2f}x)"
+        )
+        workers *= 2
+
+
+if __name__ == "__main__":
+    main(*[int(a) for a in sys.argv[1:]])
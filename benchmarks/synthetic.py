@@ -0,0 +1,70 @@
+"""Generate synthetic annotated corpora for benchmarking."""
+import json
+import random
+
+VOCAB = [f"word{i}" for i in range(5000)]
+ENTITY_LABELS = ["Item", "Activity", "Observation", "State/desirable"]
+RELATION_LABELS = ["hasParticipant", "hasPart", "Cause"]
+
+
+def make_spert_document(
+    rng: random.Random, n_tokens: int = 30, delimiter: str = None
+) -> dict:
+    """Generate one random SPERT-formatted document.
+
+    Args:
+        rng (random.Random): The random number generator to use.
+        n_tokens (int, optional): The number of tokens in the document.
+        delimiter (str, optional): If set, roughly one in ten tokens will be
+           this delimiter (i.e. the document will contain many sentences).
+
+    Returns:
+        dict: The document.
+    """
+    tokens = [rng.choice(VOCAB) for _ in range(n_tokens)]
+    if delimiter is not None:
+        for i in range(9, n_tokens, 10):
+            tokens[i] = delimiter
+
+    entities = []
+    for start in range(0, n_tokens - 2, 3):
+        if tokens[start] == delimiter or tokens[start + 1] == delimiter:
+            continue
+        entities.append(
+            {
+                "start": start,
+                "end": start + rng.randint(1, 2),
+                "type": rng.choice(ENTITY_LABELS),
+            }
+        )
+
+    relations = []
+    for i in range(len(entities) - 1):
+        if rng.random() < 0.5:
+            relations.append(
+                {"head": i, "tail": i + 1, "type": rng.choice(RELATION_LABELS)}
+            )
+    return {"tokens": tokens, "entities": entities, "relations": relations}
+
+
+def write_spert_corpus(
+    filename: str, n_docs: int, n_tokens: int = 30, seed: int = 123
+):
+    """Write a random SPERT-formatted corpus to the given file. If the
+    filename ends in .jsonl, it is written in JSON Lines format.
+
+    Args:
+        filename (str): The file to write to.
+        n_docs (int): The number of documents.
+        n_tokens (int, optional): The number of tokens in each document.
+        seed (int, optional): The random seed.
+    """
+    rng = random.Random(seed)
+    with open(filename, "w", encoding="utf-8") as f:
+        if filename.endswith(".jsonl"):
+            for _ in range(n_docs):
+                f.write(json.dumps(make_spert_document(rng, n_tokens)) + "\n")
+        else:
+            json.dump(
+                [make_spert_document(rng, n_tokens) for _ in range(n_docs)], f
+            )
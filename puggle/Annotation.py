@@ -1,11 +1,12 @@
 """A class that stores the annotations of a Document."""
 
-from typing import List, Dict
+from bisect import bisect_left, bisect_right
+from typing import Iterable, List, Dict, Tuple
 
 from .Mention import Mention
 from .Relation import Relation
 
-from .size_limits import MAX_SENT_LENGTH, MAX_WORD_LENGTH
+from .size_limits import LimitError, Limits
 
 import logging as logger
 
@@ -16,11 +17,29 @@ class Annotation:
     a list of relations.
 
     :var tokens: A list of tokens (strings).
+    :var token_ids: The ids of the tokens in the
+       :class:`puggle.vocabulary.Vocabulary` of the Dataset that this
+       Annotation was added to (or None).
     :var mentions: A list of :class:`puggle.Mention.Mention` objects.
     :var relations: A list of :class:`puggle.Relation.Relation` objects.
 
+    Indexes of the mentions and relations (used by e.g.
+    :func:`mentions_in_span` and :func:`relations_from`) are built when they
+    are first needed, and cleared whenever `mentions` or `relations` is
+    assigned. If the mentions or relations are changed in place instead
+    (e.g. by appending to them or changing their labels), call
+    :func:`clear_indexes`.
     """
 
+    __slots__ = (
+        "_tokens",
+        "token_ids",
+        "_mentions",
+        "_relations",
+        "_mention_ids_map",
+        "_indexes",
+    )
+
     def __init__(
         self,
         tokens: list[str],
@@ -39,13 +58,139 @@ class Annotation:
                ('start', 'end', 'type').
         """
         super().__init__()
-        self.tokens = tokens
-        self._mention_ids_map = {}
-        self.mentions = self._parse_mentions(mentions, tokens)
-        if relations:
-            self.relations = self._parse_relations(relations)
-        else:
-            self.relations = []
+        self._set_parts(
+            tokens,
+            ((m["start"], m["end"], m["label"]) for m in mentions),
+            ((r["start"], r["end"], r["type"]) for r in relations or ()),
+        )
+
+    @property
+    def tokens(self) -> List[str]:
+        """The tokens of this Annotation. Changing the tokens clears the
+        token_ids (see :class:`puggle.vocabulary.Vocabulary`).
+        """
+        return self._tokens
+
+    @tokens.setter
+    def tokens(self, tokens: List[str]):
+        self._tokens = tokens
+        self.token_ids = None
+
+    @property
+    def mentions(self) -> List[Mention]:
+        """The mentions of this Annotation."""
+        return self._mentions
+
+    @mentions.setter
+    def mentions(self, mentions: List[Mention]):
+        self._mentions = mentions
+        self._indexes = None
+
+    @property
+    def relations(self) -> List[Relation]:
+        """The relations of this Annotation."""
+        return self._relations
+
+    @relations.setter
+    def relations(self, relations: List[Relation]):
+        self._relations = relations
+        self._indexes = None
+
+    def clear_indexes(self):
+        """Clear the indexes of the mentions and relations of this
+        Annotation, so that they are rebuilt when next needed. Only
+        necessary after changing the mentions or relations in place.
+        """
+        self._indexes = None
+
+    def mentions_in_span(self, start: int, end: int) -> List[Mention]:
+        """Return the mentions that lie entirely within the given span of
+        tokens.
+
+        Args:
+            start (int): The index of the first token of the span.
+            end (int): The index after the last token of the span.
+
+        Returns:
+            List[Mention]: The mentions, in the order of `mentions`.
+        """
+        starts, positions = self._index("mention_starts")
+        candidates = positions[
+            bisect_left(starts, start) : bisect_right(starts, end)
+        ]
+        return [m for _, m in sorted(candidates) if m.end <= end]
+
+    def mentions_with_label(self, label: str) -> List[Mention]:
+        """Return the mentions with the given label.
+
+        Args:
+            label (str): The label.
+
+        Returns:
+            List[Mention]: The mentions, in the order of `mentions`.
+        """
+        return list(self._index("mention_labels").get(label, ()))
+
+    def relations_in_span(self, start: int, end: int) -> List[Relation]:
+        """Return the relations whose head and tail mentions both start
+        within the given span of tokens (inclusive of `end`).
+
+        Args:
+            start (int): The index of the first token of the span.
+            end (int): The index after the last token of the span.
+
+        Returns:
+            List[Relation]: The relations, in the order of `relations`.
+        """
+        starts, positions = self._index("relation_starts")
+        candidates = positions[
+            bisect_left(starts, start) : bisect_right(starts, end)
+        ]
+        return [
+            r for _, r in sorted(candidates) if start <= r.end.start <= end
+        ]
+
+    def relations_from(self, mention: Mention) -> List[Relation]:
+        """Return the relations whose head is the given mention (i.e. its
+        outgoing relations).
+
+        Args:
+            mention (Mention): The mention.
+
+        Returns:
+            List[Relation]: The relations, in the order of `relations`.
+        """
+        return list(self._index("outgoing").get(mention, ()))
+
+    def relations_to(self, mention: Mention) -> List[Relation]:
+        """Return the relations whose tail is the given mention (i.e. its
+        incoming relations).
+
+        Args:
+            mention (Mention): The mention.
+
+        Returns:
+            List[Relation]: The relations, in the order of `relations`.
+        """
+        return list(self._index("incoming").get(mention, ()))
+
+    def _index(self, name: str):
+        """Return the given index of this Annotation, building it if it has
+        not been built since the mentions or relations were last assigned.
+
+        Args:
+            name (str): The name of the index (see _INDEX_BUILDERS).
+
+        Returns:
+            The index.
+        """
+        indexes = self._indexes
+        if indexes is None:
+            indexes = self._indexes = {}
+        index = indexes.get(name)
+        if index is None:
+            index = indexes[name] = _INDEX_BUILDERS[name](self)
+        return index
 
     def to_dict(self):
         """Return a dictionary representation of this Annotation.
@@ -60,98 +205,193 @@ class Annotation:
             "relations": [r.to_dict() for r in self.relations],
         }
 
-    def _parse_mentions(self, mentions: List[Dict], tokens: List[Dict]):
-        """Parse a list of mentions (which should each be stored as a dict).
+    def _set_parts(
+        self,
+        tokens: List[str],
+        mentions: Iterable[Tuple[int, int, str]],
+        relations: Iterable[Tuple[int, int, str]],
+    ):
+        """Set the tokens, mentions and relations of this Annotation.
         Ignore duplicate mentions i.e. mentions with the same start,
         end, and label.
-        Each dict must have the format
-           {"start": <int>, "end": <int>, "labels": List[str],
-            "tokens": List[str]}
 
         Args:
-            mentions (list): A list of dicts where each dict
-              corresponds to a mention. Each dict must have 'start', 'end'
-              and 'labels' keys.
-            tokens (list): A list of tokens (i.e. the sentence).
-
-        Returns:
-            list: A list of Mention objects.
+            tokens (List[str]): A list of tokens (i.e. the sentence).
+            mentions (Iterable[Tuple[int, int, str]]): The (start, end,
+               label) of each mention.
+            relations (Iterable[Tuple[int, int, str]]): The (start, end,
+               label) of each relation, where start and end are the indexes
+               of the mentions (in the order given) that the relation links.
         """
-        seen_mentions = set()
-        mentions_list = []
+        self.tokens = tokens
 
         # Maintain a mapping from the mention id (in the original data)
         # to the id of the mention in the list of parsed Mentions,
         # so that relations can be correctly created.
-        self._mention_ids_map = {}
+        mention_ids_map = self._mention_ids_map = {}
+        seen_mentions = set()
+        mentions_list = self.mentions = []
+        try:
+            for i, (start, end, label) in enumerate(mentions):
+                m_obj = Mention(start, end, None, label, i, sentence=tokens)
+                mention_ids_map[i] = m_obj
+                key = (start, end, label)
+                if key not in seen_mentions:
+                    seen_mentions.add(key)
+                    mentions_list.append(m_obj)
+        except KeyError:
+            raise KeyError(
+                "Could not parse document due to "
+                "missing keys. The 'mentions' must have 'start', 'end', "
+                "and 'label'."
+            )
 
-        for i, m in enumerate(mentions):
+        relations_list = self.relations = []
+        for start, end, label in relations:
             try:
-                m_obj = Mention(
-                    m["start"],
-                    m["end"],
-                    tokens[m["start"] : m["end"]],
-                    m["label"],
-                    i,
+                r_obj = Relation(
+                    mention_ids_map[start], mention_ids_map[end], label
                 )
-                self._mention_ids_map[i] = m_obj
             except KeyError:
                 raise KeyError(
-                    "Could not parse document due to "
-                    "missing keys. The 'mentions' must have 'start', 'end', "
-                    "and 'label'."
+                    f"Could not parse relations of document "
+                    "because the mention corresponding to the relation with "
+                    f"start: {start} and end: {end} was not found."
+                )
+            except ValueError as e:
+                raise ValueError(
+                    f"Could not parse relations of document "
+                    f"due to the following error:\n{e}"
                 )
+            relations_list.append(r_obj)
 
-            if str(m_obj) not in seen_mentions:
-                mentions_list.append(m_obj)
-            seen_mentions.add(str(m_obj))
+    @staticmethod
+    def _validate_tokens(tokens: List[str], limits: Limits = None):
+        """Validate things such as max word length, sent length, etc,
+        in a single pass over the tokens.
 
-        return mentions_list
+        Args:
+            tokens (List[str]): The tokens.
+            limits (Limits, optional): The limits to validate against.
+               Defaults to the global limits of
+               :mod:`puggle.size_limits`.
+
+        Raises:
+            LimitError: If a word or the sentence is too long.
+        """
+        if limits is None:
+            limits = Limits()
+        max_word_length = limits.max_word_length
+        word = None
+        for t in tokens:
+            if len(t) > max_word_length:
+                word = t
+        if word is not None:
+            raise LimitError(
+                f"Word must be at most {max_word_length} characters "
+                f"long: {word}",
+                "max_word_length",
+            )
+        if len(tokens) > limits.max_sent_length:
+            raise LimitError(
+                f"Sentence must contain at most {limits.max_sent_length} "
+                "words.",
+                "max_sent_length",
+            )
 
-    def _parse_relations(self, relations: List[Dict]) -> List[Relation]:
-        """Parse a given list of relations (which each should be a dict)
-        and return a list of Relation objects.
+    @staticmethod
+    def from_spert(d: dict, limits: Limits = None):
+        """Create an Annotation directly from a SPERT-formatted dictionary,
+        without normalising it first (see
+        :func:`puggle.utils.normalise_annotation_format`). The dictionary is
+        not modified.
 
         Args:
-            relations (list): A list of relations. Each relation should
-               have the keys 'start', 'end', and 'type'.
+            d (dict): The dictionary. Must contain tokens, and optionally
+               entities and relations.
+            limits (Limits, optional): The limits to validate the tokens
+               against. Defaults to the global limits.
 
         Returns:
-            List[Relation]: The parsed list of Relations.
+            Annotation: An Annotation.
+
+        Raises:
+            ValueError: If the dictionary is missing the tokens, or the
+               tokens are too long.
         """
+        if "tokens" not in d:
+            raise ValueError(
+                "Dictionary must contain tokens, entities, and relations."
+            )
+        tokens = d["tokens"]
+        Annotation._validate_tokens(tokens, limits)
 
-        relations_list = []
-        _mention_ids_map = self._mention_ids_map
-        for r in relations:
-            start_key = "start"
-            end_key = "end"
-            try:
-                r_obj = Relation(
-                    _mention_ids_map[r[start_key]],
-                    _mention_ids_map[r[end_key]],
-                    r["type"],
-                )
-                relations_list.append(r_obj)
-            except KeyError as e:
-                raise KeyError(
-                    f"Could not parse relations of document "
-                    "because the mention corresponding to the relation with "
-                    f"start: {r['start']} and end: {r['end']} was not found."
-                )
-            except ValueError as e:
-                raise ValueError(
-                    f"Could not parse relations of document "
-                    f"due to the following error:\n{e}"
-                )
+        entities = d.get("entities", ())
+        relations = d.get("relations", ())
+
+        annotation = Annotation.__new__(Annotation)
+        annotation._set_parts(
+            tokens,
+            ((m["start"], m["end"], m["type"]) for m in entities),
+            ((r["head"], r["tail"], r["type"]) for r in relations),
+        )
+        return annotation
+
+    @staticmethod
+    def from_quickgraph(d: dict, limits: Limits = None):
+        """Create an Annotation directly from a QuickGraph-formatted
+        dictionary, without normalising it first (see
+        :func:`puggle.utils.normalise_annotation_format`). The dictionary is
+        not modified.
+
+        Args:
+            d (dict): The dictionary. Must contain tokens, and optionally
+               entities and relations.
+            limits (Limits, optional): The limits to validate the tokens
+               against. Defaults to the global limits.
 
-        return relations_list
+        Returns:
+            Annotation: An Annotation.
+
+        Raises:
+            ValueError: If the dictionary is missing the tokens, or the
+               tokens are too long.
+        """
+        if "tokens" not in d:
+            raise ValueError(
+                "Dictionary must contain tokens, entities, and relations."
+            )
+        tokens = d["tokens"]
+        Annotation._validate_tokens(tokens, limits)
+
+        entities = d.get("entities", ())
+        entity_idxs = {m["id"]: i for i, m in enumerate(entities)}
+
+        # QuickGraph's end indexes are the index of the last token of the
+        # mention, hence the + 1
+        annotation = Annotation.__new__(Annotation)
+        annotation._set_parts(
+            tokens,
+            ((m["start"], m["end"] + 1, m["label"]) for m in entities),
+            (
+                (
+                    entity_idxs[r["source_id"]],
+                    entity_idxs[r["target_id"]],
+                    r["label"],
+                )
+                for r in d.get("relations", ())
+            ),
+        )
+        return annotation
 
     @staticmethod
-    def from_dict(d: dict):
+    def from_dict(d: dict, limits: Limits = None):
         """Create an Annotation from a dictionary.
 
         Args:
             d (dict): The dictionary. Must contain tokens, mentions, relations.
+            limits (Limits, optional): The limits to validate the tokens
+               against. Defaults to the global limits.
 
         Returns:
             Annotation: An Annotation.
@@ -167,21 +407,7 @@ class Annotation:
                 "Dictionary must contain tokens, entities, and relations."
             )
 
-        # Validate things such as max word length, sent length, etc,
-        # before attempting to create Annotation object
-        if any(len(t) > MAX_WORD_LENGTH for t in d["tokens"]):
-            word = ""
-            for t in d["tokens"]:
-                if len(t) > MAX_WORD_LENGTH:
-                    word = t
-            raise ValueError(
-                f"Word must be at most {MAX_WORD_LENGTH} characters "
-                f"long: {word}"
-            )
-        if len(d["tokens"]) > MAX_SENT_LENGTH:
-            raise ValueError(
-                f"Sentence must contain at most {MAX_SENT_LENGTH} words."
-            )
+        Annotation._validate_tokens(d["tokens"], limits)
 
         annotation = Annotation(
             tokens=d["tokens"],
@@ -191,6 +417,124 @@ class Annotation:
 
         return annotation
 
+    @staticmethod
+    def from_tuples(
+        tokens: List[str],
+        mentions: Iterable[Tuple[int, int, str]],
+        relations: Iterable[Tuple[int, int, str]] = (),
+    ):
+        """Create an Annotation from the (start, end, label) of each of its
+        mentions and relations, without building a dictionary for each (e.g.
+        when deriving Annotations from another Annotation). The tokens are
+        not validated.
+
+        Args:
+            tokens (List[str]): The tokens.
+            mentions (Iterable[Tuple[int, int, str]]): The (start, end,
+               label) of each mention.
+            relations (Iterable[Tuple[int, int, str]], optional): The
+               (start, end, label) of each relation, where start and end are
+               the indexes of the mentions that the relation links.
+
+        Returns:
+            Annotation: An Annotation.
+        """
+        annotation = Annotation.__new__(Annotation)
+        annotation._set_parts(tokens, mentions, relations)
+        return annotation
+
+    def copy(self) -> "Annotation":
+        """Return a copy of this Annotation, with copies of its Mentions and
+        Relations, so that they can be changed without changing this
+        Annotation. The list of tokens (which is never changed in place) is
+        shared.
+
+        Returns:
+            Annotation: The copy.
+        """
+        tokens = self.tokens
+        copies = {}
+
+        def copy_mention(m: Mention) -> Mention:
+            c = copies.get(id(m))
+            if c is None:
+                if m.sentence is None:
+                    c = Mention(
+                        m.start, m.end, list(m.tokens), m.label, m.mention_id
+                    )
+                else:
+                    c = Mention(
+                        m.start, m.end, None, m.label, m.mention_id, tokens
+                    )
+                c.label_id = m.label_id
+                copies[id(m)] = c
+            return c
+
+        def copy_relation(r: Relation) -> Relation:
+            # Bypass __init__, as the labels of the mentions may have been
+            # changed since the relation was validated
+            c = Relation.__new__(Relation)
+            c.start = copy_mention(r.start)
+            c.end = copy_mention(r.end)
+            c.label = r.label
+            c.label_id = r.label_id
+            return c
+
+        annotation = Annotation.__new__(Annotation)
+        annotation.tokens = tokens
+        annotation.token_ids = self.token_ids
+        annotation._mention_ids_map = {
+            i: copy_mention(m) for i, m in self._mention_ids_map.items()
+        }
+        annotation.mentions = [copy_mention(m) for m in self.mentions]
+        annotation.relations = [copy_relation(r) for r in self.relations]
+        return annotation
+
+    def remove_duplicate_relations(self) -> int:
+        """Remove any relations that are equal to (i.e. have the same head,
+        tail and label as) an earlier relation.
+
+        Returns:
+            int: The number of relations removed.
+        """
+        relations = list(dict.fromkeys(self.relations))
+        n_removed = len(self.relations) - len(relations)
+        if n_removed:
+            self.relations = relations
+        return n_removed
+
+    def __reduce__(self):
+        """Pickle this Annotation as plain tuples rather than as a graph of
+        Mention and Relation objects, which is several times faster to send
+        between processes (e.g. when loading with multiple workers).
+
+        Returns:
+            tuple: The function to rebuild the Annotation, and its args.
+        """
+        mention_idxs = {}
+        mentions = []
+        for m in self.mentions:
+            mention_idxs[id(m)] = len(mentions)
+            mentions.append((m.start, m.end, m.label, m.mention_id))
+        n_mentions = len(mentions)
+
+        relations = []
+        for r in self.relations:
+            # Relations may refer to mentions that have been removed from
+            # the list of mentions, so include those too
+            for m in (r.start, r.end):
+                if id(m) not in mention_idxs:
+                    mention_idxs[id(m)] = len(mentions)
+                    mentions.append((m.start, m.end, m.label, m.mention_id))
+            relations.append(
+                (mention_idxs[id(r.start)], mention_idxs[id(r.end)], r.label)
+            )
+
+        return (
+            _rebuild_annotation,
+            (self.tokens, mentions, n_mentions, relations),
+        )
+
     def __repr__(self):
         """Represent this document as a string.
 
@@ -212,3 +556,96 @@ class Annotation:
             mens_str,
             rels_str,
         )
+
+
+def _sorted_by_start(
+    items: list, start_of
+) -> Tuple[List[int], List[Tuple[int, object]]]:
+    """Sort the given items by their start token.
+
+    Args:
+        items (list): The items (mentions or relations).
+        start_of: A function returning the start token of an item.
+
+    Returns:
+        Tuple[List[int], List[Tuple[int, object]]]: The start of each item,
+           and the (position, item) pairs, in order of start.
+    """
+    positions = sorted(enumerate(items), key=lambda p: start_of(p[1]))
+    return [start_of(item) for _, item in positions], positions
+
+
+def _group_by(items: list, key_of) -> Dict[object, list]:
+    """Group the given items by the given key.
+
+    Args:
+        items (list): The items.
+        key_of: A function returning the key of an item.
+
+    Returns:
+        Dict[object, list]: The items with each key, in their original order.
+    """
+    groups = {}
+    for item in items:
+        key = key_of(item)
+        group = groups.get(key)
+        if group is None:
+            groups[key] = [item]
+        else:
+            group.append(item)
+    return groups
+
+
+# The functions that build each index of an Annotation
+_INDEX_BUILDERS = {
+    "mention_starts": lambda a: _sorted_by_start(
+        a.mentions, lambda m: m.start
+    ),
+    "mention_labels": lambda a: _group_by(a.mentions, lambda m: m.label),
+    "relation_starts": lambda a: _sorted_by_start(
+        a.relations, lambda r: r.start.start
+    ),
+    "outgoing": lambda a: _group_by(a.relations, lambda r: r.start),
+    "incoming": lambda a: _group_by(a.relations, lambda r: r.end),
+}
+
+
+def _rebuild_annotation(
+    tokens: List[str],
+    mentions: List[tuple],
+    n_mentions: int,
+    relations: List[tuple],
+) -> Annotation:
+    """Rebuild an Annotation that was pickled via
+    :func:`puggle.Annotation.Annotation.__reduce__`. The data is assumed to
+    be valid already, so it is not validated again.
+
+    Args:
+        tokens (List[str]): The tokens.
+        mentions (List[tuple]): (start, end, label, mention_id) tuples.
+        n_mentions (int): The number of mentions that belong to the
+           Annotation's list of mentions (any remaining mentions are only
+           referred to by relations).
+        relations (List[tuple]): (start, end, label) tuples, where start
+           and end are indexes into mentions.
+
+    Returns:
+        Annotation: The Annotation.
+    """
+    mention_objs = [
+        Mention(start, end, None, label, mention_id, sentence=tokens)
+        for start, end, label, mention_id in mentions
+    ]
+    annotation = Annotation.__new__(Annotation)
+    annotation.tokens = tokens
+    annotation._mention_ids_map = {m.mention_id: m for m in mention_objs}
+    annotation.mentions = mention_objs[:n_mentions]
+    annotation.relations = []
+    for start, end, label in relations:
+        # Bypass __init__, as in Annotation.copy
+        r = Relation.__new__(Relation)
+        r.start = mention_objs[start]
+        r.end = mention_objs[end]
+        r.label = label
+        annotation.relations.append(r)
+    return annotation
@@ -1,11 +1,18 @@
 """A Dataset that stores a list of Documents.
 """
 import os
+import gc
 import json
+import time
 import csv
 import logging as logger
 from json import JSONDecodeError
-from typing import Dict, List
+from collections import deque
+from datetime import date
+from itertools import islice, zip_longest
+from multiprocessing import Pool
+from multiprocessing.pool import AsyncResult
+from typing import Callable, Dict, Iterable, Iterator, List, Tuple, Union
 from py2neo import Graph
 from dotenv import load_dotenv
 
@@ -13,31 +20,77 @@ from .Document import Document
 from .Annotation import Annotation
 from .utils import (
     validate_anns_format,
-    normalise_annotation_format,
+    build_annotation,
+    open_file,
+    strip_compression_suffix,
 )
+from .binary_format import LazyDocumentList, load_binary, save_binary
+from .cache import ParseCache
+from .columnar import ColumnarAnnotation, ColumnarDocumentList
+from .inverted_index import InvertedIndex
+from .size_limits import LimitError, Limits
+from .views import DocumentSubset
+from .structured_data import StructuredData
+from .validation import Quarantine, Rejected, validate_on_error
+from .join import JOIN_METHODS, hash_join, merge_join
+from .json_stream import iter_json_records, iter_jsonl_records
+from .vocabulary import Vocabulary
 from .logger import logger
 
 load_dotenv()
 
+# Number of records sent to each worker at a time when loading in parallel
+PARALLEL_BATCH_SIZE = 500
+
 
 class Dataset(object):
     """A class representing a Dataset, which stores a list of Documents.
 
     :var documents: A List of :class:`puggle.Document.Document` objects.
+    :var vocab: The :class:`puggle.vocabulary.Vocabulary` of the tokens and
+       labels of the Documents.
+    :var index: The :class:`puggle.inverted_index.InvertedIndex` of the
+       Documents, or None if it has not been built (see
+       :func:`build_index`).
     """
 
-    def __init__(self):
+    def __init__(self, vocab: Vocabulary = None):
         """Create an empty Dataset. Documents may be loaded via the
         :func:`puggle.Dataset.Dataset.load_documents` function.
+
+        Args:
+            vocab (Vocabulary, optional): The Vocabulary to intern the tokens
+               and labels of the Documents into. Datasets derived from
+               another Dataset (such as samples) share its Vocabulary, so
+               that ids are consistent between them. Defaults to a new
+               Vocabulary.
         """
         super().__init__()
         self.documents = []
+        self.vocab = vocab if vocab is not None else Vocabulary()
+        self.index = None
+
+        # Whether a DatasetView may share the list of Documents, and the
+        # indexes of the Documents that are not shared with a DatasetView
+        # (or None if no Documents are shared)
+        self._shared = False
+        self._owned = None
 
     def load_documents(
         self,
         sd_filename: os.path = None,
         anns_filename: os.path = None,
         anns_format: str = None,
+        workers: int = 1,
+        cache: Union[bool, ParseCache] = None,
+        infer_field_types: bool = False,
+        join_on: str = None,
+        anns_join_key: str = None,
+        join_method: str = "hash",
+        dedup_relations: bool = False,
+        limits: Limits = None,
+        on_error: str = "raise",
+        quarantine_filename: os.path = None,
     ):
         """Load a set of documents given the filepath of the structured data
         (a .csv file), and the filepath of the annotations (a .json file).
@@ -45,6 +98,9 @@ class Dataset(object):
         but not if both are not present.
         Each row of each file must correspond to the other, e.g. row 3 of the
         structured data csv must correspond to row 3 of the annotations json.
+        Either file may be compressed with gzip, bzip2 or xz (e.g.
+        `documents.csv.gz`, `annotations.jsonl.xz`), in which case it is
+        decompressed as it is read.
 
         Args:
             sd_filename (os.path, optional): The filepath of the structured
@@ -53,6 +109,302 @@ class Dataset(object):
                annotations.
             anns_format (str): The format of the annotations file. Can be
                either "quickgraph" or "spert".
+            workers (int, optional): The number of processes to use to build
+               the annotations. If greater than 1, records are sent to a
+               process pool in batches and the resulting documents are
+               reassembled in their original order.
+            cache (Union[bool, ParseCache], optional): If given, the parsed
+               documents are stored in (or, if the files have not changed
+               since they were last loaded, retrieved from) this
+               :class:`puggle.cache.ParseCache`. If True, a ParseCache with
+               the default settings is used.
+            infer_field_types (bool, optional): If True, columns of the
+               structured data containing only ints, floats or dates (see
+               :data:`puggle.structured_data.DATE_FORMATS`) are converted to
+               that type. Otherwise every field is a string.
+            join_on (str, optional): If given, rather than matching the
+               structured data and annotations by row number, each
+               annotation is matched to the row of the structured data with
+               the same value in this column. Annotations without a matching
+               row are loaded without fields, and rows without a matching
+               annotation are skipped.
+            anns_join_key (str, optional): The field of each annotation
+               record that holds the key to match against join_on. Defaults
+               to join_on.
+            join_method (str, optional): How to perform the join. "hash" (the
+               default) loads the structured data into memory; "merge"
+               streams through both files at once, but requires both to be
+               sorted by key (integer keys sort numerically, before any
+               other keys, which sort as strings).
+            dedup_relations (bool, optional): If True, relations that are
+               equal to an earlier relation of the same annotation (i.e.
+               with the same head, tail and label) are removed.
+            limits (Limits, optional): The
+               :class:`puggle.size_limits.Limits` to validate the documents
+               against. Defaults to the global limits of
+               :mod:`puggle.size_limits`.
+            on_error (str, optional): How to handle an annotation that fails
+               validation (or to parse, for JSON Lines files). "raise" (the
+               default) aborts the load; "skip" skips the record (and its
+               row of the structured data); "quarantine" also writes the
+               record and the reason it was rejected to
+               quarantine_filename. If the number of documents exceeds
+               max_rows, "raise" aborts the load, and otherwise only the
+               first max_rows documents are loaded.
+            quarantine_filename (os.path, optional): The JSON Lines file to
+               write rejected records to when on_error is "quarantine".
+               Each line has the index of the record in the annotations
+               file, the reason, and the record itself.
+        """
+        if cache is True:
+            cache = ParseCache()
+        validate_on_error(on_error)
+        if limits is None:
+            limits = Limits()
+
+        documents = None
+        # The quarantine file would not be written on a cache hit
+        if cache and on_error == "quarantine":
+            logger.info("The parse cache is not used in quarantine mode.")
+            cache = None
+        if cache:
+            start_time = time.perf_counter()
+            filenames = [sd_filename, anns_filename]
+            cache_key = cache.key(
+                filenames,
+                anns_format,
+                {
+                    "infer_field_types": infer_field_types,
+                    "join_on": join_on,
+                    "anns_join_key": anns_join_key,
+                    "dedup_relations": dedup_relations,
+                    "limits": limits.to_dict(),
+                    "on_error": on_error,
+                },
+            )
+            documents = cache.get(cache_key)
+            logger.info(
+                f"Parse cache {'hit' if documents is not None else 'miss'} "
+                f"({time.perf_counter() - start_time:.3f}s)."
+            )
+
+        if documents is None:
+            documents = list(
+                self.iter_documents(
+                    sd_filename=sd_filename,
+                    anns_filename=anns_filename,
+                    anns_format=anns_format,
+                    workers=workers,
+                    infer_field_types=infer_field_types,
+                    join_on=join_on,
+                    anns_join_key=anns_join_key,
+                    join_method=join_method,
+                    dedup_relations=dedup_relations,
+                    limits=limits,
+                    on_error=on_error,
+                    quarantine_filename=quarantine_filename,
+                )
+            )
+            if cache:
+                cache.put(cache_key, documents, filenames)
+                logger.info(
+                    f"Loaded and cached {len(documents)} documents "
+                    f"({time.perf_counter() - start_time:.3f}s)."
+                )
+
+        self._add_documents(documents)
+        logger.info(
+            f"Successfully loaded {len(documents)} documents. "
+            f"Dataset now contains {len(self.documents)} documents in total."
+        )
+
+    def load_binary(self, filename: os.path):
+        """Load the documents of a dataset that was saved with
+        `output_format="binary"`.
+        The file is memory-mapped, and each Document is only built when it is
+        first accessed, so this is near-instant regardless of the size of
+        the dataset.
+
+        Args:
+            filename (os.path): The filename to load.
+
+        Raises:
+            ValueError: If the file is not in the binary format.
+        """
+        documents = load_binary(filename)
+        self._add_documents(documents)
+        logger.info(
+            f"Successfully loaded {len(documents)} documents. "
+            f"Dataset now contains {len(self.documents)} documents in total."
+        )
+
+    def build_index(self) -> InvertedIndex:
+        """Build an inverted index of the Documents of this Dataset, which
+        maps each token, entity label, relation label and (head label,
+        relation label, tail label) triple to the ids (i.e. indexes) of the
+        Documents that contain it. Once built, the index is kept up to date
+        as Documents are added and by the manipulation functions (such as
+        :func:`drop_entity_class`).
+
+        Returns:
+            InvertedIndex: The index (which is also stored as `index`).
+        """
+        self.index = InvertedIndex(self.documents)
+        logger.debug(f"Built index: {self.index}")
+        return self.index
+
+    def view(self, ids: Iterable[int]) -> "DatasetView":
+        """Return a view of the Documents of this Dataset with the given
+        indexes (see :class:`DatasetView`).
+
+        Args:
+            ids (Iterable[int]): The indexes of the Documents.
+
+        Returns:
+            DatasetView: The view.
+        """
+        return DatasetView(self, ids)
+
+    def snapshot(self) -> "DatasetView":
+        """Return a view of every Document of this Dataset (see
+        :class:`DatasetView`), which is unaffected by any later changes to
+        this Dataset made by the manipulation functions.
+
+        Returns:
+            DatasetView: The view.
+        """
+        return DatasetView(self, range(len(self.documents)))
+
+    def _prepare_write(self):
+        """Copy the list of Documents of this Dataset if a DatasetView may
+        share it, so that Documents can be replaced by copies (see
+        :func:`_writable_document`) without changing the view. Columnar
+        Documents are copied in full, as they cannot be copied one by one.
+        """
+        if not self._shared:
+            return
+        self._shared = False
+        if isinstance(self.documents, ColumnarDocumentList):
+            self.documents = self.documents.copy()
+        else:
+            self.documents = list(self.documents)
+            self._owned = set()
+
+    def _writable_document(self, i: int) -> Document:
+        """Return the Document at the given index, first replacing it with a
+        copy if it is shared with a DatasetView. The manipulation functions
+        must call this before changing a Document.
+
+        Args:
+            i (int): The index of the Document.
+
+        Returns:
+            Document: The Document, which may be changed.
+        """
+        if isinstance(self.documents, DocumentSubset):
+            return self.documents.writable(i)
+        self._prepare_write()
+        document = self.documents[i]
+        if self._owned is not None and i not in self._owned:
+            document = self.documents[i] = document.copy()
+            self._owned.add(i)
+        return document
+
+    def _materialize_view(self):
+        """Replace the view of the Documents of this Dataset (if it is one)
+        with a list of them, so that Documents may be added to it.
+        """
+        if isinstance(self.documents, DocumentSubset):
+            self.documents = list(self.documents)
+            self._owned = set()
+
+    def to_columnar(self):
+        """Convert the Documents of this Dataset to the columnar backend
+        (see :mod:`puggle.columnar`), which stores them as flat arrays rather
+        than as objects. This uses far less memory, and operations over the
+        whole Dataset (such as counting or converting labels) are much
+        faster. Documents are then accessed as lightweight views over the
+        arrays, whose tokens, mentions and relations cannot be added to or
+        reordered (see :func:`to_objects`).
+        """
+        if isinstance(self.documents, ColumnarDocumentList):
+            return
+        self.documents = ColumnarDocumentList(self.vocab, self.documents)
+        self._shared = False
+        self._owned = None
+        logger.debug(
+            f"Converted {len(self.documents)} documents to columnar storage."
+        )
+
+    def to_objects(self):
+        """Convert the Documents of this Dataset back from the columnar
+        backend (see :func:`to_columnar`) to Document objects.
+        """
+        if not isinstance(self.documents, ColumnarDocumentList):
+            return
+        documents = self.documents
+        self.documents = []
+        self._shared = False
+        self._owned = None
+        self._add_documents(
+            [documents.document(i) for i in range(len(documents))]
+        )
+
+    def iter_documents(
+        self,
+        anns_filename: os.path = None,
+        anns_format: str = None,
+        sd_filename: os.path = None,
+        workers: int = 1,
+        infer_field_types: bool = False,
+        join_on: str = None,
+        anns_join_key: str = None,
+        join_method: str = "hash",
+        dedup_relations: bool = False,
+        limits: Limits = None,
+        on_error: str = "raise",
+        quarantine_filename: os.path = None,
+    ) -> Iterator[Document]:
+        """Lazily yield Documents from the given structured data and/or
+        annotations files, without adding them to this Dataset.
+        The annotations file is parsed one record at a time, so memory use is
+        bounded by the size of a single record rather than the whole file.
+        See :func:`puggle.Dataset.Dataset.load_documents` for the meaning of
+        each argument.
+
+        Args:
+            anns_filename (os.path, optional): The filepath of the
+               annotations.
+            anns_format (str): The format of the annotations file. Can be
+               either "quickgraph" or "spert".
+            sd_filename (os.path, optional): The filepath of the structured
+               data.
+            workers (int, optional): The number of processes to use to build
+               the annotations.
+            infer_field_types (bool, optional): If True, columns of the
+               structured data containing only ints, floats or dates are
+               converted to that type.
+            join_on (str, optional): The column of the structured data to
+               match the annotations by.
+            anns_join_key (str, optional): The field of each annotation to
+               match against join_on. Defaults to join_on.
+            join_method (str, optional): Either "hash" or "merge".
+            dedup_relations (bool, optional): If True, duplicate relations
+               are removed from each annotation.
+            limits (Limits, optional): The limits to validate the documents
+               against.
+            on_error (str, optional): Either "raise", "skip" or
+               "quarantine".
+            quarantine_filename (os.path, optional): The file to write
+               rejected records to when on_error is "quarantine".
+
+        Yields:
+            Document: Each Document, in the order it appears in the files.
+
+        Raises:
+            ValueError: If neither file is given, if the files have a
+               different number of rows, or if on_error is "quarantine" but
+               no quarantine_filename is given.
         """
         if sd_filename is None and anns_filename is None:
             raise ValueError(
@@ -61,43 +413,195 @@ class Dataset(object):
             )
         if anns_filename is not None:
             validate_anns_format(anns_format)
+        validate_on_error(on_error)
+        if on_error == "quarantine" and quarantine_filename is None:
+            raise ValueError(
+                'A quarantine_filename must be given when on_error is '
+                '"quarantine".'
+            )
+        if limits is None:
+            limits = Limits()
+
+        with Quarantine(
+            quarantine_filename if on_error == "quarantine" else None
+        ) as quarantine:
+            if on_error == "raise":
+                quarantine = None
+            if join_on is not None:
+                documents = self._iter_joined_documents(
+                    sd_filename,
+                    anns_filename,
+                    anns_format,
+                    workers,
+                    infer_field_types,
+                    join_on,
+                    anns_join_key or join_on,
+                    join_method,
+                    dedup_relations,
+                    limits,
+                    quarantine,
+                )
+            else:
+                documents = self._iter_row_documents(
+                    sd_filename,
+                    anns_filename,
+                    anns_format,
+                    workers,
+                    infer_field_types,
+                    dedup_relations,
+                    limits,
+                    quarantine,
+                )
 
-        structured_fields = []
-        annotations = []
+            max_rows = limits.max_rows
+            for n, document in enumerate(documents):
+                if max_rows is not None and n >= max_rows:
+                    if quarantine is None:
+                        raise LimitError(
+                            f"Dataset must contain at most {max_rows} "
+                            "documents.",
+                            "max_rows",
+                        )
+                    logger.warning(
+                        f"Stopped loading after {max_rows} documents "
+                        "(max_rows)."
+                    )
+                    break
+                yield document
 
+    def _iter_row_documents(
+        self,
+        sd_filename: os.path,
+        anns_filename: os.path,
+        anns_format: str,
+        workers: int,
+        infer_field_types: bool,
+        dedup_relations: bool,
+        limits: Limits,
+        quarantine: Quarantine = None,
+    ) -> Iterator[Document]:
+        """Yield Documents by matching the rows of the structured data to the
+        annotations by position.
+        See :func:`puggle.Dataset.Dataset.load_documents`.
+
+        Yields:
+            Document: Each Document, in the order it appears in the files.
+
+        Raises:
+            ValueError: If the files have a different number of rows.
+        """
+        structured_fields = iter(())
+        annotations = iter(())
         if sd_filename is not None:
-            structured_fields = self._load_structured_data(sd_filename)
+            structured_fields = self._load_structured_data(
+                sd_filename,
+                infer_types=infer_field_types,
+                max_categories=limits.max_categories,
+            ).rows()
         if anns_filename is not None:
-            annotations = self._load_annotations(anns_filename, anns_format)
-
-        if all((structured_fields, annotations)) and len(
-            structured_fields
-        ) != len(annotations):
-            raise ValueError(
-                "Mismatch between the length of the structured "
-                "fields dataset and the annotations dataset."
+            annotations = self._iter_annotations(
+                anns_filename,
+                anns_format,
+                workers=workers,
+                dedup_relations=dedup_relations,
+                limits=limits,
+                quarantine=quarantine,
+                # Rejected records must still be matched to their rows
+                keep_rejected=sd_filename is not None,
             )
 
-        if len(structured_fields) == 0:
-            structured_fields = [None] * len(annotations)
+        # Sentinel used to detect when one file runs out before the other
+        missing = object()
+        for sf, ann in zip_longest(
+            structured_fields, annotations, fillvalue=missing
+        ):
+            if sd_filename is None:
+                sf = None
+            elif anns_filename is None:
+                ann = None
+            elif missing in (sf, ann):
+                raise ValueError(
+                    "Mismatch between the length of the structured "
+                    "fields dataset and the annotations dataset."
+                )
+            elif isinstance(ann, Rejected):
+                continue
+            yield Document(sf, ann)
 
-        documents = []
-        for sf, ann in zip(structured_fields, annotations):
-            d = Document(sf, ann)
-            documents.append(d)
+    def _iter_joined_documents(
+        self,
+        sd_filename: os.path,
+        anns_filename: os.path,
+        anns_format: str,
+        workers: int,
+        infer_field_types: bool,
+        join_on: str,
+        anns_join_key: str,
+        join_method: str,
+        dedup_relations: bool = False,
+        limits: Limits = None,
+        quarantine: Quarantine = None,
+    ) -> Iterator[Document]:
+        """Yield Documents by matching each annotation to the row of the
+        structured data with the same key.
+        See :func:`puggle.Dataset.Dataset.load_documents`.
+
+        Yields:
+            Document: Each Document, in the order of the annotations.
 
-        self.documents += documents
-        logger.info(
-            f"Successfully loaded {len(documents)} documents. "
-            f"Dataset now contains {len(self.documents)} documents in total."
+        Raises:
+            ValueError: If either file is missing, or the join_method is
+               not valid.
+        """
+        if sd_filename is None or anns_filename is None:
+            raise ValueError(
+                "Both sd_filename and anns_filename must be present in "
+                "order to join them."
+            )
+        if join_method not in JOIN_METHODS:
+            raise ValueError(f"join_method must be in {JOIN_METHODS}.")
+
+        annotations = self._iter_annotations(
+            anns_filename,
+            anns_format,
+            workers=workers,
+            key_field=anns_join_key,
+            dedup_relations=dedup_relations,
+            limits=limits,
+            quarantine=quarantine,
         )
+        if join_method == "hash":
+            structured_data = self._load_structured_data(
+                sd_filename,
+                infer_types=infer_field_types,
+                max_categories=limits.max_categories if limits else None,
+            )
+            pairs = hash_join(structured_data, join_on, annotations)
+        else:
+            if infer_field_types:
+                raise ValueError(
+                    "infer_field_types cannot be used with a merge join."
+                )
+            rows = self._iter_structured_rows(sd_filename)
+            pairs = merge_join(rows, join_on, annotations)
+
+        for sf, ann in pairs:
+            yield Document(sf, ann)
 
     def save_to_file(self, filename: str, output_format: str = "json"):
         """Save the documents of this dataset to the given filename.
 
-        There are two `output_format` options to choose from: `json`
-        and `quickgraph`. See the "Basic functionality" section of the
-        documentation for more info.
+        There are four `output_format` options to choose from: `json`,
+        `spert`, `quickgraph` and `binary`. See the "Basic functionality"
+        section of the documentation for more info.
+
+        If the filename ends in `.jsonl`, the documents will be saved in JSON
+        Lines format (one document per line) instead of as a single JSON
+        list. Each document is written as soon as it is converted, so the
+        whole output is never held in memory.
+
+        If the filename ends in `.gz`, `.bz2` or `.xz` (e.g.
+        `output.jsonl.gz`), the output will be compressed as it is written.
 
         Args:
             filename (str): The filename to save to.
@@ -105,25 +609,38 @@ class Dataset(object):
                json file without any special formatting. 'spert' will save it
                ready for using in SPERT. 'quickgraph' will save
                as a json file that can be loaded directly into quickgraph.
+               'binary' will save it in Puggle's compact binary format, which
+               can be loaded back via
+               :func:`puggle.Dataset.Dataset.load_binary`.
         """
-        if output_format not in ["json", "spert", "quickgraph"]:
+        if output_format not in ["json", "spert", "quickgraph", "binary"]:
             raise ValueError(
-                "Output format must be either 'json', 'spert' or 'quickgraph'"
+                "Output format must be either 'json', 'spert', 'quickgraph' "
+                "or 'binary'"
             )
 
+        if output_format == "binary":
+            if strip_compression_suffix(filename) != str(filename):
+                raise ValueError("Binary datasets cannot be compressed.")
+            save_binary(self.documents, filename)
+            logger.info(f"Saved dataset to %s." % filename)
+            return
+
         if output_format == "json":
-            with open(filename, "w", encoding="utf-8") as f:
-                json.dump(
-                    [doc.to_dict() for doc in self.documents], f, indent=2
-                )
+            convert = Document.to_dict
         elif output_format == "spert":
-            spert_docs = _to_spert(self)
-            with open(filename, "w", encoding="utf-8") as f:
-                json.dump(spert_docs, f, indent=2)
+            convert = _doc_to_spert
         elif output_format == "quickgraph":
-            quickgraph_docs = _to_quickgraph(self)
-            with open(filename, "w", encoding="utf-8") as f:
-                json.dump(quickgraph_docs, f, indent=2)
+            convert = _doc_to_quickgraph
+
+        with open_file(filename, "w") as f:
+            if _is_jsonl(filename):
+                for doc in self.documents:
+                    f.write(json.dumps(convert(doc)) + "\n")
+            else:
+                json.dump(
+                    [convert(doc) for doc in self.documents], f, indent=2
+                )
 
         logger.info(f"Saved dataset to %s." % filename)
 
@@ -176,6 +693,8 @@ class Dataset(object):
             if d.fields:
                 for k, v in d.fields.items():
                     val = ('"' + v + '"') if type(v) is str else v
+                    if isinstance(v, date):
+                        val = f'date("{v.isoformat()}")'
                     cypher = (
                         f"MATCH (d:Document {{doc_idx: {i}}})\n"
                         f"SET d.{k} = {val}"
@@ -188,16 +707,16 @@ class Dataset(object):
                 continue
             for rel in ann.relations:
                 # Avoid cyclical relationships
-                if rel.start.tokens == rel.end.tokens:
+                if rel.start.text == rel.end.text:
                     continue
 
                 # Create relationship between head and tail
                 cypher = (
                     f"MATCH (d:Document {{doc_idx: {i}}})\n"
                     f"MERGE (e1:Entity:{rel.start.label} {{name: "
-                    f"\"{' '.join(rel.start.tokens)}\"}})\n"
+                    f"\"{rel.start.text}\"}})\n"
                     f"MERGE (e2:Entity:{rel.end.label}  {{name: "
-                    f"\"{' '.join(rel.end.tokens)}\"}})\n"
+                    f"\"{rel.end.text}\"}})\n"
                     f"MERGE (e1)-[r:{rel.label}]->(e2)\n"
                     f"MERGE (e1)-[:APPEARS_IN]->(d)\n"
                     f"MERGE (e2)-[:APPEARS_IN]->(d)"
@@ -207,6 +726,34 @@ class Dataset(object):
                 logger.info(f"Processed {i} documents")
         logger.info("Graph creation complete.")
 
+    def _add_documents(self, documents: List[Document]):
+        """Add the given Documents to this Dataset. If this Dataset is empty,
+        the list is used as-is, so that a
+        :class:`puggle.binary_format.LazyDocumentList` is not built in full.
+
+        Args:
+            documents (List[Document]): The Documents to add.
+        """
+        self._materialize_view()
+        n_documents = len(self.documents)
+        if isinstance(self.documents, ColumnarDocumentList):
+            # Tokens and labels are stored as ids when added
+            self.documents += documents
+        else:
+            if isinstance(documents, LazyDocumentList):
+                # Documents are interned as they are built
+                documents.vocab = self.vocab
+            else:
+                for doc in documents:
+                    self._intern(doc)
+            if isinstance(self.documents, list) and n_documents == 0:
+                self.documents = documents
+            else:
+                self.documents += documents
+        if self.index is not None:
+            for i in range(n_documents, len(self.documents)):
+                self.index.add(i, self.documents[i])
+
     def add_document(self, document: Document):
         """Add the given Document to this Dataset.
 
@@ -214,7 +761,26 @@ class Dataset(object):
             document (Document): The Document to add.
 
         """
+        self._materialize_view()
+        if not isinstance(self.documents, ColumnarDocumentList):
+            self._intern(document)
         self.documents.append(document)
+        if self.index is not None:
+            self.index.add(len(self.documents) - 1, document)
+
+    def _intern(self, document: Document):
+        """Intern the tokens and labels of the given Document into the
+        Vocabulary of this Dataset.
+
+        Args:
+            document (Document): The Document.
+        """
+        annotation = document.annotation
+        # Columnar annotations are already stored as ids
+        if annotation is not None and not isinstance(
+            annotation, ColumnarAnnotation
+        ):
+            self.vocab.add_annotation(annotation)
 
     def create_neo4j_csvs(
         self,
@@ -226,6 +792,7 @@ class Dataset(object):
         """A function to generate a set of CSVs to load into Neo4j via
         IMPORT statements (an alternative for those who want to be able
         to save their graph to disk somehow and import it later/elsewhere).
+        Any path ending in `.gz`, `.bz2` or `.xz` will be compressed.
 
 
         Args:
@@ -254,28 +821,24 @@ class Dataset(object):
             docs.add(tuple([i, *d.fields.values()]))
 
             for mention in ann.mentions:
-                t = tuple([mention.label, " ".join(mention.tokens)])
+                t = tuple([mention.label, mention.text])
                 ents.add(t)
                 if t not in ent_idxs:
                     ent_idxs[t] = len(ent_idxs)
                 doc_ents.add(tuple([i, ent_idxs[t]]))
 
             for rel in ann.relations:
-                e1_idx = ent_idxs[
-                    tuple([rel.start.label, " ".join(rel.start.tokens)])
-                ]
-                e2_idx = ent_idxs[
-                    tuple([rel.end.label, " ".join(rel.end.tokens)])
-                ]
+                e1_idx = ent_idxs[tuple([rel.start.label, rel.start.text])]
+                e2_idx = ent_idxs[tuple([rel.end.label, rel.end.text])]
 
                 t = tuple(
                     [
                         e1_idx,
                         e2_idx,
                         rel.start.label,
-                        " ".join(rel.start.tokens),
+                        rel.start.text,
                         rel.end.label,
-                        " ".join(rel.end.tokens),
+                        rel.end.text,
                         rel.label,
                     ]
                 )
@@ -284,7 +847,7 @@ class Dataset(object):
                 rel_freqs[t] += 1
                 rels.add(t)
 
-        with open(documents_path, "w", newline="", encoding="utf-8") as f:
+        with open_file(documents_path, "w", newline="") as f:
             writer = csv.writer(f)
             writer.writerow(["doc_idx", *document_fieldnames])
             for row in list(docs):
@@ -293,7 +856,7 @@ class Dataset(object):
                 "Saved %d documents to %s." % (len(docs), documents_path)
             )
 
-        with open(entities_path, "w", newline="", encoding="utf-8") as f:
+        with open_file(entities_path, "w", newline="") as f:
             writer = csv.writer(f)
             writer.writerow(["entity_idx", "label", "tokens"])
             for i, row in enumerate(list(ents)):
@@ -302,7 +865,7 @@ class Dataset(object):
                 "Saved %d entities to %s." % (len(ents), entities_path)
             )
 
-        with open(relations_path, "w", newline="", encoding="utf-8") as f:
+        with open_file(relations_path, "w", newline="") as f:
             writer = csv.writer(f)
             writer.writerow(
                 [
@@ -323,9 +886,7 @@ class Dataset(object):
                 "Saved %d relations to %s." % (len(rels), relations_path)
             )
 
-        with open(
-            document_entities_path, "w", newline="", encoding="utf-8"
-        ) as f:
+        with open_file(document_entities_path, "w", newline="") as f:
             writer = csv.writer(f)
             writer.writerow(["doc_idx", "entity_idx"])
             for row in list(doc_ents):
@@ -335,35 +896,64 @@ class Dataset(object):
                 % (len(doc_ents), document_entities_path)
             )
 
-    def _load_structured_data(self, filename: os.path):
-        """Load a list of structured data from the given file.
+    def _load_structured_data(
+        self,
+        filename: os.path,
+        infer_types: bool = False,
+        max_categories: int = None,
+    ) -> StructuredData:
+        """Load the structured data from the given file.
         File must be a .csv file. The first row of the file should be
         a header with the names of each column.
+        The data is stored column by column (see
+        :class:`puggle.structured_data.StructuredData`), which uses far less
+        memory than storing a dict for each row.
 
         Args:
             filename (os.path): The filename to load.
+            infer_types (bool, optional): If True, columns containing only
+               ints, floats or dates are converted to that type.
+            max_categories (int, optional): The maximum number of distinct
+               values of a column for it to be stored as categories.
 
         Returns:
-            List[Dict]: A list of rows, where each row contains {k : v}
-               pairs for each field.
+            StructuredData: The structured data. Each of its rows is a
+               mapping of {k : v} pairs for each field.
 
         Raises:
             ValueError: If the file is not a .csv file.
         """
-        if not filename.endswith(".csv"):
+        if not strip_compression_suffix(filename).endswith(".csv"):
             raise ValueError("File must be a CSV file.")
 
-        documents = []
-        with open(filename, "r", encoding="utf-8") as f:
-            reader = csv.DictReader(f)
-            for row in reader:
-                documents.append(row)
-        return documents
+        with open_file(filename, "r", newline="") as f:
+            return StructuredData.from_csv(
+                f, infer_types=infer_types, max_categories=max_categories
+            )
+
+    def _iter_structured_rows(self, filename: os.path) -> Iterator[Dict]:
+        """Iterate over the rows of the given structured data file without
+        loading the whole file, e.g. for a merge join.
+
+        Args:
+            filename (os.path): The filename to load.
+
+        Yields:
+            Dict: Each row, containing {k : v} pairs for each field.
+
+        Raises:
+            ValueError: If the file is not a .csv file.
+        """
+        if not strip_compression_suffix(filename).endswith(".csv"):
+            raise ValueError("File must be a CSV file.")
+
+        with open_file(filename, "r", newline="") as f:
+            yield from csv.DictReader(f)
 
     def _load_annotations(self, filename: os.path, anns_format: str):
         """Load a list of annotations from the given file.
-        File must be a .json file. Each annotation must be in the correct
-        format, e.g:
+        File must be a .json file, or a .jsonl file containing one annotation
+        per line. Each annotation must be in the correct format, e.g:
 
             [{
                 "tokens": ["one", "three", "two"],
@@ -387,54 +977,113 @@ class Dataset(object):
             list: A list of Annotations.
 
         Raises:
-            ValueError: If the file is not a JSON file, or fails to parse.
+            ValueError: If the file is not a JSON or JSON Lines file, or
+               fails to parse.
         """
-        if not filename.endswith(".json"):
-            raise ValueError("File must be a JSON file.")
-        annotations = []
-        with open(filename, "r", encoding="utf-8") as f:
+        return list(self._iter_annotations(filename, anns_format))
+
+    def _iter_annotations(
+        self,
+        filename: os.path,
+        anns_format: str,
+        workers: int = 1,
+        key_field: str = None,
+        dedup_relations: bool = False,
+        limits: Limits = None,
+        quarantine: Quarantine = None,
+        keep_rejected: bool = False,
+    ) -> Iterator[Annotation]:
+        """Iterate over the annotations of the given file, parsing the file
+        one record at a time.
+        See :func:`puggle.Dataset.Dataset._load_annotations`.
+
+        Args:
+            filename (os.path): The filename to load.
+            format (str): The format of the annotations. Can be either
+               'quickgraph' or 'spert'.
+            workers (int, optional): The number of processes to use to build
+               the annotations. Records are sent to the workers in batches
+               of PARALLEL_BATCH_SIZE, and at most two batches per worker
+               are in flight at once so that memory use stays bounded.
+            key_field (str, optional): If given, yield (key, Annotation)
+               tuples, where the key is the value of this field of each
+               record.
+            dedup_relations (bool, optional): If True, duplicate relations
+               are removed from each Annotation.
+            limits (Limits, optional): The limits to validate the
+               annotations against. Defaults to the global limits.
+            quarantine (Quarantine, optional): If given, records that fail
+               to parse or validate are added to this
+               :class:`puggle.validation.Quarantine` and skipped, rather
+               than raising an error.
+            keep_rejected (bool, optional): If True, a
+               :class:`puggle.validation.Rejected` is yielded in place of
+               each skipped record.
+
+        Yields:
+            Annotation: Each Annotation in the file.
+
+        Raises:
+            ValueError: If the file is not a JSON or JSON Lines file, or
+               fails to parse.
+        """
+        if not strip_compression_suffix(filename).endswith(
+            (".json", ".jsonl")
+        ):
+            raise ValueError("File must be a JSON or JSON Lines file.")
+        n_annotations = 0
+        n_duplicate_relations = 0
+        with open_file(filename, "r") as f:
             try:
-                d = json.load(f)
-
-                # If using quickgraph format, combine all the annotations
-                # into one single list.
-                if anns_format == "quickgraph":
-                    anns = []
-                    if isinstance(d, list):
-                        anns = d
-                    else:
-                        if len(d.keys()) > 1:
-                            logger.warning(
-                                "Warning: you appear to be loading "
-                                "multiple annotators' annotations."
-                                "This may result in duplicate nodes - "
-                                "see the readme for more details."
-                            )
-                        anns = []
-                        for _, v in d.items():
-                            anns += v
+                # When using multiple workers, JSON Lines records are
+                # decoded by the workers rather than the main process. They
+                # are also decoded one by one when skipping invalid records,
+                # so that a malformed line only rejects that record.
+                if _is_jsonl(filename):
+                    records = iter_jsonl_records(
+                        f, raw=workers > 1 or quarantine is not None
+                    )
                 else:
-                    anns = d
-
-                for ann in anns:
-                    # Ignore unsaved annotations in QuickGraph
-                    if (
-                        anns_format == "quickgraph"
-                        and "saved" in ann
-                        and not ann["saved"]
-                    ):
-                        continue
-                    normalise_annotation_format(ann, anns_format)
+                    records = iter_json_records(f)
+                records = _warn_multiple_annotators(records, anns_format)
+
+                args = (anns_format, key_field, limits, quarantine is not None)
+                if workers > 1:
+                    annotations = _build_annotations_parallel(
+                        records, workers, args
+                    )
+                else:
+                    annotations = (
+                        _build_annotation(ann, *args) for ann in records
+                    )
 
-                    annotations.append(Annotation.from_dict(ann))
+                for index, annotation in enumerate(annotations):
+                    # Unsaved annotations in QuickGraph are ignored
+                    if annotation is None:
+                        continue
+                    if isinstance(annotation, Rejected):
+                        quarantine.add(index, annotation)
+                        if keep_rejected:
+                            yield annotation
+                        continue
+                    if dedup_relations:
+                        n_duplicate_relations += (
+                            annotation if key_field is None else annotation[1]
+                        ).remove_duplicate_relations()
+                    yield annotation
+                    n_annotations += 1
 
             except (JSONDecodeError, ValueError) as e:
                 raise ValueError(
                     f"The .json file ({os.path.basename(filename)}) "
                     f"failed to parse due to the following issue: {e}"
                 )
-        logger.debug(f"Loaded {len(annotations)} annotations from {filename}.")
-        return annotations
+        logger.debug(f"Loaded {n_annotations} annotations from {filename}.")
+        if n_duplicate_relations:
+            logger.info(
+                f"Removed {n_duplicate_relations} duplicate relations from "
+                f"{filename}."
+            )
 
     def get_stats(self):
         """Return a string of some useful stats of this dataset.
@@ -472,6 +1121,243 @@ class Dataset(object):
         return [doc.to_dict() for doc in self.documents]
 
 
+class DatasetView(Dataset):
+    """A Dataset of some of the Documents of another Dataset, which stores
+    the indexes of the Documents rather than copies of them (see
+    :class:`puggle.views.DocumentSubset`), and shares its Vocabulary.
+
+    Documents are copied on write: changing a Document of the view with the
+    manipulation functions (such as :func:`drop_entity_class`) first
+    replaces it with a copy in the view, and likewise changing a Document
+    of the original Dataset first replaces it with a copy in that Dataset.
+    So neither the original Dataset nor any other view of it is affected.
+    """
+
+    def __init__(self, dataset: Dataset, ids: Iterable[int]):
+        """Create a new DatasetView.
+
+        Args:
+            dataset (Dataset): The Dataset.
+            ids (Iterable[int]): The indexes of the Documents of the view.
+        """
+        super().__init__(vocab=dataset.vocab)
+        self.documents = DocumentSubset(dataset.documents, ids)
+        if not isinstance(dataset.documents, DocumentSubset):
+            dataset._shared = True
+
+
+def _warn_multiple_annotators(
+    records: Iterator[Tuple[str, Dict]], anns_format: str
+) -> Iterator[Dict]:
+    """Strip the annotator keys from the given records, logging a warning if
+    they come from more than one QuickGraph annotator (the annotations of
+    each annotator are combined into one single list).
+
+    Args:
+        records (Iterator[Tuple[str, Dict]]): (annotator, record) pairs.
+        anns_format (str): The format of the annotations.
+
+    Yields:
+        Dict: Each record.
+    """
+    annotators = set()
+    for annotator, record in records:
+        if anns_format == "quickgraph" and annotator is not None:
+            annotators.add(annotator)
+            if len(annotators) == 2:
+                logger.warning(
+                    "Warning: you appear to be loading "
+                    "multiple annotators' annotations."
+                    "This may result in duplicate nodes - "
+                    "see the readme for more details."
+                )
+        yield record
+
+
+def _build_annotation(
+    ann: Union[Dict, str],
+    anns_format: str,
+    key_field: str = None,
+    limits: Limits = None,
+    reject_invalid: bool = False,
+) -> Annotation:
+    """Build an Annotation from a single record of an annotations file.
+
+    Args:
+        ann (Union[Dict, str]): The record, either as a dict or as an
+           undecoded line of a JSON Lines file.
+        anns_format (str): The format of the annotations.
+        key_field (str, optional): If given, the value of this field of the
+           record is returned along with the Annotation.
+        limits (Limits, optional): The limits to validate the record
+           against. Defaults to the global limits.
+        reject_invalid (bool, optional): If True, return a
+           :class:`puggle.validation.Rejected` rather than raising an error
+           if the record fails to parse or validate.
+
+    Returns:
+        Annotation: The Annotation (or a (key, Annotation) tuple if
+           key_field is given), or None if the record is an unsaved
+           QuickGraph annotation (which should be ignored).
+
+    Raises:
+        ValueError: If the record does not contain the key_field.
+    """
+    if not reject_invalid:
+        return _parse_annotation(ann, anns_format, key_field, limits)
+    try:
+        return _parse_annotation(ann, anns_format, key_field, limits)
+    except ValueError as e:
+        # Limits are counted by name, and other errors by type
+        category = getattr(e, "limit", None) or type(e).__name__
+        return Rejected(str(e), ann, category)
+    except (KeyError, IndexError, TypeError, AttributeError) as e:
+        return Rejected(f"{type(e).__name__}: {e}", ann, type(e).__name__)
+
+
+def _parse_annotation(
+    ann: Union[Dict, str],
+    anns_format: str,
+    key_field: str = None,
+    limits: Limits = None,
+) -> Annotation:
+    """Build an Annotation from a single record of an annotations file.
+    See :func:`_build_annotation`.
+    """
+    if isinstance(ann, str):
+        ann = json.loads(ann)
+    if anns_format == "quickgraph" and "saved" in ann and not ann["saved"]:
+        return None
+    if key_field is not None and key_field not in ann:
+        raise ValueError(
+            f'Annotation does not contain the join key "{key_field}".'
+        )
+    annotation = build_annotation(ann, anns_format, limits)
+    key = ann.get(key_field)
+    return annotation if key_field is None else (key, annotation)
+
+
+def _build_annotation_batch(
+    batch: List[Union[Dict, str]], *args
+) -> List[Annotation]:
+    """Build the Annotations of a batch of records. Run by each worker of
+    :func:`_build_annotations_parallel`.
+
+    Args:
+        batch (List[Union[Dict, str]]): The records.
+        *args: The remaining arguments of :func:`_build_annotation`.
+
+    Returns:
+        List[Annotation]: The Annotations (or None, for records to ignore).
+    """
+    return [_build_annotation(ann, *args) for ann in batch]
+
+
+def _build_annotations_parallel(
+    records: Iterator[Union[Dict, str]],
+    workers: int,
+    args: Tuple,
+) -> Iterator[Annotation]:
+    """Build Annotations from the given records using a pool of worker
+    processes, yielding them in the same order as the records.
+
+    Args:
+        records (Iterator[Union[Dict, str]]): The records.
+        workers (int): The number of worker processes.
+        args (Tuple): The remaining arguments of :func:`_build_annotation`
+           (i.e. the format of the annotations, etc).
+
+    Yields:
+        Annotation: Each Annotation (or None, for records to ignore).
+    """
+    return _map_in_pool(_build_annotation_batch, records, args, workers)
+
+
+def _map_in_pool(
+    func: Callable[..., List],
+    items: Iterable,
+    args: Tuple,
+    workers: int,
+) -> Iterator:
+    """Apply the given function to batches of the given items using a pool
+    of worker processes, yielding the results in the same order as the
+    items. Items are sent to the workers in batches of PARALLEL_BATCH_SIZE,
+    and at most two batches per worker are in flight at once so that
+    memory use stays bounded.
+
+    Args:
+        func (Callable[..., List]): The function to run in each worker,
+           which takes a batch (list) of items followed by the args, and
+           returns a list of results (one per item). Must be picklable,
+           i.e. defined at the top level of a module.
+        items (Iterable): The items.
+        args (Tuple): The remaining arguments of the function.
+        workers (int): The number of worker processes.
+
+    Yields:
+        Each result.
+    """
+    with Pool(workers) as pool:
+        pending = deque()
+        for batch in _batched(items, PARALLEL_BATCH_SIZE):
+            pending.append(pool.apply_async(func, (batch, *args)))
+            if len(pending) >= 2 * workers:
+                yield from _get_without_gc(pending.popleft())
+        while pending:
+            yield from _get_without_gc(pending.popleft())
+
+
+def _get_without_gc(result: AsyncResult) -> List:
+    """Wait for the given result of a worker process, with garbage
+    collection disabled while it is unpickled. Unpickling the results
+    creates a very large number of objects in quick succession, which
+    otherwise triggers many expensive (and pointless) garbage collection
+    passes in the main process. It is enabled again before the results are
+    returned to the caller.
+
+    Args:
+        result (AsyncResult): The result.
+
+    Returns:
+        List: The value of the result.
+    """
+    gc_was_enabled = gc.isenabled()
+    gc.disable()
+    try:
+        return result.get()
+    finally:
+        if gc_was_enabled:
+            gc.enable()
+
+
+def _batched(iterable: Iterable, n: int) -> Iterator[List]:
+    """Split the given iterable into lists of (at most) n items.
+
+    Args:
+        iterable (Iterable): The iterable to split.
+        n (int): The size of each batch.
+
+    Yields:
+        List: Each batch.
+    """
+    it = iter(iterable)
+    while batch := list(islice(it, n)):
+        yield batch
+
+
+def _is_jsonl(filename: os.path) -> bool:
+    """Return whether the given filename is a JSON Lines file.
+
+    Args:
+        filename (os.path): The filename.
+
+    Returns:
+        bool: True if the filename ends in .jsonl (ignoring any compression
+           suffix).
+    """
+    return strip_compression_suffix(filename).endswith(".jsonl")
+
+
 def _to_quickgraph(dataset: Dataset) -> List[Dict]:
     """Convert the given Dataset to a list of dicts compatible with Quickgraph.
 
@@ -481,40 +1367,48 @@ def _to_quickgraph(dataset: Dataset) -> List[Dict]:
     Returns:
         List[Dict]: A list of Quickgraph-compatible data.
     """
-    quickgraph_docs = []
-    for doc in dataset.documents:
-        ann = doc.annotation
+    return [_doc_to_quickgraph(doc) for doc in dataset.documents]
 
-        entities = []
-        relations = []
 
-        for i, m in enumerate(ann.mentions):
-            entities.append(
-                {
-                    "id": str(i + 1),
-                    "start": m.start,
-                    "end": m.end - 1,
-                    "label": m.label,
-                }
-            )
+def _doc_to_quickgraph(doc: Document) -> Dict:
+    """Convert the given Document to a dict compatible with Quickgraph.
 
-        for i, r in enumerate(ann.relations):
-            relations.append(
-                {
-                    "source_id": str(r.start.mention_id + 1),
-                    "target_id": str(r.end.mention_id + 1),
-                    "label": r.label,
-                }
-            )
+    Args:
+        doc (Document): The document to convert.
 
-        qd = {
-            "original": " ".join(ann.tokens),
-            "tokens": ann.tokens,
-            "entities": entities,
-            "relations": relations,
-        }
-        quickgraph_docs.append(qd)
-    return quickgraph_docs
+    Returns:
+        Dict: Quickgraph-compatible data.
+    """
+    ann = doc.annotation
+
+    entities = []
+    relations = []
+
+    for i, m in enumerate(ann.mentions):
+        entities.append(
+            {
+                "id": str(i + 1),
+                "start": m.start,
+                "end": m.end - 1,
+                "label": m.label,
+            }
+        )
+
+    for i, r in enumerate(ann.relations):
+        relations.append(
+            {
+                "source_id": str(r.start.mention_id + 1),
+                "target_id": str(r.end.mention_id + 1),
+                "label": r.label,
+            }
+        )
+
+    return {
+        "original": " ".join(ann.tokens),
+        "tokens": ann.tokens,
+        "entities": entities,
+        "relations": relations,
+    }
 
 
 def _to_spert(dataset: Dataset) -> List[Dict]:
@@ -526,40 +1420,51 @@ def _to_spert(dataset: Dataset) -> List[Dict]:
     Returns:
         List[Dict]: A list of SPERT-compatible data.
     """
-    spert_docs = []
-    for doc in dataset.documents:
-        ann = doc.annotation
+    return [_doc_to_spert(doc) for doc in dataset.documents]
 
-        entities = []
-        relations = []
 
-        for m in ann.mentions:
-            entities.append(
-                {
-                    "start": m.start,
-                    "end": m.end,
-                    "type": m.label,
-                }
-            )
+def _doc_to_spert(doc: Document) -> Dict:
+    """Convert the given Document to a dict compatible with SPERT.
 
-        for i, r in enumerate(ann.relations):
-            relations.append(
-                {
-                    "head": r.start.mention_id,
-                    "tail": r.end.mention_id,
-                    "type": r.label,
-                }
-            )
+    Args:
+        doc (Document): The document to convert.
+
+    Returns:
+        Dict: SPERT-compatible data.
+    """
+    ann = doc.annotation
+
+    entities = []
+    relations = []
+
+    for m in ann.mentions:
+        entities.append(
+            {
+                "start": m.start,
+                "end": m.end,
+                "type": m.label,
+            }
+        )
+
+    for i, r in enumerate(ann.relations):
+        relations.append(
+            {
+                "head": r.start.mention_id,
+                "tail": r.end.mention_id,
+                "type": r.label,
+            }
+        )
 
-        sd = {
-            "tokens": ann.tokens,
-            "entities": entities,
-            "relations": relations,
-        }
-        # If the document has a document index (after sentence splitting),
-        # carry that through to the output
-        if doc.document_index is not None:
-            sd["document_index"] = doc.document_index
-        spert_docs.append(sd)
-
-    return spert_docs
+    sd = {
+        "tokens": ann.tokens,
+        "entities": entities,
+        "relations": relations,
+    }
+    # If the document has a document index (after sentence splitting),
+    # carry that through to the output
+    if doc.document_index is not None:
+        sd["document_index"] = doc.document_index
+    # Likewise for the token offset (after splitting into windows)
+    if doc.token_offset is not None:
+        sd["token_offset"] = doc.token_offset
+    return sd
@@ -1,9 +1,12 @@
 """A class representing a single Document.
 Contains an optional Annotation, and a list of fields."""
 
-from typing import List, Dict
+from bisect import bisect_left, bisect_right
+from typing import Callable, Iterable, List, Dict, Tuple, Union
 
 from .Annotation import Annotation
+from .Relation import Relation
+from .structured_data import fields_to_dict
 
 
 class Document:
@@ -12,26 +15,35 @@ class Document:
     Contains an optional Annotation, and a list of fields.
     """
 
+    __slots__ = ("fields", "annotation", "document_index", "token_offset")
+
     def __init__(
         self,
         structured_fields: List[Dict] = None,
         annotation: Annotation = None,
         document_index: int = None,
+        token_offset: int = None,
     ):
         """Create a new document.
 
         Args:
-            structured_fields (List[Dict], optional): List of fields.
+            structured_fields (List[Dict], optional): List of fields. This
+               may be any mapping, such as a
+               :class:`puggle.structured_data.Fields`.
             annotation (Annotation, optional): The Annotation of the textual
                part of this document (such as annotations over the short text)
             document_index (None): When set, this is useful when splitting the
               documents into sentences. The document_index is the index of the
               original document that this sentence came from.
+            token_offset (int, optional): When set (after splitting the
+              documents into windows), the index of the first token of this
+              document in the original document.
         """
         super().__init__()
         self.fields = structured_fields
         self.annotation = annotation
         self.document_index = document_index
+        self.token_offset = token_offset
 
     def to_dict(self):
         """Return a dict of this Document.
@@ -40,16 +52,38 @@ class Document:
             dict: A dictionary representing this document.
         """
         return {
-            "fields": self.fields,
+            "fields": fields_to_dict(self.fields)
+            if self.fields is not None
+            else None,
             "annotations": self.annotation.to_dict()
             if self.annotation
             else None,
         }
 
+    def copy(self):
+        """Return a copy of this Document whose Annotation can be changed
+        without changing this Document (see
+        :func:`puggle.Annotation.Annotation.copy`). The fields are shared.
+
+        Returns:
+            Document: The copy.
+        """
+        return Document(
+            self.fields,
+            self.annotation.copy() if self.annotation is not None else None,
+            self.document_index,
+            self.token_offset,
+        )
+
     def split_sentences(self, delimiter):
         """Split this document into sentences, i.e. a list of Documents
         that have been split by the given delimiter.
 
+        Each mention and relation is assigned to its sentence in a single
+        pass (rather than checking every mention and relation against each
+        sentence), so this takes roughly linear time in the number of
+        tokens, mentions and relations, however many sentences there are.
+
         Args:
             delimiter (str): The delimiter to use.
 
@@ -58,86 +92,399 @@ class Document:
             List[Relation]: List of relations that were removed due to being
               across multiple sentences.
         """
+        return build_sentences(
+            self, *split_annotation(self.annotation, delimiter)
+        )
+
+    def split_windows(
+        self,
+        max_tokens: int,
+        overlap: int = 0,
+        delimiters: Union[str, Iterable[str], Callable[[str], bool]] = ".",
+    ):
+        """Split this document into windows of at most max_tokens tokens,
+        each of which overlaps the previous window by up to overlap tokens.
+        Unlike sentences, windows keep every token (including delimiters),
+        so each window is a contiguous slice of the tokens of this document
+        starting at its token_offset.
+
+        Windows end after a delimiter where possible, so that sentences are
+        only cut when they are longer than max_tokens, and the overlap
+        starts at the beginning of a sentence where possible. Mentions are
+        kept in each window that contains them entirely, and relations in
+        each window that contains both their head and tail.
+
+        Args:
+            max_tokens (int): The maximum number of tokens of each window.
+            overlap (int, optional): The maximum number of tokens that each
+               window shares with the previous one.
+            delimiters (Union[str, Iterable[str], Callable[[str], bool]],
+               optional): The token (or tokens) that end a sentence, or a
+               function returning whether a token ends a sentence. None to
+               ignore sentences.
+
+        Returns:
+            List[Document]: List of documents.
+            List[Relation]: List of relations that were removed due to not
+              fitting in any window.
 
-        new_docs = []
-        sent_tokens = []
-
-        sent_start_idx = 0
-        sent_end_idx = 0
-
-        removed_relations = []
-        seen_rels = set()
-
-        for i, token in enumerate(self.annotation.tokens):
-            if token != delimiter:
-                sent_tokens.append(token)
-
-            if token == delimiter or i == (len(self.annotation.tokens) - 1):
-                sent_end_idx = i
-                if i == len(self.annotation.tokens) - 1:
-                    sent_end_idx = i + 1
-
-                sent_mentions = []
-                sent_mention_ids = {}
-
-                # Rebuild the list of mentions in this sentence
-                for m in self.annotation.mentions:
-                    if (m.start < sent_start_idx) or (m.end > sent_end_idx):
-                        continue
-
-                    m_dict = m.to_dict()
-                    m_dict["start"] = m_dict["start"] - sent_start_idx
-                    m_dict["end"] = m_dict["end"] - sent_start_idx
-                    sent_mentions.append(m_dict)
-                    sent_mention_ids[m] = len(sent_mentions) - 1
-
-                # Rebuild the list of relations in this sentence
-                # Discard any cross-sentence relations (whose start or end do
-                # not lie within this sentence)
-                # print('-------')
-                sent_relations = []
-                for r in self.annotation.relations:
-                    # print(
-                    #     r,
-                    #     r.start.start,
-                    #     r.end.start,
-                    #     sent_start_idx,
-                    #     sent_end_idx,
-                    # )
-                    if (
-                        (r.start.start < sent_start_idx)
-                        or (r.end.start > sent_end_idx)
-                        or (r.start.start > sent_end_idx)
-                        or (r.end.start < sent_start_idx)
-                    ):
-                        continue
-
-                    seen_rels.add(r)
-                    r_dict = r.to_dict()
-                    # print(sent_mention_ids)
-                    r_dict["start"] = sent_mention_ids[r.start]
-                    r_dict["end"] = sent_mention_ids[r.end]
-                    sent_relations.append(r_dict)
-
-                new_ann = Annotation(
-                    tokens=sent_tokens,
-                    mentions=sent_mentions,
-                    relations=sent_relations,
-                )
-
-                new_docs.append(Document(self.fields, new_ann))
-
-                sent_tokens = []
-                sent_mentions = []
-                sent_relations = []
-
-                sent_start_idx = i + 1
-
-        for r in self.annotation.relations:
-            if r not in seen_rels:
-                removed_relations.append(r)
-
-        return new_docs, removed_relations
+        Raises:
+            ValueError: If max_tokens is less than 1, or overlap is not
+               less than max_tokens.
+        """
+        windows, removed = window_annotation(
+            self.annotation, max_tokens, overlap, delimiters
+        )
+        new_docs, removed = build_sentences(self, windows, removed)
+        offset = self.token_offset or 0
+        for doc, window in zip(new_docs, windows):
+            doc.token_offset = offset + window[0]
+        return new_docs, removed
 
     def __str__(self):
         return str(self.to_dict())
+
+
+def split_annotation(
+    annotation: Annotation, delimiter: str
+) -> Tuple[List[Tuple[int, int, list, list]], List[int]]:
+    """Split the given Annotation into sentences, without building the
+    Annotations of the sentences (see
+    :func:`puggle.Document.Document.split_sentences`).
+
+    Args:
+        annotation (Annotation): The Annotation.
+        delimiter (str): The delimiter to use.
+
+    Returns:
+        List[Tuple[int, int, list, list]]: The index of the first token of
+           each sentence, the index after its last token, and the (start,
+           end, label) of its mentions and relations (as taken by
+           :func:`puggle.Annotation.Annotation.from_tuples`).
+        List[int]: The indexes of the relations that were removed due to
+           being across multiple sentences.
+    """
+    tokens = annotation.tokens
+    n_tokens = len(tokens)
+    if not n_tokens:
+        return [], list(range(len(annotation.relations)))
+
+    # The index of the delimiter that ends each sentence (or the number of
+    # tokens, for the last sentence). Each sentence spans from the token
+    # after the end of the previous sentence to its own end, inclusive.
+    ends = [i for i, t in enumerate(tokens[:-1]) if t == delimiter]
+    ends.append(n_tokens)
+    starts = [0] + [end + 1 for end in ends[:-1]]
+    tokens_ends = ends[:-1] + [
+        n_tokens - 1 if tokens[-1] == delimiter else n_tokens
+    ]
+
+    # Mentions lie within a sentence if they start and end within it
+    sent_mentions = [[] for _ in ends]
+    for m in annotation.mentions:
+        if 0 <= m.start <= n_tokens:
+            k = bisect_left(ends, m.start)
+            if m.end <= ends[k]:
+                sent_mentions[k].append(m)
+
+    # Discard any cross-sentence relations (whose start and end do not
+    # start within the same sentence)
+    sent_relations = [[] for _ in ends]
+    removed = []
+    for j, r in enumerate(annotation.relations):
+        head = r.start.start
+        tail = r.end.start
+        if 0 <= head <= n_tokens and 0 <= tail <= n_tokens:
+            k = bisect_left(ends, head)
+            if k == bisect_left(ends, tail):
+                sent_relations[k].append(r)
+                continue
+        removed.append(j)
+
+    sentences = []
+    for start, end, mentions, relations in zip(
+        starts, tokens_ends, sent_mentions, sent_relations
+    ):
+        mentions = [
+            (m.start - start, m.end - start, m.label) for m in mentions
+        ]
+        relations = _relation_tuples(relations, mentions, start)
+        sentences.append((start, end, mentions, relations))
+    return sentences, removed
+
+
+def window_annotation(
+    annotation: Annotation,
+    max_tokens: int,
+    overlap: int = 0,
+    delimiters: Union[str, Iterable[str], Callable[[str], bool]] = ".",
+) -> Tuple[List[Tuple[int, int, list, list]], List[int]]:
+    """Split the given Annotation into windows, without building the
+    Annotations of the windows (see
+    :func:`puggle.Document.Document.split_windows`).
+
+    Args:
+        annotation (Annotation): The Annotation.
+        max_tokens (int): The maximum number of tokens of each window.
+        overlap (int, optional): The maximum overlap between windows.
+        delimiters (Union[str, Iterable[str], Callable[[str], bool]],
+           optional): The token (or tokens) that end a sentence, or a
+           function returning whether a token ends a sentence.
+
+    Returns:
+        List[Tuple[int, int, list, list]]: The spans, mentions and relations
+           of each window, as returned by :func:`split_annotation`.
+        List[int]: The indexes of the relations that were removed due to
+           not fitting in any window.
+
+    Raises:
+        ValueError: If max_tokens is less than 1, or overlap is not less
+           than max_tokens.
+    """
+    if max_tokens < 1:
+        raise ValueError("max_tokens must be at least 1.")
+    if not 0 <= overlap < max_tokens:
+        raise ValueError("overlap must be at least 0 and below max_tokens.")
+    starts, ends = _window_spans(
+        annotation.tokens, max_tokens, overlap, _boundary_test(delimiters)
+    )
+
+    # The windows containing a span are contiguous, as both the starts and
+    # the ends of the windows are increasing, so each mention and relation
+    # is assigned to its windows by bisection
+    win_mentions = [[] for _ in starts]
+    for m in annotation.mentions:
+        first = bisect_left(ends, m.end)
+        for k in range(first, bisect_right(starts, m.start)):
+            win_mentions[k].append(m)
+
+    win_relations = [[] for _ in starts]
+    removed = []
+    for j, r in enumerate(annotation.relations):
+        h = r.start
+        t = r.end
+        first = bisect_left(ends, max(h.end, t.end))
+        last = bisect_right(starts, min(h.start, t.start))
+        if first >= last:
+            removed.append(j)
+        for k in range(first, last):
+            win_relations[k].append(r)
+
+    windows = []
+    for start, end, mentions, relations in zip(
+        starts, ends, win_mentions, win_relations
+    ):
+        mentions = [
+            (m.start - start, m.end - start, m.label) for m in mentions
+        ]
+        relations = _relation_tuples(relations, mentions, start)
+        windows.append((start, end, mentions, relations))
+    return windows, removed
+
+
+def _window_spans(
+    tokens: List[str],
+    max_tokens: int,
+    overlap: int,
+    is_boundary: Callable[[str], bool],
+) -> Tuple[List[int], List[int]]:
+    """Return the index of the first token of each window of the given
+    tokens, and the index after its last token (see
+    :func:`puggle.Document.Document.split_windows`). Each window ends
+    further into the tokens than the previous one.
+
+    Args:
+        tokens (List[str]): The tokens.
+        max_tokens (int): The maximum number of tokens of each window.
+        overlap (int): The maximum overlap between windows.
+        is_boundary (Callable[[str], bool]): Whether a token ends a
+           sentence.
+
+    Returns:
+        List[int]: The start of each window.
+        List[int]: The end of each window.
+    """
+    n_tokens = len(tokens)
+    # The indexes at which a sentence starts
+    boundaries = [i + 1 for i, t in enumerate(tokens) if is_boundary(t)]
+    starts = []
+    ends = []
+    start = 0
+    prev_end = 0
+    while start < n_tokens:
+        end = min(start + max_tokens, n_tokens)
+        if end < n_tokens:
+            # End after the last sentence that fits, as long as the window
+            # still ends after the previous one
+            k = bisect_right(boundaries, end) - 1
+            if k >= 0 and boundaries[k] > max(start, prev_end):
+                end = boundaries[k]
+        starts.append(start)
+        ends.append(end)
+        if end == n_tokens:
+            break
+        # Start the next window at the first sentence that starts within
+        # the overlap (which is the end of this window, if it ends a
+        # sentence and no other sentence does)
+        start = max(end - overlap, start + 1)
+        k = bisect_left(boundaries, start)
+        if k < len(boundaries) and boundaries[k] <= end:
+            start = boundaries[k]
+        prev_end = end
+    return starts, ends
+
+
+def _boundary_test(
+    delimiters: Union[str, Iterable[str], Callable[[str], bool], None]
+) -> Callable[[str], bool]:
+    """Return a function returning whether a token ends a sentence.
+
+    Args:
+        delimiters (Union[str, Iterable[str], Callable[[str], bool], None]):
+           The token (or tokens) that end a sentence, or a function
+           returning whether a token ends a sentence, or None if no token
+           ends a sentence.
+
+    Returns:
+        Callable[[str], bool]: The function.
+    """
+    if callable(delimiters):
+        return delimiters
+    if delimiters is None:
+        return lambda token: False
+    if isinstance(delimiters, str):
+        delimiters = [delimiters]
+    return frozenset(delimiters).__contains__
+
+
+def build_sentences(
+    document: Document,
+    sentences: List[Tuple[int, int, list, list]],
+    removed: List[int],
+) -> Tuple[List[Document], List[Relation]]:
+    """Build the Documents of the sentences of the given Document, as
+    returned by :func:`split_annotation` (or of its windows, as returned by
+    :func:`window_annotation`). The sentences share the fields of the
+    Document. If the Annotation of the Document has token_ids, each
+    sentence is given the ids of its tokens too.
+
+    Args:
+        document (Document): The Document.
+        sentences (List[Tuple[int, int, list, list]]): The sentences.
+        removed (List[int]): The indexes of the removed relations.
+
+    Returns:
+        List[Document]: The sentences.
+        List[Relation]: The relations that were removed.
+    """
+    annotation = document.annotation
+    tokens = annotation.tokens
+    token_ids = annotation.token_ids
+    new_docs = []
+    for start, end, mentions, relations in sentences:
+        new_ann = Annotation.from_tuples(
+            tokens[start:end], mentions, relations
+        )
+        if token_ids is not None:
+            new_ann.token_ids = token_ids[start:end]
+        new_docs.append(Document(document.fields, new_ann))
+    relations = annotation.relations
+    return new_docs, [relations[j] for j in removed]
+
+
+def join_sentences(
+    sentences: List[Document],
+    delimiter: str,
+    relations: Iterable[Relation] = (),
+) -> Document:
+    """Join the given sentences of a Document (as returned by
+    :func:`puggle.Document.Document.split_sentences`) back into a single
+    Document, with the delimiter between each pair of sentences. The
+    Document has the fields of the first sentence.
+
+    Args:
+        sentences (List[Document]): The sentences, in order.
+        delimiter (str): The delimiter that the sentences were split by.
+        relations (Iterable[Relation], optional): Relations to add to the
+           Document (such as those removed when splitting it), whose head
+           and tail spans are relative to the Document. They are linked to
+           the mentions with the same span and label, which are added if
+           there are none.
+
+    Returns:
+        Document: The Document.
+    """
+    tokens = []
+    mentions = []
+    relation_tuples = []
+    for i, s in enumerate(sentences):
+        if i:
+            tokens.append(delimiter)
+        start = len(tokens)
+        ann = s.annotation
+        tokens += ann.tokens
+        sent_mentions = [(m.start, m.end, m.label) for m in ann.mentions]
+        n_mentions = len(mentions)
+        mentions += [
+            (m_start + start, m_end + start, label)
+            for m_start, m_end, label in sent_mentions
+        ]
+        relation_tuples += [
+            (head + n_mentions, tail + n_mentions, label)
+            for head, tail, label in _relation_tuples(
+                ann.relations, sent_mentions, 0
+            )
+        ]
+
+    if relations:
+        # The last equal mention, as in _relation_tuples
+        mention_ids = {m: i for i, m in enumerate(mentions)}
+        for r in relations:
+            ids = []
+            for m in (r.start, r.end):
+                key = (m.start, m.end, m.label)
+                if key not in mention_ids:
+                    mention_ids[key] = len(mentions)
+                    mentions.append(key)
+                ids.append(mention_ids[key])
+            relation_tuples.append((ids[0], ids[1], r.label))
+
+    return Document(
+        sentences[0].fields,
+        Annotation.from_tuples(tokens, mentions, relation_tuples),
+    )
+
+
+def _relation_tuples(
+    relations: List[Relation],
+    mentions: List[Tuple[int, int, str]],
+    offset: int,
+) -> List[Tuple[int, int, str]]:
+    """Return the (head, tail, label) of each of the given relations, where
+    the head and tail are the indexes of the (last) equal mention in the
+    given mentions.
+
+    Args:
+        relations (List[Relation]): The relations.
+        mentions (List[Tuple[int, int, str]]): The (start, end, label) of
+           each mention, relative to the offset.
+        offset (int): The offset of the mentions.
+
+    Returns:
+        List[Tuple[int, int, str]]: The relations.
+    """
+    if not relations:
+        return []
+    mention_ids = {m: i for i, m in enumerate(mentions)}
+    relation_tuples = []
+    for r in relations:
+        h = r.start
+        t = r.end
+        relation_tuples.append(
+            (
+                mention_ids[(h.start - offset, h.end - offset, h.label)],
+                mention_ids[(t.start - offset, t.end - offset, t.label)],
+                r.label,
+            )
+        )
+    return relation_tuples
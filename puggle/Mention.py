@@ -6,6 +6,17 @@ class Mention:
     """A single entity mention. Captures the start, end, tokens and
     labels of the mention."""
 
+    __slots__ = (
+        "start",
+        "end",
+        "_tokens",
+        "_sentence",
+        "_text",
+        "_label",
+        "label_id",
+        "mention_id",
+    )
+
     def __init__(
         self,
         start: int,
@@ -13,6 +24,7 @@ class Mention:
         tokens: list,
         label: str,
         mention_id: int,
+        sentence: list = None,
     ):
         """Create a new Mention.
 
@@ -23,6 +35,10 @@ class Mention:
             label (str): The label of the mention.
             mention_id (int): The index of this mention with respect to the
                Document in which it appears.
+            sentence (list, optional): The tokens of the Document in which
+               the mention appears. If given, `tokens` is ignored, and the
+               tokens of the mention are read from the sentence when they
+               are accessed, rather than being copied.
         """
         super().__init__()
         if start == end:
@@ -31,10 +47,60 @@ class Mention:
             )
         self.start = start
         self.end = end
-        self.tokens = tokens
+        if sentence is not None:
+            self.sentence = sentence
+        else:
+            self.tokens = tokens
         self.label = label
         self.mention_id = mention_id
 
+    @property
+    def tokens(self) -> list:
+        """The tokens of this mention."""
+        if self._tokens is not None:
+            return self._tokens
+        return self._sentence[self.start : self.end]
+
+    @tokens.setter
+    def tokens(self, tokens: list):
+        self._tokens = tokens
+        self._sentence = None
+        self._text = None
+
+    @property
+    def sentence(self) -> list:
+        """The tokens of the Document in which this mention appears, or None
+        if the mention stores its own copy of its tokens.
+        """
+        return self._sentence
+
+    @sentence.setter
+    def sentence(self, sentence: list):
+        self._sentence = sentence
+        self._tokens = None
+        self._text = None
+
+    @property
+    def text(self) -> str:
+        """The tokens of this mention joined by spaces. This is only
+        computed once.
+        """
+        if self._text is None:
+            self._text = " ".join(self.tokens)
+        return self._text
+
+    @property
+    def label(self) -> str:
+        """The label of this mention. Changing the label clears its
+        label_id (see :class:`puggle.vocabulary.Vocabulary`).
+        """
+        return self._label
+
+    @label.setter
+    def label(self, label: str):
+        self._label = label
+        self.label_id = None
+
     def to_dict(self):
         """Return a dictionary representation of this mention.
         Don't include the mention_id as it is not useful here - it is only
@@ -43,7 +109,30 @@ class Mention:
         Returns:
             dict: The mention as a dictionary.
         """
-        return {k: v for k, v in self.__dict__.items() if k != "mention_id"}
+        return {
+            "start": self.start,
+            "end": self.end,
+            "tokens": self.tokens,
+            "label": self.label,
+        }
+
+    def __eq__(self, other):
+        """Two Mentions are equal if they have the same start, end and
+        label.
+        """
+        if not isinstance(other, Mention):
+            return NotImplemented
+        return (
+            self.start == other.start
+            and self.end == other.end
+            and self.label == other.label
+        )
+
+    def __hash__(self):
+        # Mentions whose label is changed while in a set or dict will not be
+        # found again, so only use them as keys for the duration of a single
+        # operation
+        return hash((self.start, self.end, self.label))
 
     def __repr__(self):
-        return f"({' '.join(self.tokens)} [{self.label}]) (start: {self.start}, end: {self.end})"
+        return f"({self.text} [{self.label}]) (start: {self.start}, end: {self.end})"
@@ -8,6 +8,8 @@ class Relation:
     """A single relation. Captures the start mention, end mention, tokens and
     labels of the relation."""
 
+    __slots__ = ("start", "end", "_label", "label_id")
+
     def __init__(self, start: Mention, end: Mention, label: str):
         """Create a new Relation.
 
@@ -17,11 +19,13 @@ class Relation:
             label (str): The label (type) of the relation.
 
         Raises:
-            ValueError: If the start and end Mention is the same.
+            ValueError: If the start and end Mention is the same object.
+               (Distinct Mentions with the same span and label may be
+               related.)
         """
         super().__init__()
 
-        if start == end:
+        if start is end:
             raise ValueError(
                 "Cannot create relation between a mention and itself"
             )
@@ -30,6 +34,18 @@ class Relation:
         self.end = end
         self.label = label
 
+    @property
+    def label(self) -> str:
+        """The label of this relation. Changing the label clears its
+        label_id (see :class:`puggle.vocabulary.Vocabulary`).
+        """
+        return self._label
+
+    @label.setter
+    def label(self, label: str):
+        self._label = label
+        self.label_id = None
+
     def to_dict(self):
         """Return a dictionary representation of this Relation.
         Convert 'start' and 'end' to the mention index of this
@@ -44,8 +60,22 @@ class Relation:
             "type": self.label,
         }
 
+    def __eq__(self, other):
+        """Two Relations are equal if they have the same label, and their
+        start (head) and end (tail) Mentions are equal.
+        """
+        if not isinstance(other, Relation):
+            return NotImplemented
+        return (
+            self.label == other.label
+            and self.start == other.start
+            and self.end == other.end
+        )
+
+    def __hash__(self):
+        return hash((self.start, self.end, self.label))
+
     def __repr__(self):
         return (
-            f"({' '.join(self.start.tokens)})-"
-            f"[{self.label}]->({' '.join(self.end.tokens)})"
+            f"({self.start.text})-[{self.label}]->({self.end.text})"
         )
@@ -1,4 +1,4 @@
-from .Dataset import Dataset
+from .Dataset import Dataset, DatasetView
 from .Document import Document
 from .Annotation import Annotation
 
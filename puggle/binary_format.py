@@ -0,0 +1,482 @@
+"""A compact binary on-disk format for Datasets.
+
+The file consists of a header followed by a number of sections. Tokens,
+labels and field names are stored once each in a string table, and
+everything else is stored as flat arrays of integers:
+
+* ``doc_token_offsets``, ``token_ids``: the tokens of document ``i`` are
+  ``token_ids[doc_token_offsets[i]:doc_token_offsets[i + 1]]``.
+* ``doc_mention_offsets``, ``mention_start``, ``mention_end``,
+  ``mention_label``, ``mention_id``, ``mention_listed``: the mentions of
+  each document (mentions that are only referred to by relations have
+  ``mention_listed`` set to 0).
+* ``doc_relation_offsets``, ``relation_head``, ``relation_tail``,
+  ``relation_label``: the relations of each document, where the head and
+  tail are indexes into the mentions of that document.
+* ``doc_flags``, ``document_index``, ``doc_fields_offsets``,
+  ``fields_data``: whether each document has an annotation, its
+  document_index (-1 for None), and its structured fields (JSON-encoded,
+  with dates stored as ``{"$date": "<iso date>"}``).
+* ``token_offset``: the token_offset of each document (-1 for None). Files
+  saved before this section was added are read as if it were all -1.
+
+The file is opened via ``mmap`` and Documents are only built when they are
+accessed, so opening a file is near-instant regardless of its size.
+"""
+import json
+import mmap
+import struct
+import sys
+from array import array
+from collections.abc import MutableSequence
+from datetime import date
+from typing import Dict, Iterable, List
+
+from .Annotation import Annotation, _rebuild_annotation
+from .Document import Document
+
+MAGIC = b"PUGGLEB\x01"
+
+# The name and typecode of each section, in the order they are stored
+SECTIONS = [
+    ("string_offsets", "q"),
+    ("string_data", "B"),
+    ("doc_token_offsets", "q"),
+    ("token_ids", "i"),
+    ("doc_mention_offsets", "q"),
+    ("mention_start", "i"),
+    ("mention_end", "i"),
+    ("mention_label", "i"),
+    ("mention_id", "i"),
+    ("mention_listed", "B"),
+    ("doc_relation_offsets", "q"),
+    ("relation_head", "i"),
+    ("relation_tail", "i"),
+    ("relation_label", "i"),
+    ("doc_flags", "B"),
+    ("document_index", "q"),
+    ("doc_fields_offsets", "q"),
+    ("fields_data", "B"),
+    ("token_offset", "q"),
+]
+
+# Bit flags of doc_flags
+HAS_ANNOTATION = 1
+HAS_FIELDS = 2
+
+_HEADER = struct.Struct("<8sBI")
+_SECTION = struct.Struct("<QQ")
+_ALIGNMENT = 8
+
+
+class _StringTable:
+    """Assigns an integer id to each distinct string."""
+
+    def __init__(self):
+        self.ids = {}
+        self.offsets = array("q", [0])
+        self.data = bytearray()
+
+    def add(self, s: str) -> int:
+        """Return the id of the given string, adding it if necessary.
+
+        Args:
+            s (str): The string.
+
+        Returns:
+            int: The id of the string.
+        """
+        idx = self.ids.get(s)
+        if idx is None:
+            idx = self.ids[s] = len(self.ids)
+            self.data += s.encode("utf-8")
+            self.offsets.append(len(self.data))
+        return idx
+
+
+def save_binary(documents: Iterable[Document], filename: str):
+    """Save the given Documents to a file in the binary format.
+
+    Args:
+        documents (Iterable[Document]): The Documents to save.
+        filename (str): The filename to save to.
+    """
+    strings = _StringTable()
+    arrays = {
+        name: array(typecode) if typecode != "B" else bytearray()
+        for name, typecode in SECTIONS
+    }
+    for name in [
+        "doc_token_offsets",
+        "doc_mention_offsets",
+        "doc_relation_offsets",
+        "doc_fields_offsets",
+    ]:
+        arrays[name].append(0)
+
+    for doc in documents:
+        ann = doc.annotation
+        flags = 0
+        if ann is not None:
+            flags |= HAS_ANNOTATION
+            _add_annotation(arrays, strings, ann)
+        if doc.fields is not None:
+            flags |= HAS_FIELDS
+            arrays["fields_data"] += json.dumps(
+                dict(doc.fields), default=_encode_field
+            ).encode("utf-8")
+        arrays["doc_flags"].append(flags)
+        arrays["document_index"].append(
+            -1 if doc.document_index is None else doc.document_index
+        )
+        arrays["token_offset"].append(
+            -1 if doc.token_offset is None else doc.token_offset
+        )
+        arrays["doc_token_offsets"].append(len(arrays["token_ids"]))
+        arrays["doc_mention_offsets"].append(len(arrays["mention_start"]))
+        arrays["doc_relation_offsets"].append(len(arrays["relation_head"]))
+        arrays["doc_fields_offsets"].append(len(arrays["fields_data"]))
+
+    arrays["string_offsets"] = strings.offsets
+    arrays["string_data"] = strings.data
+
+    with open(filename, "wb") as f:
+        header_size = _HEADER.size + _SECTION.size * len(SECTIONS)
+        offset = _align(header_size)
+        section_table = []
+        for name, _ in SECTIONS:
+            nbytes = len(memoryview(arrays[name]).cast("B"))
+            section_table.append((offset, nbytes))
+            offset = _align(offset + nbytes)
+
+        f.write(
+            _HEADER.pack(MAGIC, sys.byteorder == "little", len(SECTIONS))
+        )
+        for section in section_table:
+            f.write(_SECTION.pack(*section))
+        for (name, _), (offset, _) in zip(SECTIONS, section_table):
+            f.write(b"\x00" * (offset - f.tell()))
+            f.write(memoryview(arrays[name]).cast("B"))
+
+
+def _add_annotation(arrays: Dict, strings: _StringTable, ann: Annotation):
+    """Append the tokens, mentions and relations of the given Annotation to
+    the given arrays.
+
+    Args:
+        arrays (Dict): The arrays of each section.
+        strings (_StringTable): The string table.
+        ann (Annotation): The Annotation.
+    """
+    arrays["token_ids"].extend(strings.add(t) for t in ann.tokens)
+
+    mention_idxs = {}
+
+    def add_mention(m, listed):
+        mention_idxs[id(m)] = len(mention_idxs)
+        arrays["mention_start"].append(m.start)
+        arrays["mention_end"].append(m.end)
+        arrays["mention_label"].append(strings.add(m.label))
+        arrays["mention_id"].append(m.mention_id)
+        arrays["mention_listed"].append(listed)
+
+    for m in ann.mentions:
+        add_mention(m, 1)
+    # Relations may refer to mentions that have been removed from the list
+    # of mentions, so store those too
+    for r in ann.relations:
+        for m in (r.start, r.end):
+            if id(m) not in mention_idxs:
+                add_mention(m, 0)
+    for r in ann.relations:
+        arrays["relation_head"].append(mention_idxs[id(r.start)])
+        arrays["relation_tail"].append(mention_idxs[id(r.end)])
+        arrays["relation_label"].append(strings.add(r.label))
+
+
+def _encode_field(v):
+    """Encode field values that are not supported by JSON (i.e. dates).
+
+    Args:
+        v: The value.
+
+    Returns:
+        Dict: The encoded value.
+
+    Raises:
+        TypeError: If the value cannot be encoded.
+    """
+    if isinstance(v, date):
+        return {"$date": v.isoformat()}
+    raise TypeError(f"Cannot save field value of type {type(v).__name__}.")
+
+
+def _decode_field(d: Dict):
+    """Decode field values encoded by :func:`_encode_field`.
+
+    Args:
+        d (Dict): The encoded value (or any other JSON object).
+
+    Returns:
+        The decoded value.
+    """
+    if len(d) == 1 and "$date" in d:
+        return date.fromisoformat(d["$date"])
+    return d
+
+
+def _align(offset: int) -> int:
+    """Round the given offset up to a multiple of _ALIGNMENT.
+
+    Args:
+        offset (int): The offset.
+
+    Returns:
+        int: The aligned offset.
+    """
+    return -(-offset // _ALIGNMENT) * _ALIGNMENT
+
+
+class BinaryDataset:
+    """A read-only, memory-mapped view over a file in the binary format.
+
+    :var n_documents: The number of documents in the file.
+    """
+
+    def __init__(self, filename: str):
+        """Open the given file.
+
+        Args:
+            filename (str): The filename to open.
+
+        Raises:
+            ValueError: If the file is not in the binary format.
+        """
+        with open(filename, "rb") as f:
+            self._mmap = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+
+        buf = memoryview(self._mmap)
+        if len(buf) < _HEADER.size:
+            raise ValueError(f"{filename} is not a Puggle binary file.")
+        magic, little_endian, n_sections = _HEADER.unpack_from(buf)
+        # Files saved before the token_offset section was added lack it
+        if magic != MAGIC or n_sections not in (
+            len(SECTIONS) - 1,
+            len(SECTIONS),
+        ):
+            raise ValueError(f"{filename} is not a Puggle binary file.")
+        if bool(little_endian) != (sys.byteorder == "little"):
+            raise ValueError(
+                f"{filename} was saved on a machine with a different "
+                "byte order."
+            )
+
+        self.token_offset = None
+        for i, (name, typecode) in enumerate(SECTIONS[:n_sections]):
+            offset, nbytes = _SECTION.unpack_from(
+                buf, _HEADER.size + i * _SECTION.size
+            )
+            setattr(self, name, buf[offset : offset + nbytes].cast(typecode))
+
+        self.n_documents = len(self.doc_flags)
+        self._strings = {}
+
+    def string(self, idx: int) -> str:
+        """Return the string with the given id from the string table.
+        Each string is only decoded once.
+
+        Args:
+            idx (int): The id of the string.
+
+        Returns:
+            str: The string.
+        """
+        s = self._strings.get(idx)
+        if s is None:
+            start = self.string_offsets[idx]
+            end = self.string_offsets[idx + 1]
+            s = self._strings[idx] = str(
+                self.string_data[start:end], "utf-8"
+            )
+        return s
+
+    def document(self, i: int) -> Document:
+        """Build the Document at the given index.
+
+        Args:
+            i (int): The index of the document.
+
+        Returns:
+            Document: The Document.
+        """
+        flags = self.doc_flags[i]
+
+        fields = None
+        if flags & HAS_FIELDS:
+            start = self.doc_fields_offsets[i]
+            end = self.doc_fields_offsets[i + 1]
+            fields = json.loads(
+                str(self.fields_data[start:end], "utf-8"),
+                object_hook=_decode_field,
+            )
+
+        annotation = None
+        if flags & HAS_ANNOTATION:
+            annotation = self._annotation(i)
+
+        document_index = self.document_index[i]
+        token_offset = (
+            self.token_offset[i] if self.token_offset is not None else -1
+        )
+        return Document(
+            fields,
+            annotation,
+            None if document_index == -1 else document_index,
+            None if token_offset == -1 else token_offset,
+        )
+
+    def _annotation(self, i: int) -> Annotation:
+        """Build the Annotation of the document at the given index.
+
+        Args:
+            i (int): The index of the document.
+
+        Returns:
+            Annotation: The Annotation.
+        """
+        string = self.string
+        tokens = [
+            string(t)
+            for t in self.token_ids[
+                self.doc_token_offsets[i] : self.doc_token_offsets[i + 1]
+            ]
+        ]
+
+        # Mentions that are only referred to by relations are always stored
+        # after the listed mentions of each document
+        m_start = self.doc_mention_offsets[i]
+        m_end = self.doc_mention_offsets[i + 1]
+        mentions = [
+            (
+                self.mention_start[j],
+                self.mention_end[j],
+                string(self.mention_label[j]),
+                self.mention_id[j],
+            )
+            for j in range(m_start, m_end)
+        ]
+        n_listed = sum(self.mention_listed[m_start:m_end])
+
+        r_start = self.doc_relation_offsets[i]
+        r_end = self.doc_relation_offsets[i + 1]
+        relations = [
+            (
+                self.relation_head[j],
+                self.relation_tail[j],
+                string(self.relation_label[j]),
+            )
+            for j in range(r_start, r_end)
+        ]
+
+        return _rebuild_annotation(tokens, mentions, n_listed, relations)
+
+
+class LazyDocumentList(MutableSequence):
+    """A list of Documents backed by a :class:`BinaryDataset`.
+    Each Document is only built the first time it is accessed, after which
+    it is kept so that any changes made to it are preserved.
+    Documents may be added, replaced and removed as with a normal list.
+
+    :var vocab: If set, the tokens and labels of each Document are interned
+       into this :class:`puggle.vocabulary.Vocabulary` as it is built.
+    """
+
+    def __init__(self, binary_dataset: BinaryDataset):
+        """Create a new LazyDocumentList.
+
+        Args:
+            binary_dataset (BinaryDataset): The file to read Documents from.
+        """
+        self._binary = binary_dataset
+        # Each item is either the index of a document in the file (>= 0),
+        # or -(k + 1) for the k-th Document added to the list since.
+        self._order = array("q", range(binary_dataset.n_documents))
+        self._added = []
+        self._built = {}
+        self.vocab = None
+
+    def _get(self, item: int) -> Document:
+        """Return the Document for the given item of self._order.
+
+        Args:
+            item (int): The item.
+
+        Returns:
+            Document: The Document.
+        """
+        if item < 0:
+            return self._added[-item - 1]
+        doc = self._built.get(item)
+        if doc is None:
+            doc = self._built[item] = self._binary.document(item)
+            if self.vocab is not None and doc.annotation is not None:
+                self.vocab.add_annotation(doc.annotation)
+        return doc
+
+    def _add(self, doc: Document) -> int:
+        """Store a Document that has been added to the list.
+
+        Args:
+            doc (Document): The Document.
+
+        Returns:
+            int: The item to store in self._order.
+        """
+        self._added.append(doc)
+        return -len(self._added)
+
+    def __len__(self) -> int:
+        return len(self._order)
+
+    def __getitem__(self, i):
+        if isinstance(i, slice):
+            return [self._get(item) for item in self._order[i]]
+        return self._get(self._order[i])
+
+    def __setitem__(self, i, value):
+        if isinstance(i, slice):
+            self._order[i] = array("q", [self._add(doc) for doc in value])
+        else:
+            self._order[i] = self._add(value)
+
+    def __delitem__(self, i):
+        del self._order[i]
+
+    def insert(self, index: int, value: Document):
+        self._order.insert(index, self._add(value))
+
+    def __iter__(self):
+        for item in self._order:
+            yield self._get(item)
+
+    def __eq__(self, other):
+        if isinstance(other, (list, LazyDocumentList)):
+            return len(self) == len(other) and all(
+                a == b for a, b in zip(self, other)
+            )
+        return NotImplemented
+
+    def __repr__(self):
+        return f"<LazyDocumentList of {len(self)} documents>"
+
+
+def load_binary(filename: str) -> LazyDocumentList:
+    """Open the given binary file as a lazily-built list of Documents.
+
+    Args:
+        filename (str): The filename to open.
+
+    Returns:
+        LazyDocumentList: The Documents.
+    """
+    return LazyDocumentList(BinaryDataset(filename))
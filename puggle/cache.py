@@ -0,0 +1,260 @@
+"""A cache of parsed Datasets, so that repeatedly loading the same unchanged
+files does not require them to be parsed and validated again."""
+import os
+import json
+import time
+import hashlib
+from typing import Dict, List
+
+from . import size_limits
+from .binary_format import LazyDocumentList, load_binary, save_binary
+from .logger import logger
+
+# Increment this whenever the way files are parsed changes, so that entries
+# created by older versions of Puggle are no longer used.
+CACHE_VERSION = 1
+
+DEFAULT_MAX_SIZE = 10 * 1024**3  # 10 GB
+
+_HASH_BLOCK_SIZE = 1 << 20
+
+
+class ParseCache:
+    """A cache of parsed Datasets, stored on disk in Puggle's binary format
+    (see :mod:`puggle.binary_format`).
+
+    Each entry is keyed on the path, size and modification time of the files
+    that were loaded (and optionally a hash of their contents), the
+    annotation format, and the values in :mod:`puggle.size_limits`. When the
+    total size of the cache exceeds `max_size`, the least recently used
+    entries are removed.
+    """
+
+    def __init__(
+        self,
+        cache_dir: os.path = None,
+        max_size: int = DEFAULT_MAX_SIZE,
+        hash_contents: bool = False,
+    ):
+        """Create a new ParseCache.
+
+        Args:
+            cache_dir (os.path, optional): The directory to store the cache
+               in. Defaults to the PUGGLE_CACHE_DIR environment variable if
+               set, otherwise ~/.cache/puggle.
+            max_size (int, optional): The maximum total size of the cache, in
+               bytes.
+            hash_contents (bool, optional): If True, the contents of each
+               file are hashed to detect changes. Otherwise (the default),
+               only the size and modification time are checked.
+        """
+        if cache_dir is None:
+            cache_dir = os.getenv(
+                "PUGGLE_CACHE_DIR",
+                os.path.join(os.path.expanduser("~"), ".cache", "puggle"),
+            )
+        self.cache_dir = cache_dir
+        self.max_size = max_size
+        self.hash_contents = hash_contents
+        os.makedirs(cache_dir, exist_ok=True)
+
+    def key(
+        self, filenames: List[os.path], anns_format: str, options: Dict = None
+    ) -> str:
+        """Return the key of the cache entry for the given files.
+
+        Args:
+            filenames (List[os.path]): The files being loaded (None for
+               files that were not given).
+            anns_format (str): The format of the annotations.
+            options (Dict, optional): Any other options that affect how the
+               files are parsed.
+
+        Returns:
+            str: The key.
+        """
+        sources = []
+        for filename in filenames:
+            if filename is None:
+                sources.append(None)
+                continue
+            stat = os.stat(filename)
+            source = [os.path.abspath(filename), stat.st_size]
+            if self.hash_contents:
+                source.append(_hash_file(filename))
+            else:
+                source.append(stat.st_mtime_ns)
+            sources.append(source)
+
+        key = {
+            "version": CACHE_VERSION,
+            "sources": sources,
+            "anns_format": anns_format,
+            "options": options,
+            "size_limits": {
+                k: v for k, v in vars(size_limits).items() if k.isupper()
+            },
+        }
+        return hashlib.sha256(
+            json.dumps(key, sort_keys=True).encode("utf-8")
+        ).hexdigest()
+
+    def get(self, key: str) -> LazyDocumentList:
+        """Return the Documents stored under the given key.
+
+        Args:
+            key (str): The key.
+
+        Returns:
+            LazyDocumentList: The Documents, or None if there is no entry
+               with that key.
+        """
+        path = self._path(key)
+        try:
+            documents = load_binary(path)
+        except (OSError, ValueError):
+            return None
+        # Mark the entry as recently used
+        os.utime(path)
+        return documents
+
+    def put(self, key: str, documents: List, filenames: List[os.path]):
+        """Store the given Documents under the given key, then evict the
+        least recently used entries if the cache is too large.
+
+        Args:
+            key (str): The key.
+            documents (List[Document]): The Documents.
+            filenames (List[os.path]): The files the Documents were loaded
+               from, so that the entry can be found by
+               :func:`ParseCache.invalidate`.
+        """
+        path = self._path(key)
+        tmp_path = f"{path}.{os.getpid()}.tmp"
+        save_binary(documents, tmp_path)
+        os.replace(tmp_path, path)
+        with open(self._path(key, ".json"), "w", encoding="utf-8") as f:
+            json.dump(
+                {
+                    "sources": [
+                        os.path.abspath(fn) for fn in filenames if fn
+                    ],
+                    "created": time.time(),
+                },
+                f,
+            )
+        self.evict()
+
+    def invalidate(self, filename: os.path = None) -> int:
+        """Remove the entries created from the given file, or every entry if
+        no file is given.
+
+        Args:
+            filename (os.path, optional): The file whose entries should be
+               removed.
+
+        Returns:
+            int: The number of entries removed.
+        """
+        n_removed = 0
+        for key in self._keys():
+            if filename is not None:
+                try:
+                    with open(
+                        self._path(key, ".json"), "r", encoding="utf-8"
+                    ) as f:
+                        sources = json.load(f)["sources"]
+                except (OSError, ValueError, KeyError):
+                    sources = []
+                if os.path.abspath(filename) not in sources:
+                    continue
+            self._remove(key)
+            n_removed += 1
+        logger.debug(f"Removed {n_removed} entries from the parse cache.")
+        return n_removed
+
+    def evict(self):
+        """Remove the least recently used entries until the total size of
+        the cache is at most max_size.
+        """
+        entries = []
+        for key in self._keys():
+            try:
+                stat = os.stat(self._path(key))
+            except OSError:
+                continue
+            entries.append((stat.st_mtime, stat.st_size, key))
+
+        total_size = sum(size for _, size, _ in entries)
+        for _, size, key in sorted(entries):
+            if total_size <= self.max_size:
+                break
+            self._remove(key)
+            total_size -= size
+            logger.debug(f"Evicted {key} from the parse cache.")
+
+    def size(self) -> int:
+        """Return the total size of the cache, in bytes.
+
+        Returns:
+            int: The size of the cache.
+        """
+        return sum(
+            os.path.getsize(self._path(key))
+            for key in self._keys()
+            if os.path.exists(self._path(key))
+        )
+
+    def _keys(self) -> List[str]:
+        """Return the keys of every entry in the cache.
+
+        Returns:
+            List[str]: The keys.
+        """
+        return [
+            fn[: -len(".pgl")]
+            for fn in os.listdir(self.cache_dir)
+            if fn.endswith(".pgl")
+        ]
+
+    def _path(self, key: str, ext: str = ".pgl") -> str:
+        """Return the path of the given entry.
+
+        Args:
+            key (str): The key.
+            ext (str, optional): The extension (.pgl for the data, .json for
+               the metadata).
+
+        Returns:
+            str: The path.
+        """
+        return os.path.join(self.cache_dir, key + ext)
+
+    def _remove(self, key: str):
+        """Remove the given entry. Entries that are currently open can not
+        be removed on some platforms, in which case they are left in place.
+
+        Args:
+            key (str): The key.
+        """
+        for ext in [".pgl", ".json"]:
+            try:
+                os.remove(self._path(key, ext))
+            except OSError:
+                pass
+
+
+def _hash_file(filename: os.path) -> str:
+    """Return the sha256 hash of the contents of the given file.
+
+    Args:
+        filename (os.path): The file.
+
+    Returns:
+        str: The hash.
+    """
+    h = hashlib.sha256()
+    with open(filename, "rb") as f:
+        while block := f.read(_HASH_BLOCK_SIZE):
+            h.update(block)
+    return h.hexdigest()
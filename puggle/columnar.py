@@ -0,0 +1,706 @@
+"""A columnar (struct-of-arrays) backend for the Documents of a Dataset.
+
+Rather than one object per Document, Annotation, Mention and Relation, the
+Documents are stored as flat arrays, laid out in the same way as Puggle's
+binary format (see :mod:`puggle.binary_format`):
+
+* ``doc_token_offsets``, ``token_ids``: the tokens of document ``i`` are
+  ``token_ids[doc_token_offsets[i]:doc_token_offsets[i + 1]]``, where each
+  token is stored as its id in the Dataset's
+  :class:`~puggle.vocabulary.Vocabulary`.
+* ``doc_mention_offsets``, ``mention_doc``, ``mention_start``,
+  ``mention_end``, ``mention_label``, ``mention_id``, ``mention_listed``:
+  the mentions of each document (mentions that have been removed, but are
+  still referred to by a relation, have ``mention_listed`` set to 0).
+* ``doc_relation_offsets``, ``relation_head``, ``relation_tail``,
+  ``relation_label``, ``relation_listed``: the relations of each document,
+  where the head and tail are indexes into the mention arrays.
+
+Indexing a :class:`ColumnarDocumentList` returns a :class:`ColumnarDocument`,
+which behaves like a :class:`~puggle.Document.Document` but reads (and
+writes) its values from the arrays. Operations over the whole Dataset, such
+as counting or converting labels, work on the arrays directly.
+"""
+from array import array
+from collections import Counter
+from collections.abc import Sequence
+from itertools import compress
+from operator import and_, or_
+from typing import Dict, Iterable, List, Tuple
+
+from .Annotation import Annotation, _rebuild_annotation
+from .Document import Document
+from .Mention import Mention
+from .Relation import Relation
+from .vocabulary import Vocabulary
+
+
+class ColumnarDocumentList(Sequence):
+    """A list of Documents stored as flat arrays. Documents may be added via
+    :func:`append` or :func:`extend`, and their fields, document_index,
+    token_offset and labels may be changed, as can which of their mentions
+    and relations are kept. Any other change requires converting the
+    Documents back to objects (see :func:`puggle.Dataset.Dataset.to_objects`).
+
+    :var vocab: The Vocabulary of the tokens and labels.
+    """
+
+    def __init__(self, vocab: Vocabulary, documents: Iterable[Document] = ()):
+        """Create a new ColumnarDocumentList.
+
+        Args:
+            vocab (Vocabulary): The Vocabulary to store tokens and labels in.
+            documents (Iterable[Document], optional): Documents to add.
+        """
+        self.vocab = vocab
+
+        self.fields = []
+        self.document_index = []
+        self.token_offset = []
+        self.has_annotation = bytearray()
+
+        self.doc_token_offsets = array("q", [0])
+        self.token_ids = array("i")
+
+        self.doc_mention_offsets = array("q", [0])
+        self.mention_doc = array("i")
+        self.mention_start = array("i")
+        self.mention_end = array("i")
+        self.mention_label = array("i")
+        self.mention_id = array("i")
+        self.mention_listed = bytearray()
+
+        self.doc_relation_offsets = array("q", [0])
+        self.relation_head = array("q")
+        self.relation_tail = array("q")
+        self.relation_label = array("i")
+        self.relation_listed = bytearray()
+
+        self.extend(documents)
+
+    def append(self, document: Document):
+        """Add the given Document to the end of the list.
+
+        Args:
+            document (Document): The Document.
+        """
+        self.fields.append(document.fields)
+        self.document_index.append(document.document_index)
+        self.token_offset.append(document.token_offset)
+        annotation = document.annotation
+        self.has_annotation.append(annotation is not None)
+        if annotation is not None:
+            self._append_annotation(annotation)
+        self.doc_token_offsets.append(len(self.token_ids))
+        self.doc_mention_offsets.append(len(self.mention_start))
+        self.doc_relation_offsets.append(len(self.relation_head))
+
+    def _append_annotation(self, annotation: Annotation):
+        """Append the tokens, mentions and relations of the given Annotation
+        to the arrays.
+
+        Args:
+            annotation (Annotation): The Annotation.
+        """
+        add = self.vocab.add
+        self.token_ids.extend(map(add, annotation.tokens))
+
+        doc = len(self.fields) - 1
+        mention_idxs = {}
+
+        def add_mention(m: Mention, listed: bool):
+            mention_idxs[id(m)] = len(self.mention_start)
+            self.mention_doc.append(doc)
+            self.mention_start.append(m.start)
+            self.mention_end.append(m.end)
+            self.mention_label.append(add(m.label))
+            self.mention_id.append(m.mention_id)
+            self.mention_listed.append(listed)
+
+        for m in annotation.mentions:
+            add_mention(m, True)
+        # Relations may refer to mentions that have been removed from the
+        # list of mentions, so store those too
+        for r in annotation.relations:
+            for m in (r.start, r.end):
+                if id(m) not in mention_idxs:
+                    add_mention(m, False)
+        for r in annotation.relations:
+            self.relation_head.append(mention_idxs[id(r.start)])
+            self.relation_tail.append(mention_idxs[id(r.end)])
+            self.relation_label.append(add(r.label))
+            self.relation_listed.append(True)
+
+    def extend(self, documents: Iterable[Document]):
+        """Add the given Documents to the end of the list.
+
+        Args:
+            documents (Iterable[Document]): The Documents.
+        """
+        for document in documents:
+            self.append(document)
+
+    def __iadd__(self, documents: Iterable[Document]):
+        self.extend(documents)
+        return self
+
+    def copy(self) -> "ColumnarDocumentList":
+        """Return a copy of this list, whose Documents can be changed without
+        changing this list. The Vocabulary is shared.
+
+        Returns:
+            ColumnarDocumentList: The copy.
+        """
+        docs = ColumnarDocumentList.__new__(ColumnarDocumentList)
+        for name, value in vars(self).items():
+            # Every attribute other than the vocab is an array or list
+            setattr(docs, name, value if name == "vocab" else value[:])
+        return docs
+
+    def __len__(self) -> int:
+        return len(self.fields)
+
+    def __getitem__(self, i):
+        if isinstance(i, slice):
+            return [ColumnarDocument(self, j) for j in range(len(self))[i]]
+        if i < 0:
+            i += len(self)
+        if not 0 <= i < len(self):
+            raise IndexError("document index out of range")
+        return ColumnarDocument(self, i)
+
+    def document(self, i: int) -> Document:
+        """Build the Document at the given index as a plain (non-columnar)
+        :class:`~puggle.Document.Document`.
+
+        Args:
+            i (int): The index of the document.
+
+        Returns:
+            Document: The Document.
+        """
+        annotation = None
+        if self.has_annotation[i]:
+            annotation = self._annotation(i)
+        return Document(
+            self.fields[i],
+            annotation,
+            self.document_index[i],
+            self.token_offset[i],
+        )
+
+    def _annotation(self, i: int) -> Annotation:
+        """Build the Annotation of the document at the given index.
+
+        Args:
+            i (int): The index of the document.
+
+        Returns:
+            Annotation: The Annotation.
+        """
+        string = self.vocab.string
+        tokens = [
+            string(t)
+            for t in self.token_ids[
+                self.doc_token_offsets[i] : self.doc_token_offsets[i + 1]
+            ]
+        ]
+
+        # Listed mentions must come first
+        m_range = range(
+            self.doc_mention_offsets[i], self.doc_mention_offsets[i + 1]
+        )
+        order = [j for j in m_range if self.mention_listed[j]]
+        n_listed = len(order)
+        order += [j for j in m_range if not self.mention_listed[j]]
+        mention_idxs = {j: k for k, j in enumerate(order)}
+        mentions = [
+            (
+                self.mention_start[j],
+                self.mention_end[j],
+                string(self.mention_label[j]),
+                self.mention_id[j],
+            )
+            for j in order
+        ]
+
+        relations = [
+            (
+                mention_idxs[self.relation_head[k]],
+                mention_idxs[self.relation_tail[k]],
+                string(self.relation_label[k]),
+            )
+            for k in range(
+                self.doc_relation_offsets[i], self.doc_relation_offsets[i + 1]
+            )
+            if self.relation_listed[k]
+        ]
+        return _rebuild_annotation(tokens, mentions, n_listed, relations)
+
+    def unique_token_count(self) -> int:
+        """Return the number of distinct tokens.
+
+        Returns:
+            int: The number of distinct tokens.
+        """
+        return len(set(self.token_ids))
+
+    def mention_label_counts(
+        self, document_level: bool = False
+    ) -> Dict[str, int]:
+        """Return the number of (listed) mentions with each label.
+
+        Args:
+            document_level (bool, optional): If True, count the number of
+               documents in which each label appears instead.
+
+        Returns:
+            Dict[str, int]: The count of each label, in order of first
+            appearance.
+        """
+        labels = compress(self.mention_label, self.mention_listed)
+        if document_level:
+            docs = compress(self.mention_doc, self.mention_listed)
+            labels = (label for _, label in dict.fromkeys(zip(docs, labels)))
+        string = self.vocab.string
+        return {string(l): n for l, n in Counter(labels).items()}
+
+    def mention_labels(self) -> List[str]:
+        """Return the distinct labels of the (listed) mentions.
+
+        Returns:
+            List[str]: The labels, in order of first appearance.
+        """
+        return list(self.mention_label_counts())
+
+    def relation_labels(self) -> List[str]:
+        """Return the distinct labels of the (listed) relations.
+
+        Returns:
+            List[str]: The labels, in order of first appearance.
+        """
+        labels = compress(self.relation_label, self.relation_listed)
+        return list(map(self.vocab.string, dict.fromkeys(labels)))
+
+    def relabel_mentions(self, mapping: Dict[str, str]) -> int:
+        """Change the labels of the (listed) mentions according to the given
+        mapping.
+
+        Args:
+            mapping (Dict[str, str]): The new label of each label to change.
+
+        Returns:
+            int: The number of mentions whose label was in the mapping.
+        """
+        self.mention_label, n_modified = self._relabel(
+            self.mention_label, self.mention_listed, mapping
+        )
+        return n_modified
+
+    def relabel_relations(self, mapping: Dict[str, str]) -> int:
+        """Change the labels of the relations according to the given
+        mapping.
+
+        Args:
+            mapping (Dict[str, str]): The new label of each label to change.
+
+        Returns:
+            int: The number of relations whose label was in the mapping.
+        """
+        self.relation_label, n_modified = self._relabel(
+            self.relation_label, self.relation_listed, mapping
+        )
+        return n_modified
+
+    def _relabel(
+        self, labels: array, listed: bytearray, mapping: Dict[str, str]
+    ) -> Tuple[array, int]:
+        """Apply the given mapping to the listed items of the given array of
+        label ids.
+
+        Args:
+            labels (array): The label ids.
+            listed (bytearray): Whether each item is listed.
+            mapping (Dict[str, str]): The new label of each label to change.
+
+        Returns:
+            array: The new label ids.
+            int: The number of listed items whose label was in the mapping.
+        """
+        id_map = {
+            self.vocab.id(old): self.vocab.add(new)
+            for old, new in mapping.items()
+            if old in self.vocab
+        }
+        n_modified = sum(map(id_map.__contains__, compress(labels, listed)))
+        if 0 in listed:
+            labels = array(
+                "i",
+                [
+                    id_map.get(l, l) if k else l
+                    for l, k in zip(labels, listed)
+                ],
+            )
+        else:
+            labels = array("i", map(id_map.get, labels, labels))
+        return labels, n_modified
+
+    def drop_mention_label(self, label: str) -> Tuple[int, int]:
+        """Remove the mentions with the given label, along with any relations
+        for which neither the head nor the tail is still listed.
+
+        Args:
+            label (str): The label.
+
+        Returns:
+            int: The number of mentions removed.
+            int: The number of relations removed.
+        """
+        label_id = self.vocab.id(label)
+        if label_id is None:
+            return 0, 0
+
+        n_mentions = self.mention_listed.count(1)
+        listed = self.mention_listed = bytearray(
+            map(
+                and_,
+                self.mention_listed,
+                map(label_id.__ne__, self.mention_label),
+            )
+        )
+
+        n_relations = self.relation_listed.count(1)
+        self.relation_listed = bytearray(
+            map(
+                and_,
+                self.relation_listed,
+                map(
+                    or_,
+                    map(listed.__getitem__, self.relation_head),
+                    map(listed.__getitem__, self.relation_tail),
+                ),
+            )
+        )
+        return (
+            n_mentions - listed.count(1),
+            n_relations - self.relation_listed.count(1),
+        )
+
+    def drop_relation_label(self, label: str) -> int:
+        """Remove the relations with the given label.
+
+        Args:
+            label (str): The label.
+
+        Returns:
+            int: The number of relations removed.
+        """
+        label_id = self.vocab.id(label)
+        if label_id is None:
+            return 0
+
+        n_relations = self.relation_listed.count(1)
+        self.relation_listed = bytearray(
+            map(
+                and_,
+                self.relation_listed,
+                map(label_id.__ne__, self.relation_label),
+            )
+        )
+        return n_relations - self.relation_listed.count(1)
+
+    def __repr__(self):
+        return f"<ColumnarDocumentList of {len(self)} documents>"
+
+
+class ColumnarDocument(Document):
+    """A view of a single Document of a :class:`ColumnarDocumentList`."""
+
+    __slots__ = ("_docs", "_i", "_annotation")
+
+    def __init__(self, docs: ColumnarDocumentList, i: int):
+        """Create a new ColumnarDocument.
+
+        Args:
+            docs (ColumnarDocumentList): The list the Document belongs to.
+            i (int): The index of the Document.
+        """
+        self._docs = docs
+        self._i = i
+        self._annotation = None
+
+    @property
+    def fields(self):
+        return self._docs.fields[self._i]
+
+    @fields.setter
+    def fields(self, fields):
+        self._docs.fields[self._i] = fields
+
+    @property
+    def document_index(self) -> int:
+        return self._docs.document_index[self._i]
+
+    @document_index.setter
+    def document_index(self, document_index: int):
+        self._docs.document_index[self._i] = document_index
+
+    @property
+    def token_offset(self) -> int:
+        return self._docs.token_offset[self._i]
+
+    @token_offset.setter
+    def token_offset(self, token_offset: int):
+        self._docs.token_offset[self._i] = token_offset
+
+    @property
+    def annotation(self) -> Annotation:
+        if not self._docs.has_annotation[self._i]:
+            return None
+        # Keep the same view, so that its mentions are the same objects
+        # each time they are accessed
+        if self._annotation is None:
+            self._annotation = ColumnarAnnotation(self._docs, self._i)
+        return self._annotation
+
+    @annotation.setter
+    def annotation(self, annotation: Annotation):
+        raise ValueError(
+            "The annotation of a columnar Document cannot be replaced."
+        )
+
+
+class ColumnarAnnotation(Annotation):
+    """A view of the Annotation of a single Document of a
+    :class:`ColumnarDocumentList`. Mentions and relations may be removed
+    by assigning a subset of them to `mentions` or `relations`.
+    """
+
+    __slots__ = ("_docs", "_i", "_mention_views", "_relation_views")
+
+    def __init__(self, docs: ColumnarDocumentList, i: int):
+        """Create a new ColumnarAnnotation.
+
+        Args:
+            docs (ColumnarDocumentList): The list the Document belongs to.
+            i (int): The index of the Document.
+        """
+        self._docs = docs
+        self._i = i
+        self._mention_views = {
+            j: ColumnarMention(docs, j)
+            for j in range(
+                docs.doc_mention_offsets[i], docs.doc_mention_offsets[i + 1]
+            )
+        }
+        self._relation_views = [
+            ColumnarRelation(self, k)
+            for k in range(
+                docs.doc_relation_offsets[i], docs.doc_relation_offsets[i + 1]
+            )
+        ]
+
+    @property
+    def token_ids(self) -> array:
+        offsets = self._docs.doc_token_offsets
+        return self._docs.token_ids[offsets[self._i] : offsets[self._i + 1]]
+
+    @property
+    def tokens(self) -> List[str]:
+        return list(map(self._docs.vocab.string, self.token_ids))
+
+    @tokens.setter
+    def tokens(self, tokens: List[str]):
+        raise ValueError(
+            "The tokens of a columnar Document cannot be changed."
+        )
+
+    @property
+    def mentions(self) -> List[Mention]:
+        listed = self._docs.mention_listed
+        return [m for j, m in self._mention_views.items() if listed[j]]
+
+    @mentions.setter
+    def mentions(self, mentions: List[Mention]):
+        self._set_listed(
+            self._docs.mention_listed, self._mention_views, mentions
+        )
+
+    @property
+    def relations(self) -> List[Relation]:
+        listed = self._docs.relation_listed
+        return [r for r in self._relation_views if listed[r._k]]
+
+    @relations.setter
+    def relations(self, relations: List[Relation]):
+        self._set_listed(
+            self._docs.relation_listed,
+            {r._k: r for r in self._relation_views},
+            relations,
+        )
+
+    @property
+    def _mention_ids_map(self) -> Dict[int, Mention]:
+        return {m.mention_id: m for m in self._mention_views.values()}
+
+    @property
+    def _indexes(self) -> None:
+        # The listed mentions and relations may be changed by the list
+        # itself (e.g. by drop_mention_label), so indexes are never cached
+        return None
+
+    @_indexes.setter
+    def _indexes(self, indexes):
+        pass
+
+    def _set_listed(self, listed: bytearray, views: Dict, items: List):
+        """Set which of the given views are listed.
+
+        Args:
+            listed (bytearray): Whether each item is listed.
+            views (Dict): The views of this Annotation, by index.
+            items (List): The views that should be listed, which must be in
+               their original order.
+
+        Raises:
+            ValueError: If any of the items is not one of the views, or they
+               are out of order.
+        """
+        positions = {id(view): j for j, view in views.items()}
+        idxs = [positions.get(id(item)) for item in items]
+        if None in idxs or idxs != sorted(set(idxs)):
+            raise ValueError(
+                "The mentions and relations of a columnar Document can only "
+                "be removed, not added or reordered."
+            )
+        for j in views:
+            listed[j] = False
+        for j in idxs:
+            listed[j] = True
+
+    def _mention_view(self, j: int) -> "ColumnarMention":
+        """Return the view of the given mention.
+
+        Args:
+            j (int): The index of the mention.
+
+        Returns:
+            ColumnarMention: The view.
+        """
+        return self._mention_views[j]
+
+
+class ColumnarMention(Mention):
+    """A view of a single mention of a :class:`ColumnarDocumentList`."""
+
+    __slots__ = ("_docs", "_j")
+
+    def __init__(self, docs: ColumnarDocumentList, j: int):
+        """Create a new ColumnarMention.
+
+        Args:
+            docs (ColumnarDocumentList): The list the mention belongs to.
+            j (int): The index of the mention.
+        """
+        self._docs = docs
+        self._j = j
+
+    @property
+    def start(self) -> int:
+        return self._docs.mention_start[self._j]
+
+    @property
+    def end(self) -> int:
+        return self._docs.mention_end[self._j]
+
+    @property
+    def mention_id(self) -> int:
+        return self._docs.mention_id[self._j]
+
+    @property
+    def tokens(self) -> List[str]:
+        docs = self._docs
+        offset = docs.doc_token_offsets[docs.mention_doc[self._j]]
+        return list(
+            map(
+                docs.vocab.string,
+                docs.token_ids[offset + self.start : offset + self.end],
+            )
+        )
+
+    @property
+    def sentence(self) -> List[str]:
+        docs = self._docs
+        i = docs.mention_doc[self._j]
+        offsets = docs.doc_token_offsets
+        return list(
+            map(
+                docs.vocab.string,
+                docs.token_ids[offsets[i] : offsets[i + 1]],
+            )
+        )
+
+    @property
+    def text(self) -> str:
+        return " ".join(self.tokens)
+
+    @property
+    def label(self) -> str:
+        return self._docs.vocab.string(self.label_id)
+
+    @label.setter
+    def label(self, label: str):
+        self.label_id = self._docs.vocab.add(label)
+
+    @property
+    def label_id(self) -> int:
+        return self._docs.mention_label[self._j]
+
+    @label_id.setter
+    def label_id(self, label_id: int):
+        self._docs.mention_label[self._j] = label_id
+
+
+class ColumnarRelation(Relation):
+    """A view of a single relation of a :class:`ColumnarDocumentList`."""
+
+    __slots__ = ("_annotation", "_k")
+
+    def __init__(self, annotation: ColumnarAnnotation, k: int):
+        """Create a new ColumnarRelation.
+
+        Args:
+            annotation (ColumnarAnnotation): The Annotation the relation
+               belongs to.
+            k (int): The index of the relation.
+        """
+        self._annotation = annotation
+        self._k = k
+
+    @property
+    def start(self) -> Mention:
+        return self._annotation._mention_view(
+            self._annotation._docs.relation_head[self._k]
+        )
+
+    @property
+    def end(self) -> Mention:
+        return self._annotation._mention_view(
+            self._annotation._docs.relation_tail[self._k]
+        )
+
+    @property
+    def label(self) -> str:
+        return self._annotation._docs.vocab.string(self.label_id)
+
+    @label.setter
+    def label(self, label: str):
+        self.label_id = self._annotation._docs.vocab.add(label)
+
+    @property
+    def label_id(self) -> int:
+        return self._annotation._docs.relation_label[self._k]
+
+    @label_id.setter
+    def label_id(self, label_id: int):
+        self._annotation._docs.relation_label[self._k] = label_id
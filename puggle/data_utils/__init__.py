@@ -3,5 +3,17 @@ from .sampling import (
     random_sample,
     smart_sample,
 )
-from .statistics import get_unique_tokens_count, get_entity_label_counts
+from .statistics import (
+    get_unique_tokens_count,
+    get_entity_label_counts,
+    memory_usage,
+)
 from .manipulation import drop_entity_class, drop_relation_class
+from .querying import query
+from .pipeline import (
+    LabelMap,
+    Pipeline,
+    apply_pipeline,
+    remap_entity_labels,
+    remap_relation_labels,
+)
@@ -1,6 +1,13 @@
 """Tools for manipulating Puggle datasets. When this library is imported,
 the functions will be added to the Dataset class."""
-from puggle import Dataset
+from itertools import tee
+from typing import Callable, Dict, Iterable, Iterator, List, Tuple, Union
+
+from puggle import Annotation, Dataset, Document
+from puggle.Dataset import _map_in_pool
+from puggle.Document import build_sentences, join_sentences, split_annotation
+from puggle.Relation import Relation
+from puggle.columnar import ColumnarDocumentList
 from puggle.logger import logger
 
 
@@ -17,8 +24,15 @@ def drop_entity_class(self: Dataset, entity_class: str):
     dataset = self
     n_removed_e = 0
     n_removed_r = 0
-    for doc in dataset.documents:
-        a = doc.annotation
+    dataset._prepare_write()
+    if isinstance(dataset.documents, ColumnarDocumentList):
+        n_removed_e, n_removed_r = dataset.documents.drop_mention_label(
+            entity_class
+        )
+    for i, doc in _object_documents(dataset, "entities", entity_class):
+        if not any(m.label == entity_class for m in doc.annotation.mentions):
+            continue
+        a = dataset._writable_document(i).annotation
 
         updated_mentions = list(
             filter(lambda m: m.label != entity_class, a.mentions)
@@ -27,18 +41,22 @@ def drop_entity_class(self: Dataset, entity_class: str):
         a.mentions = updated_mentions
 
         # Remove connected relations
+        mentions = set(a.mentions)
         updated_relations = list(
             filter(
-                lambda r: ((r.start in a.mentions) or (r.end in a.mentions)),
+                lambda r: ((r.start in mentions) or (r.end in mentions)),
                 a.relations,
             )
         )
         n_removed_r += len(a.relations) - len(updated_relations)
         a.relations = updated_relations
+    if dataset.index is not None:
+        dataset.index.drop_entity_label(entity_class, dataset.documents)
 
-    logger.info(
-        f'Drop Entity class "{entity_class}": removed {n_removed_e} entities '
-        f"and {n_removed_r} connected relations."
+    _log_step(
+        "drop_entity_class",
+        (entity_class,),
+        {"entities_removed": n_removed_e, "relations_removed": n_removed_r},
     )
 
 
@@ -53,15 +71,25 @@ def drop_relation_class(self: Dataset, relation_class: str):
     """
     dataset = self
     n_removed = 0
-    for doc in dataset.documents:
-        a = doc.annotation
+    dataset._prepare_write()
+    if isinstance(dataset.documents, ColumnarDocumentList):
+        n_removed = dataset.documents.drop_relation_label(relation_class)
+    for i, doc in _object_documents(dataset, "relations", relation_class):
+        relations = doc.annotation.relations
+        if not any(r.label == relation_class for r in relations):
+            continue
+        a = dataset._writable_document(i).annotation
         n_removed += sum(r.label == relation_class for r in a.relations)
         a.relations = list(
             filter(lambda r: r.label != relation_class, a.relations)
         )
+    if dataset.index is not None:
+        dataset.index.drop_relation_label(relation_class)
 
-    logger.info(
-        f'Drop Relation class "{relation_class}": removed {n_removed} relations.'
+    _log_step(
+        "drop_relation_class",
+        (relation_class,),
+        {"relations_removed": n_removed},
     )
 
 
@@ -76,15 +104,26 @@ def convert_entity_class(self: Dataset, original_ec: str, modified_ec: str):
         modified_ec (str): The entity class to change to.
     """
     n_modified = 0
-    for doc in self.documents:
-        a = doc.annotation
+    self._prepare_write()
+    if isinstance(self.documents, ColumnarDocumentList):
+        n_modified = self.documents.relabel_mentions(
+            {original_ec: modified_ec}
+        )
+    for i, doc in _object_documents(self, "entities", original_ec):
+        if not any(m.label == original_ec for m in doc.annotation.mentions):
+            continue
+        a = self._writable_document(i).annotation
         for m in a.mentions:
             if m.label == original_ec:
-                m.label = modified_ec
+                self.vocab.set_label(m, modified_ec)
                 n_modified += 1
-    logger.info(
-        f'Convert Entity class "{original_ec}" -> "{modified_ec}": '
-        f" modified {n_modified} entities."
+        a.clear_indexes()
+    if self.index is not None:
+        self.index.relabel_entities({original_ec: modified_ec})
+    _log_step(
+        "convert_entity_class",
+        (original_ec, modified_ec),
+        {"entities_modified": n_modified},
     )
 
 
@@ -99,15 +138,25 @@ def convert_relation_class(self: Dataset, original_rc: str, modified_rc: str):
         modified_ec (str): The relation class to change to.
     """
     n_modified = 0
-    for doc in self.documents:
-        a = doc.annotation
+    self._prepare_write()
+    if isinstance(self.documents, ColumnarDocumentList):
+        n_modified = self.documents.relabel_relations(
+            {original_rc: modified_rc}
+        )
+    for i, doc in _object_documents(self, "relations", original_rc):
+        if not any(r.label == original_rc for r in doc.annotation.relations):
+            continue
+        a = self._writable_document(i).annotation
         for r in a.relations:
             if r.label == original_rc:
-                r.label = modified_rc
+                self.vocab.set_label(r, modified_rc)
                 n_modified += 1
-    logger.info(
-        f'Convert Relation class "{original_rc}" -> "{modified_rc}": '
-        f"modified {n_modified} relations."
+    if self.index is not None:
+        self.index.relabel_relations({original_rc: modified_rc})
+    _log_step(
+        "convert_relation_class",
+        (original_rc, modified_rc),
+        {"relations_modified": n_modified},
     )
 
 
@@ -119,14 +168,31 @@ def flatten_all_entities(self: Dataset):
     ["state/desirable"] becomes ["state"], etc.
     """
     n_modified = 0
-    for doc in self.documents:
+    self._prepare_write()
+    if isinstance(self.documents, ColumnarDocumentList):
+        n_modified = self.documents.relabel_mentions(
+            {
+                label: label.split("/")[0]
+                for label in self.documents.mention_labels()
+            }
+        )
+    for i, doc in _object_documents(self):
         a = doc.annotation
-        for m in a.mentions:
-            m.label = m.label.split("/")[0]
         n_modified += len(a.mentions)
-    logger.info(
-        f"Successfully flattened all {n_modified} entities in dataset."
-    )
+        if not any("/" in m.label for m in a.mentions):
+            continue
+        a = self._writable_document(i).annotation
+        for m in a.mentions:
+            self.vocab.set_label(m, m.label.split("/")[0])
+        a.clear_indexes()
+    if self.index is not None:
+        self.index.relabel_entities(
+            {
+                label: label.split("/")[0]
+                for label in self.index.keys("entities")
+            }
+        )
+    _log_step("flatten_all_entities", (), {"entities_modified": n_modified})
 
 
 def flatten_all_relations(self: Dataset):
@@ -137,38 +203,79 @@ def flatten_all_relations(self: Dataset):
     ["state/desirable"] becomes ["state"], etc.
     """
     n_modified = 0
-    for doc in self.documents:
+    self._prepare_write()
+    if isinstance(self.documents, ColumnarDocumentList):
+        n_modified = self.documents.relabel_relations(
+            {
+                label: label.split("/")[0]
+                for label in self.documents.relation_labels()
+            }
+        )
+    for i, doc in _object_documents(self):
         a = doc.annotation
-        for r in a.relations:
-            r.label = r.label.split("/")[0]
         n_modified += len(a.relations)
-    logger.info(
-        f"Successfully flattened all {n_modified} relations in dataset."
-    )
+        if not any("/" in r.label for r in a.relations):
+            continue
+        a = self._writable_document(i).annotation
+        for r in a.relations:
+            self.vocab.set_label(r, r.label.split("/")[0])
+    if self.index is not None:
+        self.index.relabel_relations(
+            {
+                label: label.split("/")[0]
+                for label in self.index.keys("relations")
+            }
+        )
+    _log_step("flatten_all_relations", (), {"relations_modified": n_modified})
 
 
-def split_sentences(self: Dataset, delimiter="."):
+def split_sentences(self: Dataset, delimiter=".", workers: int = 1):
     """Split each document of this Dataset into sentences.
 
     Args:
         delimiter (str, optional): The delimiter to use for splitting.
+        workers (int, optional): The number of processes to use. If greater
+           than 1, the annotations are sent to a process pool in batches,
+           and the sentences are reassembled in their original order.
 
     Returns:
         Dataset: A new dataset, where each document is a sentence. Each doc
         also has a document_index, allowing the user to know which doc
         the sentence originally came from.
+        Dict: The number of relations that were removed due to spanning
+        multiple sentences, and the relations themselves (by the
+        document_index of their document), which can be reattached with
+        :func:`merge_sentences`.
     """
-    new_dataset = Dataset()
+    new_dataset = Dataset(vocab=self.vocab)
     all_relations_removed = []
+    removed_relations = {}
 
-    for i, d in enumerate(self.documents):
-        sents, relations_removed = d.split_sentences(delimiter=delimiter)
+    if workers > 1:
+        splits = _split_documents_parallel(self.documents, delimiter, workers)
+    else:
+        splits = (
+            d.split_sentences(delimiter=delimiter) for d in self.documents
+        )
+
+    # The tokens of each sentence are taken from its Document, so only
+    # their ids need to be copied into the (shared) Vocabulary
+    vocab = new_dataset.vocab
+    sentences = []
+    for i, (sents, relations_removed) in enumerate(splits):
         for s in sents:
             s.document_index = i
-            new_dataset.add_document(s)
+            vocab.add_annotation(s.annotation, s.annotation.token_ids)
+        sentences += sents
         all_relations_removed += relations_removed
+        if relations_removed:
+            removed_relations[i] = relations_removed
+    new_dataset.documents = sentences
 
-    results = {"relations_removed": len(all_relations_removed)}
+    results = {
+        "relations_removed": len(all_relations_removed),
+        "removed_relations": removed_relations,
+    }
 
     logger.info("Original dataset: %s" % self.get_stats())
 
@@ -186,6 +293,233 @@ def split_sentences(self: Dataset, delimiter="."):
     return new_dataset, results
 
 
+def _split_documents_parallel(
+    documents: Iterable[Document], delimiter: str, workers: int
+) -> Iterator[Tuple[List[Document], List[Relation]]]:
+    """Split the given Documents into sentences using a pool of worker
+    processes (see :func:`puggle.Document.Document.split_sentences`). Only
+    the Annotations are sent to the workers, which send back the spans,
+    mentions and relations of each sentence as tuples, so that as little as
+    possible needs to be pickled and unpickled by the main process.
+
+    Args:
+        documents (Iterable[Document]): The Documents.
+        delimiter (str): The delimiter to use for splitting.
+        workers (int): The number of worker processes.
+
+    Yields:
+        Tuple[List[Document], List[Relation]]: The sentences of each
+        Document, and the relations that were removed.
+    """
+    documents, to_split = tee(documents)
+    results = _map_in_pool(
+        _split_annotation_batch,
+        (d.annotation for d in to_split),
+        (delimiter,),
+        workers,
+    )
+    for d, (sentences, removed) in zip(documents, results):
+        yield build_sentences(d, sentences, removed)
+
+
+def _split_annotation_batch(annotations: List[Annotation], delimiter: str):
+    """Split a batch of Annotations into sentences (see
+    :func:`puggle.Document.split_annotation`). Run by each worker of
+    :func:`_split_documents_parallel`.
+
+    Args:
+        annotations (List[Annotation]): The Annotations.
+        delimiter (str): The delimiter to use for splitting.
+
+    Returns:
+        List[Tuple]: The sentences of each Annotation, and the indexes of
+        the relations that were removed.
+    """
+    return [split_annotation(a, delimiter) for a in annotations]
+
+
+def merge_sentences(
+    self: Dataset,
+    delimiter: str = ".",
+    removed_relations: Dict[int, List[Relation]] = None,
+):
+    """Merge the sentences of this Dataset (as split by
+    :func:`split_sentences`) back into their original documents, by
+    joining the sentences with the same document_index in the order they
+    appear, with the delimiter between each. Documents without a
+    document_index are kept as they are. A delimiter at the very end of a
+    document is not restored.
+
+    Args:
+        delimiter (str, optional): The delimiter that the sentences were
+           split by.
+        removed_relations (Dict[int, List[Relation]], optional): The
+           relations to reattach to each document, by document_index, such
+           as the "removed_relations" returned by :func:`split_sentences`.
+           Their heads and tails are linked to the mentions with the same
+           span and label, which are added if they no longer exist (e.g.
+           mentions that spanned multiple sentences).
+
+    Returns:
+        Dataset: A new dataset, with a document for each distinct
+        document_index, in the order they first appear.
+        Dict: The number of relations that were reattached.
+    """
+    removed_relations = removed_relations or {}
+    groups = {}
+    for d in self.documents:
+        # Documents without a document_index are grouped by themselves
+        key = d.document_index if d.document_index is not None else d
+        group = groups.get(key)
+        if group is None:
+            groups[key] = [d]
+        else:
+            group.append(d)
+
+    new_dataset = Dataset(vocab=self.vocab)
+    documents = []
+    n_reattached = 0
+    for sents in groups.values():
+        document_index = sents[0].document_index
+        relations = ()
+        if document_index is not None:
+            relations = removed_relations.get(document_index, ())
+        n_reattached += len(relations)
+        documents.append(join_sentences(sents, delimiter, relations))
+    new_dataset._add_documents(documents)
+
+    results = {"relations_reattached": n_reattached}
+
+    logger.info(
+        "Merged %d sentences into %d documents, reattaching %d relations."
+        % (len(self.documents), len(documents), n_reattached)
+    )
+
+    return new_dataset, results
+
+
+def split_windows(
+    self: Dataset,
+    max_tokens: int,
+    overlap: int = 0,
+    delimiters: Union[str, Iterable[str], Callable[[str], bool]] = ".",
+):
+    """Split each document of this Dataset into windows of at most
+    max_tokens tokens, such as to fit the input size of a model, which end
+    at sentence boundaries where possible (see
+    :func:`puggle.Document.Document.split_windows`).
+
+    Args:
+        max_tokens (int): The maximum number of tokens of each window.
+        overlap (int, optional): The maximum number of tokens that each
+           window shares with the previous window of its document.
+        delimiters (Union[str, Iterable[str], Callable[[str], bool]],
+           optional): The token (or tokens) that end a sentence, or a
+           function returning whether a token ends a sentence. None to cut
+           windows at exactly max_tokens tokens.
+
+    Returns:
+        Dataset: A new dataset, where each document is a window. Each doc
+        also has a document_index and a token_offset, allowing the user to
+        know which doc the window originally came from, and where in it.
+        Dict: The number of relations that were removed due to not fitting
+        in any window.
+
+    Raises:
+        ValueError: If max_tokens is less than 1, or overlap is not less
+           than max_tokens.
+    """
+    new_dataset = Dataset(vocab=self.vocab)
+    vocab = new_dataset.vocab
+    windows = []
+    n_relations_removed = 0
+    for i, d in enumerate(self.documents):
+        wins, relations_removed = d.split_windows(
+            max_tokens, overlap, delimiters
+        )
+        for w in wins:
+            w.document_index = i
+            vocab.add_annotation(w.annotation, w.annotation.token_ids)
+        windows += wins
+        n_relations_removed += len(relations_removed)
+    new_dataset.documents = windows
+
+    results = {"relations_removed": n_relations_removed}
+
+    logger.info(
+        "Split %d documents into %d windows of at most %d tokens."
+        % (len(self.documents), len(windows), max_tokens)
+    )
+    logger.info(
+        "Removed %d relations that did not fit in any window."
+        % n_relations_removed
+    )
+
+    return new_dataset, results
+
+
+# The message logged by each manipulation, given its arguments and counts
+_STEP_MESSAGES = {
+    "drop_entity_class": 'Drop Entity class "{0}": removed {entities_removed} '
+    "entities and {relations_removed} connected relations.",
+    "drop_relation_class": 'Drop Relation class "{0}": removed '
+    "{relations_removed} relations.",
+    "convert_entity_class": 'Convert Entity class "{0}" -> "{1}":  modified '
+    "{entities_modified} entities.",
+    "convert_relation_class": 'Convert Relation class "{0}" -> "{1}": '
+    "modified {relations_modified} relations.",
+    "flatten_all_entities": "Successfully flattened all {entities_modified} "
+    "entities in dataset.",
+    "flatten_all_relations": "Successfully flattened all "
+    "{relations_modified} relations in dataset.",
+    "remap_entity_labels": "Remap Entity labels ({0}): modified "
+    "{entities_modified} entities, removed {entities_removed} entities and "
+    "{relations_removed} connected relations.",
+    "remap_relation_labels": "Remap Relation labels ({0}): modified "
+    "{relations_modified} relations, removed {relations_removed} relations.",
+}
+
+
+def _log_step(operation: str, args: Tuple, counts: Dict[str, int]):
+    """Log the number of mentions and relations removed or modified by a
+    manipulation.
+
+    Args:
+        operation (str): The name of the manipulation function.
+        args (Tuple): The arguments it was called with.
+        counts (Dict[str, int]): The number of entities and relations it
+           removed or modified.
+    """
+    logger.info(_STEP_MESSAGES[operation].format(*args, **counts))
+
+
+def _object_documents(dataset: Dataset, kind: str = None, key=None):
+    """Return the Documents of the given Dataset that are stored as objects
+    (with their indexes), i.e. none if the Dataset uses the columnar backend
+    (whose Documents are manipulated as arrays instead). If the Dataset has
+    an index, and a kind and key are given, only the Documents containing
+    the key are returned. To change a Document, first get a writable copy
+    of it with :func:`puggle.Dataset.Dataset._writable_document`.
+
+    Args:
+        dataset (Dataset): The Dataset.
+        kind (str, optional): The kind of key (see
+           :data:`puggle.inverted_index.KINDS`).
+        key (optional): The key.
+
+    Returns:
+        Iterable[Tuple[int, Document]]: The index of each Document, and the
+        Document.
+    """
+    if isinstance(dataset.documents, ColumnarDocumentList):
+        return []
+    if dataset.index is not None and kind is not None:
+        return [
+            (i, dataset.documents[i]) for i in dataset.index.lookup(kind, key)
+        ]
+    return enumerate(dataset.documents)
+
+
 Dataset.drop_entity_class = drop_entity_class
 Dataset.drop_relation_class = drop_relation_class
 Dataset.convert_entity_class = convert_entity_class
@@ -193,3 +527,5 @@ Dataset.convert_relation_class = convert_relation_class
 Dataset.flatten_all_entities = flatten_all_entities
 Dataset.flatten_all_relations = flatten_all_relations
 Dataset.split_sentences = split_sentences
+Dataset.merge_sentences = merge_sentences
+Dataset.split_windows = split_windows
@@ -0,0 +1,702 @@
+"""A pipeline of manipulations (see :mod:`puggle.data_utils.manipulation`)
+that are applied to a Dataset together, in a single pass over its
+Documents, and bulk remapping of labels. When this library is imported,
+:func:`apply_pipeline`, :func:`remap_entity_labels` and
+:func:`remap_relation_labels` will be added to the Dataset class."""
+import re
+from array import array
+from bisect import bisect_left
+from collections import Counter
+from typing import Dict, Iterable, List, Optional, Tuple, Union
+
+from puggle import Dataset
+from puggle.columnar import ColumnarDocumentList
+from puggle.data_utils.manipulation import _log_step, _object_documents
+
+# The counts reported by each manipulation
+_STEP_COUNTS = {
+    "drop_entity_class": ("entities_removed", "relations_removed"),
+    "drop_relation_class": ("relations_removed",),
+    "convert_entity_class": ("entities_modified",),
+    "convert_relation_class": ("relations_modified",),
+    "flatten_all_entities": ("entities_modified",),
+    "flatten_all_relations": ("relations_modified",),
+    "remap_entity_labels": (
+        "entities_modified",
+        "entities_removed",
+        "relations_removed",
+    ),
+    "remap_relation_labels": ("relations_modified", "relations_removed"),
+}
+
+# The manipulations that may remove mentions (and so relations)
+_ENTITY_DROPS = ("drop_entity_class", "remap_entity_labels")
+
+
+class LabelMap:
+    """A table of rules for changing labels, such as when migrating to a new
+    ontology. The new label of a label is given by the first of:
+
+    * its entry in the mapping,
+    * the longest matching prefix, which is replaced by its target (e.g.
+      the prefix ``"state/"`` with the target ``"condition/"`` changes
+      ``"state/desirable"`` to ``"condition/desirable"``),
+    * the first pattern (a regular expression) that the whole label
+      matches, which is replaced by its target (which may refer to groups
+      of the pattern, as in :func:`re.sub`).
+
+    Labels that match no rule are left unchanged. A target of None drops
+    the label instead. The rules are only applied once to each distinct
+    label, and the result remembered.
+
+    :var mapping: The new label of each label.
+    :var prefixes: The replacement of each prefix.
+    :var patterns: The compiled patterns, and their replacements.
+    """
+
+    def __init__(
+        self,
+        mapping: Dict[str, Optional[str]] = None,
+        prefixes: Dict[str, Optional[str]] = None,
+        patterns: Union[
+            Dict[str, Optional[str]], Iterable[Tuple[str, Optional[str]]]
+        ] = None,
+    ):
+        """Create a new LabelMap.
+
+        Args:
+            mapping (Dict[str, Optional[str]], optional): The new label of
+               each label, or None to drop it.
+            prefixes (Dict[str, Optional[str]], optional): The replacement
+               of each prefix, or None to drop labels with that prefix.
+            patterns (Union[Dict[str, Optional[str]],
+               Iterable[Tuple[str, Optional[str]]]], optional): The
+               replacement of each pattern, or None to drop labels that
+               match it, in the order they should be tried.
+
+        Raises:
+            ValueError: If a pattern is not a valid regular expression.
+        """
+        self.mapping = dict(mapping or {})
+        self.prefixes = sorted(
+            (prefixes or {}).items(), key=lambda p: len(p[0]), reverse=True
+        )
+        self.patterns = []
+        for pattern, target in dict(patterns or {}).items():
+            try:
+                self.patterns.append((re.compile(pattern), target))
+            except re.error as e:
+                raise ValueError(f"Invalid pattern {pattern!r}: {e}")
+        self._labels = {}
+
+    def __call__(self, label: str) -> Optional[str]:
+        """Return the new label of the given label.
+
+        Args:
+            label (str): The label.
+
+        Returns:
+            Optional[str]: The new label, or None if it should be dropped.
+        """
+        try:
+            return self._labels[label]
+        except KeyError:
+            new_label = self._labels[label] = self._resolve(label)
+            return new_label
+
+    def _resolve(self, label: str) -> Optional[str]:
+        """Apply the rules to the given label.
+
+        Args:
+            label (str): The label.
+
+        Returns:
+            Optional[str]: The new label, or None if it should be dropped.
+        """
+        if label in self.mapping:
+            return self.mapping[label]
+        for prefix, target in self.prefixes:
+            if label.startswith(prefix):
+                if target is None:
+                    return None
+                return target + label[len(prefix) :]
+        for pattern, target in self.patterns:
+            match = pattern.fullmatch(label)
+            if match is not None:
+                return None if target is None else match.expand(target)
+        return label
+
+    def __len__(self) -> int:
+        return len(self.mapping) + len(self.prefixes) + len(self.patterns)
+
+    def __repr__(self):
+        return f"<LabelMap of {len(self)} rules>"
+
+
+class Pipeline:
+    """A sequence of manipulations, which are applied to a Dataset with
+    :func:`puggle.Dataset.Dataset.apply_pipeline`. Each method adds the
+    manipulation of the same name, and returns the Pipeline, so that they
+    can be chained:
+
+    .. code-block:: python
+
+        pipeline = (
+            Pipeline()
+            .drop_entity_class("number")
+            .convert_entity_class("noise", "sound")
+            .flatten_all_entities()
+        )
+        results = d.apply_pipeline(pipeline)
+
+    The result is the same as calling the manipulations one after another,
+    but each Document is only visited once, and what happens to each label
+    is only worked out once per distinct label.
+
+    :var steps: The name and arguments of each manipulation.
+    """
+
+    def __init__(self):
+        """Create a new, empty Pipeline."""
+        self.steps = []
+        self._entity_labels = {}
+        self._relation_labels = {}
+
+    def drop_entity_class(self, entity_class: str) -> "Pipeline":
+        """Add :func:`puggle.Dataset.Dataset.drop_entity_class`.
+
+        Args:
+            entity_class (str): The entity class to remove.
+
+        Returns:
+            Pipeline: This Pipeline.
+        """
+        return self._add("drop_entity_class", entity_class)
+
+    def drop_relation_class(self, relation_class: str) -> "Pipeline":
+        """Add :func:`puggle.Dataset.Dataset.drop_relation_class`.
+
+        Args:
+            relation_class (str): The relation class to remove.
+
+        Returns:
+            Pipeline: This Pipeline.
+        """
+        return self._add("drop_relation_class", relation_class)
+
+    def convert_entity_class(
+        self, original_ec: str, modified_ec: str
+    ) -> "Pipeline":
+        """Add :func:`puggle.Dataset.Dataset.convert_entity_class`.
+
+        Args:
+            original_ec (str): The entity class to change.
+            modified_ec (str): The entity class to change to.
+
+        Returns:
+            Pipeline: This Pipeline.
+        """
+        return self._add("convert_entity_class", original_ec, modified_ec)
+
+    def convert_relation_class(
+        self, original_rc: str, modified_rc: str
+    ) -> "Pipeline":
+        """Add :func:`puggle.Dataset.Dataset.convert_relation_class`.
+
+        Args:
+            original_rc (str): The relation class to change.
+            modified_rc (str): The relation class to change to.
+
+        Returns:
+            Pipeline: This Pipeline.
+        """
+        return self._add("convert_relation_class", original_rc, modified_rc)
+
+    def flatten_all_entities(self) -> "Pipeline":
+        """Add :func:`puggle.Dataset.Dataset.flatten_all_entities`.
+
+        Returns:
+            Pipeline: This Pipeline.
+        """
+        return self._add("flatten_all_entities")
+
+    def flatten_all_relations(self) -> "Pipeline":
+        """Add :func:`puggle.Dataset.Dataset.flatten_all_relations`.
+
+        Returns:
+            Pipeline: This Pipeline.
+        """
+        return self._add("flatten_all_relations")
+
+    def remap_entity_labels(
+        self,
+        mapping: Dict[str, Optional[str]] = None,
+        prefixes: Dict[str, Optional[str]] = None,
+        patterns: Union[
+            Dict[str, Optional[str]], Iterable[Tuple[str, Optional[str]]]
+        ] = None,
+    ) -> "Pipeline":
+        """Add :func:`puggle.Dataset.Dataset.remap_entity_labels`.
+
+        Args:
+            mapping (Dict[str, Optional[str]], optional): See
+               :class:`LabelMap`.
+            prefixes (Dict[str, Optional[str]], optional): See
+               :class:`LabelMap`.
+            patterns (Union[Dict[str, Optional[str]],
+               Iterable[Tuple[str, Optional[str]]]], optional): See
+               :class:`LabelMap`.
+
+        Returns:
+            Pipeline: This Pipeline.
+        """
+        return self._add(
+            "remap_entity_labels", LabelMap(mapping, prefixes, patterns)
+        )
+
+    def remap_relation_labels(
+        self,
+        mapping: Dict[str, Optional[str]] = None,
+        prefixes: Dict[str, Optional[str]] = None,
+        patterns: Union[
+            Dict[str, Optional[str]], Iterable[Tuple[str, Optional[str]]]
+        ] = None,
+    ) -> "Pipeline":
+        """Add :func:`puggle.Dataset.Dataset.remap_relation_labels`.
+
+        Args:
+            mapping (Dict[str, Optional[str]], optional): See
+               :class:`LabelMap`.
+            prefixes (Dict[str, Optional[str]], optional): See
+               :class:`LabelMap`.
+            patterns (Union[Dict[str, Optional[str]],
+               Iterable[Tuple[str, Optional[str]]]], optional): See
+               :class:`LabelMap`.
+
+        Returns:
+            Pipeline: This Pipeline.
+        """
+        return self._add(
+            "remap_relation_labels", LabelMap(mapping, prefixes, patterns)
+        )
+
+    def _add(self, operation: str, *args) -> "Pipeline":
+        """Add the given manipulation.
+
+        Args:
+            operation (str): The name of the manipulation.
+            *args: Its arguments.
+
+        Returns:
+            Pipeline: This Pipeline.
+        """
+        self.steps.append((operation, args))
+        self._entity_labels.clear()
+        self._relation_labels.clear()
+        return self
+
+    def entity_label(self, label: str) -> Tuple[str, int, List[int]]:
+        """Return what the manipulations do to a mention with the given
+        label. This is only worked out once for each label.
+
+        Args:
+            label (str): The label.
+
+        Returns:
+            str: The label of the mention after the manipulations (or when
+               it was removed).
+            int: The index of the step that removes the mention, or the
+               number of steps if it is kept.
+            List[int]: The indexes of the steps that modify the mention.
+        """
+        result = self._entity_labels.get(label)
+        if result is None:
+            result = self._entity_labels[label] = self._follow(
+                label,
+                "drop_entity_class",
+                "convert_entity_class",
+                "flatten_all_entities",
+                "remap_entity_labels",
+            )
+        return result
+
+    def relation_label(self, label: str) -> Tuple[str, int, List[int]]:
+        """Return what the manipulations do to a relation with the given
+        label (ignoring the removal of its head and tail), as
+        :func:`entity_label` does for mentions.
+
+        Args:
+            label (str): The label.
+
+        Returns:
+            Tuple[str, int, List[int]]: See :func:`entity_label`.
+        """
+        result = self._relation_labels.get(label)
+        if result is None:
+            result = self._relation_labels[label] = self._follow(
+                label,
+                "drop_relation_class",
+                "convert_relation_class",
+                "flatten_all_relations",
+                "remap_relation_labels",
+            )
+        return result
+
+    def _follow(
+        self, label: str, drop: str, convert: str, flatten: str, remap: str
+    ) -> Tuple[str, int, List[int]]:
+        """Follow the given label through the manipulations of the given
+        names.
+
+        Args:
+            label (str): The label.
+            drop (str): The name of the manipulation that removes a label.
+            convert (str): The name of the manipulation that converts a
+               label to another.
+            flatten (str): The name of the manipulation that flattens every
+               label.
+            remap (str): The name of the manipulation that applies a
+               :class:`LabelMap`.
+
+        Returns:
+            Tuple[str, int, List[int]]: See :func:`entity_label`.
+        """
+        modified = []
+        for step, (operation, args) in enumerate(self.steps):
+            if operation == drop and label == args[0]:
+                return label, step, modified
+            if operation == convert and label == args[0]:
+                label = args[1]
+                modified.append(step)
+            elif operation == flatten:
+                label = label.split("/")[0]
+                modified.append(step)
+            elif operation == remap:
+                new_label = args[0](label)
+                if new_label is None:
+                    return label, step, modified
+                if new_label != label:
+                    label = new_label
+                    modified.append(step)
+        return label, len(self.steps), modified
+
+    def __len__(self) -> int:
+        return len(self.steps)
+
+    def __repr__(self):
+        return f"<Pipeline of {len(self)} steps>"
+
+
+def apply_pipeline(self: Dataset, pipeline: Pipeline) -> List[Dict]:
+    """
+    :bdg-success-line:`Manipulation`
+    Apply each manipulation of the given Pipeline to this Dataset, in order,
+    in a single pass over its Documents. The number of entities and
+    relations removed or modified by each step is logged, just as when
+    calling the manipulations one after another.
+
+    Args:
+        pipeline (Pipeline): The Pipeline.
+
+    Returns:
+        List[Dict]: The name and args of each step, and the number of
+        entities and relations it removed or modified.
+    """
+    n_steps = len(pipeline)
+    # A relation whose head and tail have both been removed is removed by
+    # the next step that removes mentions
+    entity_drops = [
+        step
+        for step, (operation, _) in enumerate(pipeline.steps)
+        if operation in _ENTITY_DROPS
+    ] + [n_steps]
+
+    def relation_removal(label: str, head: int, tail: int) -> int:
+        """Return the step that removes a relation with the given label,
+        whose head and tail are removed at the given steps (-1 if they were
+        never listed)."""
+        drop = entity_drops[bisect_left(entity_drops, max(head, tail))]
+        return min(pipeline.relation_label(label)[1], drop)
+
+    self._prepare_write()
+    if isinstance(self.documents, ColumnarDocumentList):
+        entity_counts, relation_counts, changed = _apply_columnar(
+            self.documents, pipeline, relation_removal
+        )
+    else:
+        entity_counts, relation_counts, changed = _apply_objects(
+            self, pipeline, relation_removal
+        )
+    if self.index is not None:
+        self.index.reindex(
+            self.documents, changed, ("entities", "relations", "triples")
+        )
+
+    counts = [
+        dict.fromkeys(_STEP_COUNTS[operation], 0)
+        for operation, _ in pipeline.steps
+    ]
+    for label, n in entity_counts.items():
+        _, removal, modified = pipeline.entity_label(label)
+        for step in modified:
+            counts[step]["entities_modified"] += n
+        if removal < n_steps:
+            counts[removal]["entities_removed"] += n
+    for (label, removal), n in relation_counts.items():
+        for step in pipeline.relation_label(label)[2]:
+            if step < removal:
+                counts[step]["relations_modified"] += n
+        if removal < n_steps:
+            counts[removal]["relations_removed"] += n
+
+    results = []
+    for (operation, args), step_counts in zip(pipeline.steps, counts):
+        _log_step(operation, args, step_counts)
+        results.append({"operation": operation, "args": args, **step_counts})
+    return results
+
+
+def _apply_objects(
+    dataset: Dataset, pipeline: Pipeline, relation_removal
+) -> Tuple[Counter, Counter, List[int]]:
+    """Apply the given Pipeline to the Documents of the given Dataset that
+    are stored as objects.
+
+    Args:
+        dataset (Dataset): The Dataset.
+        pipeline (Pipeline): The Pipeline.
+        relation_removal (Callable): Returns the step that removes a
+           relation, given its label and the steps that remove its head and
+           tail.
+
+    Returns:
+        Counter: The number of mentions with each label.
+        Counter: The number of relations with each label that are removed
+           at each step.
+        List[int]: The indexes of the changed Documents.
+    """
+    n_steps = len(pipeline)
+    entity_label = pipeline.entity_label
+    relation_label = pipeline.relation_label
+    set_label = dataset.vocab.set_label
+    entity_counts = Counter()
+    relation_counts = Counter()
+    changed = []
+    for i, doc in _object_documents(dataset):
+        a = doc.annotation
+        if a is None:
+            continue
+        mentions = [entity_label(m.label) for m in a.mentions]
+        entity_counts.update(m.label for m in a.mentions)
+        # Relations refer to mentions by value
+        removals = {
+            (m.start, m.end, m.label): removal
+            for m, (_, removal, _) in zip(a.mentions, mentions)
+        }
+        relations = []
+        for r in a.relations:
+            h = r.start
+            t = r.end
+            removal = relation_removal(
+                r.label,
+                removals.get((h.start, h.end, h.label), -1),
+                removals.get((t.start, t.end, t.label), -1),
+            )
+            relations.append((relation_label(r.label)[0], removal))
+            relation_counts[r.label, removal] += 1
+
+        if all(
+            label == m.label and removal == n_steps
+            for m, (label, removal, _) in zip(a.mentions, mentions)
+        ) and all(
+            label == r.label and removal == n_steps
+            for r, (label, removal) in zip(a.relations, relations)
+        ):
+            continue
+        changed.append(i)
+        a = dataset._writable_document(i).annotation
+        kept = []
+        for m, (label, removal, _) in zip(a.mentions, mentions):
+            # Removed mentions keep the label they were removed with, as
+            # they may still be referred to by relations
+            if m.label != label:
+                set_label(m, label)
+            if removal == n_steps:
+                kept.append(m)
+        a.mentions = kept
+        kept = []
+        for r, (label, removal) in zip(a.relations, relations):
+            if removal == n_steps:
+                if r.label != label:
+                    set_label(r, label)
+                kept.append(r)
+        a.relations = kept
+        a.clear_indexes()
+    return entity_counts, relation_counts, changed
+
+
+def _apply_columnar(
+    docs: ColumnarDocumentList, pipeline: Pipeline, relation_removal
+) -> Tuple[Counter, Counter, List[int]]:
+    """Apply the given Pipeline to the arrays of the given
+    ColumnarDocumentList.
+
+    Args:
+        docs (ColumnarDocumentList): The Documents.
+        pipeline (Pipeline): The Pipeline.
+        relation_removal (Callable): See :func:`_apply_objects`.
+
+    Returns:
+        Tuple[Counter, Counter, List[int]]: See :func:`_apply_objects`.
+    """
+    n_steps = len(pipeline)
+    string = docs.vocab.string
+    add = docs.vocab.add
+    changed = set()
+
+    entity_ids = {}
+    label_counts = Counter(
+        label for label, k in zip(docs.mention_label, docs.mention_listed) if k
+    )
+    for label_id in label_counts:
+        label, removal, _ = pipeline.entity_label(string(label_id))
+        entity_ids[label_id] = (add(label), removal)
+
+    # The step that removes each mention (-1 if it was never listed)
+    removals = array("i", [-1]) * len(docs.mention_label)
+    mention_label = array("i", docs.mention_label)
+    mention_listed = bytearray(docs.mention_listed)
+    for j, label_id in enumerate(docs.mention_label):
+        if not mention_listed[j]:
+            continue
+        new_id, removals[j] = entity_ids[label_id]
+        if new_id != label_id:
+            mention_label[j] = new_id
+            changed.add(docs.mention_doc[j])
+        if removals[j] < n_steps:
+            mention_listed[j] = 0
+            changed.add(docs.mention_doc[j])
+    docs.mention_label = mention_label
+    docs.mention_listed = mention_listed
+
+    relation_ids = {}
+    relation_counts = Counter()
+    relation_label = array("i", docs.relation_label)
+    relation_listed = bytearray(docs.relation_listed)
+    for k, label_id in enumerate(docs.relation_label):
+        if not relation_listed[k]:
+            continue
+        label = string(label_id)
+        head = docs.relation_head[k]
+        removal = relation_removal(
+            label, removals[head], removals[docs.relation_tail[k]]
+        )
+        relation_counts[label, removal] += 1
+        new_id = relation_ids.get(label_id)
+        if new_id is None:
+            new_id = relation_ids[label_id] = add(
+                pipeline.relation_label(label)[0]
+            )
+        if removal < n_steps:
+            relation_listed[k] = 0
+            changed.add(docs.mention_doc[head])
+        elif new_id != label_id:
+            relation_label[k] = new_id
+            changed.add(docs.mention_doc[head])
+    docs.relation_label = relation_label
+    docs.relation_listed = relation_listed
+
+    entity_counts = Counter(
+        {string(label_id): n for label_id, n in label_counts.items()}
+    )
+    return entity_counts, relation_counts, sorted(changed)
+
+
+def remap_entity_labels(
+    self: Dataset,
+    mapping: Dict[str, Optional[str]] = None,
+    prefixes: Dict[str, Optional[str]] = None,
+    patterns: Union[
+        Dict[str, Optional[str]], Iterable[Tuple[str, Optional[str]]]
+    ] = None,
+) -> Dict[str, int]:
+    """
+    :bdg-success-line:`Manipulation`
+    Change the labels of the entities of this Dataset according to the
+    given rules (see :class:`LabelMap`), in a single pass. Entities whose
+    label is dropped are removed, along with their relations (as in
+    :func:`puggle.Dataset.Dataset.drop_entity_class`).
+
+    Args:
+        mapping (Dict[str, Optional[str]], optional): The new label of each
+           label, or None to drop it.
+        prefixes (Dict[str, Optional[str]], optional): The replacement of
+           each prefix, or None to drop labels with that prefix.
+        patterns (Union[Dict[str, Optional[str]],
+           Iterable[Tuple[str, Optional[str]]]], optional): The replacement
+           of each regular expression, or None to drop labels that match
+           it.
+
+    Returns:
+        Dict[str, int]: The number of entities modified and removed, and
+        the number of relations removed.
+
+    Raises:
+        ValueError: If a pattern is not a valid regular expression.
+    """
+    pipeline = Pipeline().remap_entity_labels(mapping, prefixes, patterns)
+    return _step_counts(apply_pipeline(self, pipeline)[0])
+
+
+def remap_relation_labels(
+    self: Dataset,
+    mapping: Dict[str, Optional[str]] = None,
+    prefixes: Dict[str, Optional[str]] = None,
+    patterns: Union[
+        Dict[str, Optional[str]], Iterable[Tuple[str, Optional[str]]]
+    ] = None,
+) -> Dict[str, int]:
+    """
+    :bdg-success-line:`Manipulation`
+    Change the labels of the relations of this Dataset according to the
+    given rules (see :class:`LabelMap`), in a single pass. Relations whose
+    label is dropped are removed.
+
+    Args:
+        mapping (Dict[str, Optional[str]], optional): The new label of each
+           label, or None to drop it.
+        prefixes (Dict[str, Optional[str]], optional): The replacement of
+           each prefix, or None to drop labels with that prefix.
+        patterns (Union[Dict[str, Optional[str]],
+           Iterable[Tuple[str, Optional[str]]]], optional): The replacement
+           of each regular expression, or None to drop labels that match
+           it.
+
+    Returns:
+        Dict[str, int]: The number of relations modified and removed.
+
+    Raises:
+        ValueError: If a pattern is not a valid regular expression.
+    """
+    pipeline = Pipeline().remap_relation_labels(mapping, prefixes, patterns)
+    return _step_counts(apply_pipeline(self, pipeline)[0])
+
+
+def _step_counts(result: Dict) -> Dict[str, int]:
+    """Return the counts of a result of :func:`apply_pipeline`, without
+    the name and args of its step.
+
+    Args:
+        result (Dict): The result of the step.
+
+    Returns:
+        Dict[str, int]: The counts.
+    """
+    return {
+        k: v for k, v in result.items() if k not in ("operation", "args")
+    }
+
+
+Dataset.apply_pipeline = apply_pipeline
+Dataset.remap_entity_labels = remap_entity_labels
+Dataset.remap_relation_labels = remap_relation_labels
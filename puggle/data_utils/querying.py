@@ -0,0 +1,215 @@
+"""Functions for finding the Documents of Puggle Datasets that match given
+criteria. When this library is imported, the functions will be added to the
+Dataset class."""
+from array import array
+from bisect import bisect_left
+from typing import Callable, Dict, Iterable, List, Sequence, Tuple
+
+from puggle import Dataset, Document
+from puggle.logger import logger
+
+
+def query(
+    self: Dataset,
+    entities: Iterable[str] = None,
+    relations: Iterable[str] = None,
+    triples: Iterable[Tuple[str, str, str]] = None,
+    tokens: Iterable[str] = None,
+    phrase: Sequence[str] = None,
+    fields: Dict = None,
+    min_length: int = None,
+    max_length: int = None,
+    predicate: Callable[[Document], bool] = None,
+) -> array:
+    """
+    :bdg-info-line:`Querying`
+    Return the indexes of the Documents of this Dataset that match all of
+    the given criteria. If the Dataset has an index (see
+    :func:`build_index`), the posting lists of the labels, triples and
+    tokens (and the lengths) are intersected first, so that only the
+    Documents in the intersection are checked against the remaining
+    criteria. Otherwise every Document is checked.
+
+    Args:
+        entities (Iterable[str], optional): Entity labels that must each
+           appear in the Document.
+        relations (Iterable[str], optional): Relation labels that must each
+           appear in the Document.
+        triples (Iterable[Tuple[str, str, str]], optional): (head label,
+           relation label, tail label) triples that must each appear in the
+           Document.
+        tokens (Iterable[str], optional): Tokens that must each appear in
+           the Document.
+        phrase (Sequence[str], optional): A sequence of tokens that must
+           appear consecutively in the Document.
+        fields (Dict, optional): The value of each field of the Document,
+           or a function taking the value of the field and returning whether
+           it matches.
+        min_length (int, optional): The minimum number of tokens.
+        max_length (int, optional): The maximum number of tokens.
+        predicate (Callable[[Document], bool], optional): A function taking
+           a Document and returning whether it matches.
+
+    Returns:
+        array: The sorted indexes of the matching Documents.
+    """
+    entities = set(entities or ())
+    relations = set(relations or ())
+    triples = set(map(tuple, triples or ()))
+    tokens = set(tokens or ())
+    phrase = list(phrase or ())
+
+    # The criteria that can be answered by the index, and those that must
+    # be checked against each Document
+    postings = []
+    checks = []
+    index = self.index
+    if index is not None:
+        postings += [index.documents_with_entity(e) for e in entities]
+        postings += [index.documents_with_relation(r) for r in relations]
+        postings += [index.documents_with_triple(*t) for t in triples]
+        postings += [
+            index.documents_with_token(t) for t in tokens.union(phrase)
+        ]
+        if min_length is not None or max_length is not None:
+            postings.append(
+                index.documents_with_length(min_length, max_length)
+            )
+    else:
+        if entities:
+            checks.append(
+                lambda a: entities <= {m.label for m in a.mentions}
+            )
+        if relations:
+            checks.append(
+                lambda a: relations <= {r.label for r in a.relations}
+            )
+        if triples:
+            checks.append(
+                lambda a: triples
+                <= {
+                    (r.start.label, r.label, r.end.label)
+                    for r in a.relations
+                }
+            )
+        if tokens:
+            checks.append(lambda a: tokens <= set(a.tokens))
+        if min_length is not None:
+            checks.append(lambda a: len(a.tokens) >= min_length)
+        if max_length is not None:
+            checks.append(lambda a: len(a.tokens) <= max_length)
+    if phrase:
+        checks.append(lambda a: _contains_phrase(a.tokens, phrase))
+
+    documents = self.documents
+    if postings:
+        candidates = _intersect(postings)
+    else:
+        candidates = range(len(documents))
+
+    # Documents without an annotation can only match criteria on the fields
+    needs_annotation = bool(checks or postings)
+    ids = array("I")
+    for i in candidates:
+        doc = documents[i]
+        a = doc.annotation
+        if a is None:
+            if needs_annotation:
+                continue
+        elif not all(check(a) for check in checks):
+            continue
+        if fields and not _fields_match(doc.fields, fields):
+            continue
+        if predicate is not None and not predicate(doc):
+            continue
+        ids.append(i)
+    return ids
+
+
+def filter(self: Dataset, *args, **kwargs) -> Dataset:
+    """
+    :bdg-info-line:`Querying`
+    Return a new Dataset of the Documents of this Dataset that match all of
+    the given criteria (see :func:`query`). The new Dataset is a
+    :class:`puggle.Dataset.DatasetView` of this Dataset, i.e. its Documents
+    are not copied unless they are changed.
+
+    Returns:
+        Dataset: The matching Documents.
+    """
+    ids = self.query(*args, **kwargs)
+    logger.info(f"Filtered {len(ids)} of {len(self.documents)} documents.")
+    return self.view(ids)
+
+
+def _intersect(postings: List[array]) -> List[int]:
+    """Return the intersection of the given posting lists, starting from
+    the shortest, and looking up each of its ids in the others. This takes
+    time proportional to the length of the shortest list.
+
+    Args:
+        postings (List[array]): The sorted posting lists.
+
+    Returns:
+        List[int]: The sorted ids that appear in every posting list.
+    """
+    postings = sorted(postings, key=len)
+    ids = list(postings[0])
+    for posting in postings[1:]:
+        if not ids:
+            break
+        n = len(posting)
+        ids = [
+            i
+            for i in ids
+            if (j := bisect_left(posting, i)) < n and posting[j] == i
+        ]
+    return ids
+
+
+def _contains_phrase(tokens: List[str], phrase: List[str]) -> bool:
+    """Return whether the given tokens contain the given phrase.
+
+    Args:
+        tokens (List[str]): The tokens.
+        phrase (List[str]): The phrase.
+
+    Returns:
+        bool: True if the phrase appears consecutively in the tokens.
+    """
+    n = len(phrase)
+    return any(
+        tokens[i : i + n] == phrase
+        for i, t in enumerate(tokens[: len(tokens) - n + 1])
+        if t == phrase[0]
+    )
+
+
+def _fields_match(doc_fields, fields: Dict) -> bool:
+    """Return whether the given fields of a Document match the given
+    values or functions.
+
+    Args:
+        doc_fields (Mapping): The fields of the Document (or None).
+        fields (Dict): The value of each field, or a function taking the
+           value of the field and returning whether it matches.
+
+    Returns:
+        bool: True if every field matches.
+    """
+    if doc_fields is None:
+        return False
+    for name, expected in fields.items():
+        if name not in doc_fields:
+            return False
+        value = doc_fields[name]
+        if callable(expected):
+            if not expected(value):
+                return False
+        elif value != expected:
+            return False
+    return True
+
+
+Dataset.query = query
+Dataset.filter = filter
@@ -8,39 +8,34 @@ def random_sample(self: Dataset, num_records: int) -> Dataset:
     """
     :bdg-primary-line:`sampling`
     Run a 'random sample' over the given dataset to return a new
-    Dataset with num_records documents.
+    Dataset with num_records documents. The sample is a
+    :class:`puggle.Dataset.DatasetView`, so the documents are not copied
+    unless they are changed.
 
     Args:
         self (Dataset): The dataset to sample.
         num_records (int): The number of documents that should appear in the
            output.
     """
-    output_dataset = Dataset()
-    sample = random.sample(self.documents, num_records)
-    for doc in sample:
-        output_dataset.add_document(doc)
-    return output_dataset
+    return self.view(random.sample(range(len(self.documents)), num_records))
 
 
 def random_split(self: Dataset) -> (Dataset, Dataset, Dataset):
     """
     :bdg-primary-line:`sampling`
     Randomly split this dataset into 3 datasets - 80% train, 10% dev, 10% test.
+    Each is a :class:`puggle.Dataset.DatasetView`, so the documents are not
+    copied unless they are changed, and changing one split does not change
+    the others.
 
     Returns:
         Dataset, Dataset, Dataset: The train, dev and test datasets.
     """
 
-    rs = random.sample(self.documents, len(self.documents))
-    train = Dataset()
-    dev = Dataset()
-    test = Dataset()
-    for doc in rs[: int(len(rs) * 0.8)]:
-        train.add_document(doc)
-    for doc in rs[int(len(rs) * 0.8) : int(len(rs) * 0.9)]:
-        dev.add_document(doc)
-    for doc in rs[int(len(rs) * 0.9) :]:
-        test.add_document(doc)
+    rs = random.sample(range(len(self.documents)), len(self.documents))
+    train = self.view(rs[: int(len(rs) * 0.8)])
+    dev = self.view(rs[int(len(rs) * 0.8) : int(len(rs) * 0.9)])
+    test = self.view(rs[int(len(rs) * 0.9) :])
 
     logger.info(
         "Randomly split dataset into %s train, %s dev and %s test."
@@ -73,7 +68,10 @@ def smart_sample(self: Dataset, num_records: int, num_samples: int) -> Dataset:
            function will generate a better quality sample.
     """
     dataset = self
-    documents = dataset.documents
+    # Keep the same Document objects throughout (columnar Datasets create a
+    # new view of a Document each time it is accessed)
+    documents = list(dataset.documents)
+    positions = {id(doc): i for i, doc in enumerate(documents)}
 
     # Repeat num_samples times to create a list of num_samples different
     # 'sample sets'. The best of these will be chosen as the final output.
@@ -105,17 +103,13 @@ def smart_sample(self: Dataset, num_records: int, num_samples: int) -> Dataset:
 
         sample_sets.append(sample_set)
 
-    output_dataset = Dataset()
-
     # Now that we have num_samples documents in the sample set,
     # calculate the average score of every document in that set against
     # every other document in the set.
     # The average score determines how 'good' our sample set is.
     scored_sets = []
     for sample_set in sample_sets:
-        average_score = _calculate_sample_quality(
-            sample_set, dataset.documents
-        )
+        average_score = _calculate_sample_quality(sample_set, documents)
         scored_sets.append((sample_set, average_score))
 
     # Sort these sample sets, taking the one with the lowest score as the
@@ -128,10 +122,7 @@ def smart_sample(self: Dataset, num_records: int, num_samples: int) -> Dataset:
     logger.debug(
         "Creating final output dataset from the lowest-scored sample..."
     )
-    for d in scored_sets[0][0]:
-        output_dataset.add_document(d)
-
-    return output_dataset
+    return dataset.view([positions[id(d)] for d in scored_sets[0][0]])
 
 
 def _calculate_sample_quality(
@@ -1,5 +1,9 @@
 """Statistics-based functions for the Dataset class."""
+import sys
+from typing import Dict
+
 from puggle import Dataset
+from puggle.columnar import ColumnarDocumentList
 
 
 def get_unique_tokens_count(self: Dataset):
@@ -14,6 +18,9 @@ def get_unique_tokens_count(self: Dataset):
         int: The number of unique tokens in the dataset.
     """
 
+    if isinstance(self.documents, ColumnarDocumentList):
+        return self.documents.unique_token_count()
+
     seen_tokens = set()
     for d in self.documents:
         for token in d.annotation.tokens:
@@ -36,6 +43,10 @@ def get_entity_label_counts(self: Dataset, document_level=False):
     Returns:
         list[tuple]: A sorted list of (entity_label, freq) pairs.
     """
+    if isinstance(self.documents, ColumnarDocumentList):
+        counts_dict = self.documents.mention_label_counts(document_level)
+        return sorted(counts_dict.items(), key=lambda x: x[1], reverse=True)
+
     counts_dict = {}
     for d in self.documents:
         seen_this_doc = set()
@@ -54,5 +65,132 @@ def get_entity_label_counts(self: Dataset, document_level=False):
     return sorted_counts
 
 
+def memory_usage(self: Dataset) -> Dict[str, float]:
+    """
+    :bdg-danger-line:`Statistics`
+    Return an estimate of the memory used by the Documents of this Dataset,
+    in bytes. Objects shared between Documents (such as token strings) are
+    only counted once. Every Document is built in order to measure it, so
+    for Datasets loaded lazily (see :func:`load_binary`) this is only a
+    measure of the memory they would use once fully loaded.
+
+    Returns:
+        Dict[str, float]: The number of bytes used by the Document,
+        Annotation, Mention and Relation objects (including the lists
+        they hold) and by the distinct strings, the total, and the
+        average number of bytes per document, mention and relation.
+    """
+    if isinstance(self.documents, ColumnarDocumentList):
+        return _columnar_memory_usage(self.documents)
+
+    seen = set()
+
+    def size(obj) -> int:
+        if obj is None or id(obj) in seen:
+            return 0
+        seen.add(id(obj))
+        return sys.getsizeof(obj)
+
+    usage = {
+        "documents": 0,
+        "annotations": 0,
+        "mentions": 0,
+        "relations": 0,
+        "strings": 0,
+    }
+    n_documents = n_mentions = n_relations = 0
+    for doc in self.documents:
+        n_documents += 1
+        usage["documents"] += size(doc) + size(doc.fields)
+        if isinstance(doc.fields, dict):
+            for k, v in doc.fields.items():
+                usage["strings"] += size(k) + size(v)
+
+        a = doc.annotation
+        if a is None:
+            continue
+        usage["annotations"] += (
+            size(a)
+            + size(a.tokens)
+            + size(a.token_ids)
+            + size(a.mentions)
+            + size(a.relations)
+            + size(a._mention_ids_map)
+        )
+        for t in a.tokens:
+            usage["strings"] += size(t)
+        for m in [*a.mentions, *a._mention_ids_map.values()]:
+            if id(m) in seen:
+                continue
+            n_mentions += 1
+            usage["mentions"] += size(m) + size(m._tokens) + size(m._text)
+            usage["strings"] += size(m.label)
+        for r in a.relations:
+            n_relations += 1
+            usage["relations"] += size(r)
+            usage["strings"] += size(r.label)
+
+    usage["total"] = sum(usage.values())
+    usage["per_document"] = usage["total"] / max(n_documents, 1)
+    usage["per_mention"] = usage["mentions"] / max(n_mentions, 1)
+    usage["per_relation"] = usage["relations"] / max(n_relations, 1)
+    return usage
+
+
+def _columnar_memory_usage(
+    documents: ColumnarDocumentList,
+) -> Dict[str, float]:
+    """Return an estimate of the memory used by the given columnar Documents,
+    in the same format as :func:`memory_usage`.
+
+    Args:
+        documents (ColumnarDocumentList): The Documents.
+
+    Returns:
+        Dict[str, float]: The number of bytes used by each part.
+    """
+
+    def size(*names) -> int:
+        return sum(sys.getsizeof(getattr(documents, name)) for name in names)
+
+    usage = {
+        "documents": size(
+            "fields",
+            "document_index",
+            "token_offset",
+            "has_annotation",
+            "doc_mention_offsets",
+            "doc_relation_offsets",
+        )
+        + sum(sys.getsizeof(f) for f in documents.fields if f is not None),
+        "annotations": size("doc_token_offsets", "token_ids"),
+        "mentions": size(
+            "mention_doc",
+            "mention_start",
+            "mention_end",
+            "mention_label",
+            "mention_id",
+            "mention_listed",
+        ),
+        "relations": size(
+            "relation_head",
+            "relation_tail",
+            "relation_label",
+            "relation_listed",
+        ),
+        "strings": sum(sys.getsizeof(s) for s in documents.vocab),
+    }
+    usage["total"] = sum(usage.values())
+    usage["per_document"] = usage["total"] / max(len(documents), 1)
+    usage["per_mention"] = usage["mentions"] / max(
+        len(documents.mention_start), 1
+    )
+    usage["per_relation"] = usage["relations"] / max(
+        len(documents.relation_head), 1
+    )
+    return usage
+
+
 Dataset.get_unique_tokens_count = get_unique_tokens_count
 Dataset.get_entity_label_counts = get_entity_label_counts
+Dataset.memory_usage = memory_usage
@@ -0,0 +1,354 @@
+"""An inverted index of the Documents of a Dataset, which maps each token,
+entity label, relation label and (head label, relation label, tail label)
+triple to the ids (i.e. indexes) of the Documents that contain it."""
+from array import array
+from bisect import bisect_left, bisect_right
+from typing import Dict, Iterable, Iterator, Sequence, Tuple
+
+from .Document import Document
+
+# The kinds of keys that are indexed
+KINDS = ("tokens", "entities", "relations", "triples")
+
+
+class InvertedIndex:
+    """Posting lists of the Documents of a Dataset. Each posting list is a
+    sorted array of document ids, which must not be modified.
+
+    Relations are indexed by the labels of their head and tail mentions
+    even if those mentions have been removed from the list of mentions.
+
+    :var n_documents: The number of Documents that have been indexed.
+    :var lengths: The number of tokens of each Document.
+    """
+
+    def __init__(self, documents: Iterable[Document] = ()):
+        """Create a new InvertedIndex.
+
+        Args:
+            documents (Iterable[Document], optional): The Documents to index,
+               whose ids are their positions.
+        """
+        self._postings: Dict[str, Dict[object, array]] = {
+            kind: {} for kind in KINDS
+        }
+        self.n_documents = 0
+        self.lengths = array("I")
+        self._by_length = None
+        for doc_id, document in enumerate(documents):
+            self.add(doc_id, document)
+
+    def add(self, doc_id: int, document: Document):
+        """Add the given Document to the index.
+
+        Args:
+            doc_id (int): The id of the Document, which must be greater than
+               the id of every Document already indexed.
+            document (Document): The Document.
+
+        Raises:
+            ValueError: If the id is less than that of an indexed Document.
+        """
+        if doc_id < self.n_documents:
+            raise ValueError(
+                f"Documents must be added in order of id, but {doc_id} was "
+                f"added after {self.n_documents - 1}."
+            )
+        for kind, keys in _document_keys(document).items():
+            postings = self._postings[kind]
+            for key in keys:
+                posting = postings.get(key)
+                if posting is None:
+                    posting = postings[key] = array("I")
+                posting.append(doc_id)
+        # Documents may be skipped, in which case they have no tokens
+        self.lengths.extend([0] * (doc_id - self.n_documents))
+        annotation = document.annotation
+        self.lengths.append(len(annotation.tokens) if annotation else 0)
+        self._by_length = None
+        self.n_documents = doc_id + 1
+
+    def documents_with_token(self, token: str) -> array:
+        """Return the ids of the Documents containing the given token.
+
+        Args:
+            token (str): The token.
+
+        Returns:
+            array: The sorted ids.
+        """
+        return self.lookup("tokens", token)
+
+    def documents_with_entity(self, label: str) -> array:
+        """Return the ids of the Documents containing a mention with the
+        given label.
+
+        Args:
+            label (str): The entity label.
+
+        Returns:
+            array: The sorted ids.
+        """
+        return self.lookup("entities", label)
+
+    def documents_with_relation(self, label: str) -> array:
+        """Return the ids of the Documents containing a relation with the
+        given label.
+
+        Args:
+            label (str): The relation label.
+
+        Returns:
+            array: The sorted ids.
+        """
+        return self.lookup("relations", label)
+
+    def documents_with_triple(self, head: str, label: str, tail: str) -> array:
+        """Return the ids of the Documents containing a relation with the
+        given label between mentions with the given labels.
+
+        Args:
+            head (str): The entity label of the head of the relation.
+            label (str): The relation label.
+            tail (str): The entity label of the tail of the relation.
+
+        Returns:
+            array: The sorted ids.
+        """
+        return self.lookup("triples", (head, label, tail))
+
+    def documents_with_length(
+        self, min_length: int = None, max_length: int = None
+    ) -> array:
+        """Return the ids of the Documents with at least `min_length` and at
+        most `max_length` tokens.
+
+        Args:
+            min_length (int, optional): The minimum number of tokens.
+            max_length (int, optional): The maximum number of tokens.
+
+        Returns:
+            array: The sorted ids.
+        """
+        if self._by_length is None:
+            ids = sorted(range(self.n_documents), key=self.lengths.__getitem__)
+            self._by_length = (
+                array("I", (self.lengths[i] for i in ids)),
+                array("I", ids),
+            )
+        lengths, ids = self._by_length
+        start = 0 if min_length is None else bisect_left(lengths, min_length)
+        end = (
+            len(lengths)
+            if max_length is None
+            else bisect_right(lengths, max_length)
+        )
+        return array("I", sorted(ids[start:end]))
+
+    def lookup(self, kind: str, key) -> array:
+        """Return the posting list of the given key.
+
+        Args:
+            kind (str): The kind of key (see KINDS).
+            key: The key, i.e. a token, label or (head, label, tail) triple.
+
+        Returns:
+            array: The sorted ids of the Documents containing the key.
+
+        Raises:
+            ValueError: If the kind is not valid.
+        """
+        postings = self._postings.get(kind)
+        if postings is None:
+            raise ValueError(
+                f'"{kind}" is not a valid kind of key. Must be one of '
+                f"{KINDS}."
+            )
+        return postings.get(key, _EMPTY)
+
+    def keys(self, kind: str) -> Iterator:
+        """Iterate over the keys of the given kind.
+
+        Args:
+            kind (str): The kind of key (see KINDS).
+
+        Returns:
+            Iterator: The keys.
+        """
+        return iter(self._postings[kind])
+
+    def relabel_entities(self, mapping: Dict[str, str]):
+        """Update the index after changing the labels of mentions.
+
+        Args:
+            mapping (Dict[str, str]): The new label of each changed label.
+        """
+        self._rename("entities", mapping)
+        self._rename(
+            "triples",
+            {
+                (head, label, tail): (
+                    mapping.get(head, head),
+                    label,
+                    mapping.get(tail, tail),
+                )
+                for head, label, tail in self._postings["triples"]
+                if head in mapping or tail in mapping
+            },
+        )
+
+    def relabel_relations(self, mapping: Dict[str, str]):
+        """Update the index after changing the labels of relations.
+
+        Args:
+            mapping (Dict[str, str]): The new label of each changed label.
+        """
+        self._rename("relations", mapping)
+        self._rename(
+            "triples",
+            {
+                (head, label, tail): (head, mapping[label], tail)
+                for head, label, tail in self._postings["triples"]
+                if label in mapping
+            },
+        )
+
+    def drop_entity_label(self, label: str, documents: Sequence[Document]):
+        """Update the index after removing the mentions with the given label
+        (and their relations) from the given Documents.
+
+        Args:
+            label (str): The removed entity label.
+            documents (Sequence[Document]): The indexed Documents.
+        """
+        doc_ids = self._postings["entities"].pop(label, _EMPTY)
+        self.reindex(documents, doc_ids, ("relations", "triples"))
+
+    def drop_relation_label(self, label: str):
+        """Update the index after removing the relations with the given
+        label.
+
+        Args:
+            label (str): The removed relation label.
+        """
+        self._postings["relations"].pop(label, None)
+        triples = self._postings["triples"]
+        for triple in [t for t in triples if t[1] == label]:
+            del triples[triple]
+
+    def reindex(
+        self,
+        documents: Sequence[Document],
+        doc_ids: Iterable[int],
+        kinds: Tuple[str] = KINDS,
+    ):
+        """Re-index the given Documents, after they have been changed. This
+        takes time proportional to the size of the posting lists of the
+        given kinds, so the specific update functions (such as
+        :func:`relabel_entities`) should be preferred where possible.
+
+        Args:
+            documents (Sequence[Document]): The indexed Documents.
+            doc_ids (Iterable[int]): The ids of the changed Documents.
+            kinds (Tuple[str], optional): The kinds of key that may have
+               changed.
+        """
+        doc_ids = sorted(set(doc_ids))
+        if not doc_ids:
+            return
+        changed = set(doc_ids)
+        added = {kind: {} for kind in kinds}
+        for doc_id in doc_ids:
+            keys = _document_keys(documents[doc_id], kinds)
+            for kind in kinds:
+                for key in keys[kind]:
+                    added[kind].setdefault(key, []).append(doc_id)
+
+        for kind in kinds:
+            postings = self._postings[kind]
+            for key in list(postings):
+                posting = postings[key]
+                if changed.isdisjoint(posting):
+                    continue
+                posting = array("I", (i for i in posting if i not in changed))
+                if posting:
+                    postings[key] = posting
+                else:
+                    del postings[key]
+            for key, ids in added[kind].items():
+                postings[key] = _union(postings.get(key), array("I", ids))
+
+    def _rename(self, kind: str, mapping: Dict):
+        """Rename the given keys, merging the posting lists of keys that
+        are renamed to the same key.
+
+        Args:
+            kind (str): The kind of key.
+            mapping (Dict): The new name of each renamed key.
+        """
+        postings = self._postings[kind]
+        moved = [
+            (new, postings.pop(old))
+            for old, new in mapping.items()
+            if old != new and old in postings
+        ]
+        for new, posting in moved:
+            postings[new] = _union(postings.get(new), posting)
+
+    def __len__(self) -> int:
+        return self.n_documents
+
+    def __repr__(self):
+        sizes = ", ".join(
+            f"{len(postings)} {kind}"
+            for kind, postings in self._postings.items()
+        )
+        return f"<InvertedIndex of {self.n_documents} documents: {sizes}>"
+
+
+# Returned when a key has no posting list
+_EMPTY = array("I")
+
+
+def _document_keys(document: Document, kinds: Tuple[str] = KINDS) -> Dict:
+    """Return the keys of each kind that the given Document contains.
+
+    Args:
+        document (Document): The Document.
+        kinds (Tuple[str], optional): The kinds of key to return.
+
+    Returns:
+        Dict[str, set]: The keys of each kind.
+    """
+    annotation = document.annotation
+    if annotation is None:
+        return {kind: () for kind in kinds}
+    keys = {}
+    if "tokens" in kinds:
+        keys["tokens"] = set(annotation.tokens)
+    if "entities" in kinds:
+        keys["entities"] = {m.label for m in annotation.mentions}
+    if "relations" in kinds or "triples" in kinds:
+        relations = annotation.relations
+        keys["relations"] = {r.label for r in relations}
+        keys["triples"] = {
+            (r.start.label, r.label, r.end.label) for r in relations
+        }
+    return keys
+
+
+def _union(a: array, b: array) -> array:
+    """Return the union of the given posting lists.
+
+    Args:
+        a (array): A sorted posting list (or None).
+        b (array): Another sorted posting list.
+
+    Returns:
+        array: The sorted union.
+    """
+    if not a:
+        return b
+    if a[-1] < b[0]:
+        return a + b
+    return array("I", sorted(set(a).union(b)))
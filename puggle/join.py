@@ -0,0 +1,203 @@
+"""Functions for joining structured data to annotations by a key, rather
+than by row number."""
+from typing import Dict, Iterator, Mapping, Tuple
+
+from .Annotation import Annotation
+from .structured_data import StructuredData
+from .logger import logger
+
+JOIN_METHODS = ["hash", "merge"]
+
+
+def join_key(value) -> Tuple:
+    """Normalise the given key so that keys read from the structured data
+    (usually strings) can be compared with keys read from the annotations
+    (usually ints or strings). Integers sort numerically, before any other
+    keys, which sort as strings.
+
+    Args:
+        value: The key.
+
+    Returns:
+        Tuple: The normalised key.
+    """
+    if isinstance(value, bool):
+        return (1, str(value))
+    if isinstance(value, int):
+        return (0, value)
+    value = str(value)
+    digits = value[1:] if value[:1] == "-" else value
+    if digits.isdigit() and str(int(value)) == value:
+        return (0, int(value))
+    return (1, value)
+
+
+def hash_join(
+    structured_data: StructuredData,
+    key_column: str,
+    annotations: Iterator[Tuple[object, Annotation]],
+) -> Iterator[Tuple[Mapping, Annotation]]:
+    """Match each annotation to the row of the structured data with the same
+    key, by building a hash table of the keys of the structured data.
+
+    Args:
+        structured_data (StructuredData): The structured data.
+        key_column (str): The column of the structured data holding the key.
+        annotations (Iterator[Tuple[object, Annotation]]): (key, Annotation)
+           pairs.
+
+    Yields:
+        Tuple[Mapping, Annotation]: The fields of the matching row (or None
+           if there is no matching row), and the Annotation, in the order of
+           the annotations.
+
+    Raises:
+        ValueError: If the key column is missing, or contains duplicate keys.
+    """
+    if key_column not in structured_data.fieldnames:
+        raise ValueError(
+            f'The structured data does not contain the column "{key_column}".'
+        )
+
+    rows = {}
+    for i, key in enumerate(structured_data.column(key_column)):
+        key = join_key(key)
+        if key in rows:
+            raise ValueError(
+                f'Duplicate key "{key[1]}" in the structured data column '
+                f'"{key_column}".'
+            )
+        rows[key] = i
+
+    n_matched = 0
+    n_unmatched = 0
+    for key, ann in annotations:
+        i = rows.get(join_key(key))
+        if i is None:
+            n_unmatched += 1
+            yield None, ann
+        else:
+            n_matched += 1
+            yield structured_data.row(i), ann
+
+    _log_join_results(n_matched, n_unmatched, len(rows) - n_matched)
+
+
+def merge_join(
+    rows: Iterator[Dict],
+    key_column: str,
+    annotations: Iterator[Tuple[object, Annotation]],
+) -> Iterator[Tuple[Mapping, Annotation]]:
+    """Match each annotation to the row of the structured data with the same
+    key, by walking through both in order. Both must be sorted by their key
+    (see :func:`join_key` for how keys are ordered), but neither is ever
+    held in memory, so this works for inputs of any size.
+
+    Args:
+        rows (Iterator[Dict]): The rows of the structured data.
+        key_column (str): The column of the structured data holding the key.
+        annotations (Iterator[Tuple[object, Annotation]]): (key, Annotation)
+           pairs.
+
+    Yields:
+        Tuple[Mapping, Annotation]: The fields of the matching row (or None
+           if there is no matching row), and the Annotation, in the order of
+           the annotations.
+
+    Raises:
+        ValueError: If the key column is missing, or either input is not
+           sorted by its key.
+    """
+    rows = _check_sorted(
+        ((_row_key(row, key_column), row) for row in rows), "structured data"
+    )
+    annotations = _check_sorted(
+        ((join_key(key), ann) for key, ann in annotations), "annotations"
+    )
+
+    n_matched = 0
+    n_unmatched = 0
+    n_rows_unmatched = 0
+    row_key, row = next(rows, (None, None))
+    for key, ann in annotations:
+        while row is not None and row_key < key:
+            n_rows_unmatched += 1
+            row_key, row = next(rows, (None, None))
+        if row is not None and row_key == key:
+            n_matched += 1
+            yield row, ann
+            row_key, row = next(rows, (None, None))
+        else:
+            n_unmatched += 1
+            yield None, ann
+
+    n_rows_unmatched += sum(1 for _ in rows) + (row is not None)
+    _log_join_results(n_matched, n_unmatched, n_rows_unmatched)
+
+
+def _row_key(row: Dict, key_column: str) -> Tuple:
+    """Return the normalised key of the given row.
+
+    Args:
+        row (Dict): The row.
+        key_column (str): The column holding the key.
+
+    Returns:
+        Tuple: The normalised key.
+
+    Raises:
+        ValueError: If the row does not contain the key column.
+    """
+    if key_column not in row:
+        raise ValueError(
+            f'The structured data does not contain the column "{key_column}".'
+        )
+    return join_key(row[key_column])
+
+
+def _check_sorted(items: Iterator[Tuple], name: str) -> Iterator[Tuple]:
+    """Pass through the given (key, value) pairs, ensuring that they are
+    sorted by key and that no key appears twice.
+
+    Args:
+        items (Iterator[Tuple]): The (key, value) pairs.
+        name (str): The name of the input, for error messages.
+
+    Yields:
+        Tuple: Each (key, value) pair.
+
+    Raises:
+        ValueError: If the pairs are not sorted by key.
+    """
+    prev_key = None
+    for key, value in items:
+        if prev_key is not None and key <= prev_key:
+            raise ValueError(
+                f"The {name} must be sorted by key (with no duplicate keys) "
+                f'to use a merge join, but key "{key[1]}" comes after '
+                f'"{prev_key[1]}".'
+            )
+        prev_key = key
+        yield key, value
+
+
+def _log_join_results(n_matched: int, n_unmatched: int, n_rows_unmatched):
+    """Log the number of matched and unmatched records of a join.
+
+    Args:
+        n_matched (int): The number of annotations with a matching row.
+        n_unmatched (int): The number of annotations without a matching row.
+        n_rows_unmatched (int): The number of rows without a matching
+           annotation.
+    """
+    logger.info(f"Joined {n_matched} annotations to the structured data.")
+    if n_unmatched:
+        logger.warning(
+            f"{n_unmatched} annotations had no matching row in the "
+            "structured data."
+        )
+    if n_rows_unmatched:
+        logger.warning(
+            f"{n_rows_unmatched} rows of the structured data had no matching "
+            "annotation, and were not loaded."
+        )
@@ -0,0 +1,201 @@
+"""Incremental JSON parsing, used to load large annotation files without
+reading the whole file into memory."""
+import json
+from typing import IO, Iterator, Tuple
+
+CHUNK_SIZE = 1 << 16  # Number of characters read from the file at a time
+
+_WHITESPACE = " \t\n\r"
+
+
+class JSONStreamReader:
+    """Reads JSON values one at a time from a text file object.
+
+    Only the current value (plus one chunk of look-ahead) is ever held in
+    memory, so arrays of records can be parsed element by element.
+    """
+
+    def __init__(self, f: IO, chunk_size: int = CHUNK_SIZE):
+        """Create a new JSONStreamReader.
+
+        Args:
+            f (IO): The text file object to read from.
+            chunk_size (int, optional): Number of characters to read from
+               the file at a time.
+        """
+        self._f = f
+        self._chunk_size = chunk_size
+        self._buf = ""
+        self._pos = 0
+        self._eof = False
+        self._decoder = json.JSONDecoder()
+
+    def _fill(self, min_size: int = 0) -> bool:
+        """Read another chunk from the file into the buffer, discarding the
+        part of the buffer that has already been consumed.
+
+        Args:
+            min_size (int, optional): Read at least this many characters
+               (used to grow the buffer when a value is larger than one
+               chunk).
+
+        Returns:
+            bool: False if the end of the file has been reached.
+        """
+        if self._eof:
+            return False
+        chunk = self._f.read(max(self._chunk_size, min_size))
+        if not chunk:
+            self._eof = True
+            return False
+        self._buf = self._buf[self._pos :] + chunk
+        self._pos = 0
+        return True
+
+    def peek(self) -> str:
+        """Skip whitespace and return the next character without consuming
+        it.
+
+        Returns:
+            str: The next character, or an empty string at the end of the
+               file.
+        """
+        while True:
+            buf = self._buf
+            pos = self._pos
+            while pos < len(buf) and buf[pos] in _WHITESPACE:
+                pos += 1
+            self._pos = pos
+            if pos < len(buf):
+                return buf[pos]
+            if not self._fill():
+                return ""
+
+    def expect(self, chars: str) -> str:
+        """Consume the next character, which must be one of chars.
+
+        Args:
+            chars (str): The allowed characters.
+
+        Returns:
+            str: The consumed character.
+
+        Raises:
+            ValueError: If the next character is not one of chars.
+        """
+        c = self.peek()
+        if c == "" or c not in chars:
+            raise ValueError(
+                f"Expected one of {list(chars)} but found "
+                f"{repr(c) if c else 'end of file'}."
+            )
+        self._pos += 1
+        return c
+
+    def read_value(self):
+        """Decode and consume the next complete JSON value.
+
+        Returns:
+            The decoded value.
+
+        Raises:
+            json.JSONDecodeError: If the value is not valid JSON.
+        """
+        self.peek()
+        while True:
+            try:
+                value, end = self._decoder.raw_decode(self._buf, self._pos)
+            except json.JSONDecodeError as e:
+                # The value may simply be cut off at the end of the buffer,
+                # in which case read more of the file and try again.
+                truncated = e.pos >= len(self._buf) - 6 or e.msg.startswith(
+                    "Unterminated string"
+                )
+                if truncated and self._fill(len(self._buf)):
+                    continue
+                raise
+            # A number (or literal) ending exactly at the end of the buffer
+            # might continue in the next chunk.
+            if end == len(self._buf) and self._fill(len(self._buf)):
+                continue
+            self._pos = end
+            return value
+
+    def iter_array(self) -> Iterator:
+        """Iterate over the elements of the JSON array starting at the
+        current position, consuming the closing bracket.
+
+        Yields:
+            Each decoded element of the array.
+        """
+        self.expect("[")
+        if self.peek() == "]":
+            self._pos += 1
+            return
+        while True:
+            yield self.read_value()
+            if self.expect(",]") == "]":
+                return
+
+
+def iter_json_records(f: IO) -> Iterator[Tuple[str, dict]]:
+    """Iterate over the records of a JSON file, one at a time.
+
+    The file must contain either a top-level list of records, or a
+    top-level object mapping keys (such as QuickGraph annotator names) to
+    lists of records.
+
+    Args:
+        f (IO): The text file object to read from.
+
+    Yields:
+        Tuple[str, dict]: The key the record was listed under (None for a
+           top-level list), and the record itself.
+
+    Raises:
+        ValueError: If the file does not contain a list or an object of
+           lists.
+    """
+    reader = JSONStreamReader(f)
+    c = reader.peek()
+    if c == "[":
+        for record in reader.iter_array():
+            yield None, record
+    elif c == "{":
+        reader.expect("{")
+        if reader.peek() == "}":
+            reader.expect("}")
+        else:
+            while True:
+                key = reader.read_value()
+                reader.expect(":")
+                for record in reader.iter_array():
+                    yield key, record
+                if reader.expect(",}") == "}":
+                    break
+    else:
+        raise ValueError(
+            "File must contain either a list or an object of lists."
+        )
+    if reader.peek() != "":
+        raise ValueError("Unexpected data after the end of the JSON value.")
+
+
+def iter_jsonl_records(
+    f: IO, raw: bool = False
+) -> Iterator[Tuple[str, dict]]:
+    """Iterate over the records of a JSON Lines file (one record per line),
+    one at a time. Blank lines are ignored.
+
+    Args:
+        f (IO): The text file object to read from.
+        raw (bool, optional): If True, yield each line without decoding it,
+           so that it can be decoded elsewhere (e.g. in another process).
+
+    Yields:
+        Tuple[str, dict]: None (JSON Lines files have no keys, but this
+           mirrors :func:`iter_json_records`), and the record itself.
+    """
+    for line in f:
+        if line.strip():
+            yield None, line if raw else json.loads(line)
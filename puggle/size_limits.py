@@ -1,8 +1,86 @@
 """Size limit global variables."""
+from typing import Dict
 
 
-MAX_ROWS = 200000  # Maximum number of sents/rows
+MAX_ROWS = None  # Maximum number of sents/rows (None for no limit)
 MAX_SENT_LENGTH = 1000  # Maximum words in each sentence
 MAX_WORD_LENGTH = 100  # Maximum length of each word
 
 MAX_CATEGORIES = 100  # Maximum number of categories in a categorical field.
+
+
+class LimitError(ValueError):
+    """Raised when data exceeds one of the size limits.
+
+    :var limit: The name of the limit that was exceeded (e.g.
+       "max_word_length").
+    """
+
+    def __init__(self, message: str, limit: str):
+        """Create a new LimitError.
+
+        Args:
+            message (str): The error message.
+            limit (str): The name of the limit that was exceeded.
+        """
+        super().__init__(message)
+        self.limit = limit
+
+
+class Limits:
+    """A set of size limits, which may be used in place of the global
+    variables above for a single call (e.g. of
+    :func:`puggle.Dataset.Dataset.load_documents`). Any limit that is not
+    given takes the value of the corresponding global variable.
+
+    :var max_rows: The maximum number of documents (None for no limit).
+    :var max_sent_length: The maximum number of tokens in each document.
+    :var max_word_length: The maximum length of each token.
+    :var max_categories: The maximum number of distinct values in a field
+       for it to be stored as a categorical field.
+    """
+
+    __slots__ = (
+        "max_rows",
+        "max_sent_length",
+        "max_word_length",
+        "max_categories",
+    )
+
+    def __init__(
+        self,
+        max_rows: int = None,
+        max_sent_length: int = None,
+        max_word_length: int = None,
+        max_categories: int = None,
+    ):
+        """Create a new set of Limits.
+
+        Args:
+            max_rows (int, optional): Defaults to MAX_ROWS.
+            max_sent_length (int, optional): Defaults to MAX_SENT_LENGTH.
+            max_word_length (int, optional): Defaults to MAX_WORD_LENGTH.
+            max_categories (int, optional): Defaults to MAX_CATEGORIES.
+        """
+        self.max_rows = MAX_ROWS if max_rows is None else max_rows
+        self.max_sent_length = (
+            MAX_SENT_LENGTH if max_sent_length is None else max_sent_length
+        )
+        self.max_word_length = (
+            MAX_WORD_LENGTH if max_word_length is None else max_word_length
+        )
+        self.max_categories = (
+            MAX_CATEGORIES if max_categories is None else max_categories
+        )
+
+    def to_dict(self) -> Dict[str, int]:
+        """Return a dictionary representation of these Limits.
+
+        Returns:
+            Dict[str, int]: The value of each limit.
+        """
+        return {name: getattr(self, name) for name in self.__slots__}
+
+    def __repr__(self):
+        limits = ", ".join(f"{k}={v}" for k, v in self.to_dict().items())
+        return f"Limits({limits})"
@@ -0,0 +1,281 @@
+"""A columnar store for the structured data (i.e. the CSV) of a Dataset."""
+import csv
+from array import array
+from collections.abc import Mapping
+from datetime import date, datetime
+from typing import IO, Callable, Dict, List, Sequence
+
+from . import size_limits
+
+# The formats tried (in order) when inferring whether a column holds dates
+DATE_FORMATS = ["%Y-%m-%d", "%d/%m/%Y"]
+
+
+class StructuredData:
+    """Structured data stored as one array per column, rather than one dict
+    per row. Each column is stored as either:
+
+    * an array of ints or floats (when inferring types),
+    * a list of dates (when inferring types),
+    * an array of codes into a list of categories, if the column has at
+      most `size_limits.MAX_CATEGORIES` distinct values, or
+    * a list of strings, where each distinct string is stored only once.
+
+    :var fieldnames: The names of the columns.
+    """
+
+    def __init__(self, fieldnames: List[str], columns: Dict[str, list]):
+        """Create a new StructuredData from the given columns of values.
+
+        Args:
+            fieldnames (List[str]): The names of the columns.
+            columns (Dict[str, list]): The values of each column.
+        """
+        self.fieldnames = list(fieldnames)
+        self._columns = columns
+        self._categories = {}
+        self._n_rows = len(columns[fieldnames[0]]) if fieldnames else 0
+
+    @staticmethod
+    def from_csv(
+        f: IO, infer_types: bool = False, max_categories: int = None
+    ):
+        """Read a StructuredData from the given CSV file object. The first row
+        of the file should be a header with the names of each column.
+
+        Args:
+            f (IO): The CSV file object.
+            infer_types (bool, optional): If True, columns in which every
+               value is an int, float or date (see DATE_FORMATS) are
+               converted to that type. Otherwise all values are strings.
+            max_categories (int, optional): The maximum number of distinct
+               values of a column for it to be stored as categories.
+               Defaults to `size_limits.MAX_CATEGORIES`.
+
+        Returns:
+            StructuredData: The structured data.
+        """
+        if max_categories is None:
+            max_categories = size_limits.MAX_CATEGORIES
+        reader = csv.reader(f)
+        fieldnames = next(reader, [])
+        values = [[] for _ in fieldnames]
+        # Share a single string object between all equal values
+        interned = [{} for _ in fieldnames]
+        n_fields = len(fieldnames)
+        for row in reader:
+            if not row:
+                continue
+            if len(row) < n_fields:
+                row = row + [None] * (n_fields - len(row))
+            for column, seen, v in zip(values, interned, row):
+                column.append(seen.setdefault(v, v))
+
+        sd = StructuredData(fieldnames, dict(zip(fieldnames, values)))
+        for name, seen in zip(fieldnames, interned):
+            if infer_types and sd._infer_type(name):
+                continue
+            if len(seen) <= max_categories:
+                sd._encode_categories(name, list(seen))
+        return sd
+
+    def _infer_type(self, name: str) -> bool:
+        """Convert the given column to ints, floats or dates if all of its
+        values can be converted.
+
+        Args:
+            name (str): The name of the column.
+
+        Returns:
+            bool: True if the column was converted.
+        """
+        column = self._columns[name]
+        if not column or None in column:
+            return False
+        for typecode, convert in [("q", _to_int), ("d", _to_float)]:
+            try:
+                self._columns[name] = array(typecode, map(convert, column))
+                return True
+            except (ValueError, OverflowError):
+                pass
+        for date_format in DATE_FORMATS:
+            try:
+                self._columns[name] = [
+                    datetime.strptime(v, date_format).date() for v in column
+                ]
+                return True
+            except ValueError:
+                pass
+        return False
+
+    def _encode_categories(self, name: str, categories: List[str]):
+        """Store the given column as an array of codes into the given list of
+        categories.
+
+        Args:
+            name (str): The name of the column.
+            categories (List[str]): The distinct values of the column.
+        """
+        codes = {c: i for i, c in enumerate(categories)}
+        typecode = "B" if len(categories) <= 256 else "H"
+        self._columns[name] = array(
+            typecode, [codes[v] for v in self._columns[name]]
+        )
+        self._categories[name] = categories
+
+    def __len__(self) -> int:
+        return self._n_rows
+
+    def value(self, name: str, i: int):
+        """Return the value of the given column for the given row.
+
+        Args:
+            name (str): The name of the column.
+            i (int): The index of the row.
+
+        Returns:
+            The value.
+        """
+        v = self._columns[name][i]
+        categories = self._categories.get(name)
+        return v if categories is None else categories[v]
+
+    def column(self, name: str) -> Sequence:
+        """Return every value of the given column.
+
+        Args:
+            name (str): The name of the column.
+
+        Returns:
+            Sequence: The values of the column, in row order.
+        """
+        categories = self._categories.get(name)
+        if categories is None:
+            return self._columns[name]
+        return [categories[code] for code in self._columns[name]]
+
+    def where(self, name: str, predicate: Callable) -> List[int]:
+        """Return the indexes of the rows for which the given predicate is
+        true of the given column. For categorical columns the predicate is
+        only evaluated once per category.
+
+        Args:
+            name (str): The name of the column.
+            predicate (Callable): A function taking a value and returning a
+               bool.
+
+        Returns:
+            List[int]: The indexes of the matching rows.
+        """
+        categories = self._categories.get(name)
+        column = self._columns[name]
+        if categories is None:
+            return [i for i, v in enumerate(column) if predicate(v)]
+        matching = {code for code, c in enumerate(categories) if predicate(c)}
+        return [i for i, code in enumerate(column) if code in matching]
+
+    def row(self, i: int):
+        """Return the fields of the given row.
+
+        Args:
+            i (int): The index of the row.
+
+        Returns:
+            Fields: A read-only mapping from column name to value.
+        """
+        return Fields(self, i)
+
+    def rows(self):
+        """Iterate over the fields of each row.
+
+        Yields:
+            Fields: The fields of each row.
+        """
+        for i in range(self._n_rows):
+            yield Fields(self, i)
+
+
+class Fields(Mapping):
+    """The fields of a single row of a :class:`StructuredData`, which are
+    read from the columns when accessed. Behaves like a read-only dict.
+    """
+
+    __slots__ = ("_data", "_i")
+
+    def __init__(self, data: StructuredData, i: int):
+        """Create a new Fields.
+
+        Args:
+            data (StructuredData): The structured data.
+            i (int): The index of the row.
+        """
+        self._data = data
+        self._i = i
+
+    def __getitem__(self, key: str):
+        if key not in self._data._columns:
+            raise KeyError(key)
+        return self._data.value(key, self._i)
+
+    def __iter__(self):
+        return iter(self._data.fieldnames)
+
+    def __len__(self) -> int:
+        return len(self._data.fieldnames)
+
+    def __repr__(self):
+        return repr(dict(self))
+
+
+def _to_int(v: str) -> int:
+    """Convert the given string to an int, but only if it is written in the
+    usual way (so that values such as "007" are left as strings).
+
+    Args:
+        v (str): The string.
+
+    Returns:
+        int: The int.
+
+    Raises:
+        ValueError: If the string is not an int.
+    """
+    i = int(v)
+    if str(i) != v:
+        raise ValueError(f"{v} is not a canonical int.")
+    return i
+
+
+def _to_float(v: str) -> float:
+    """Convert the given string to a float, leaving values with leading zeros
+    (such as "007") as strings.
+
+    Args:
+        v (str): The string.
+
+    Returns:
+        float: The float.
+
+    Raises:
+        ValueError: If the string is not a float.
+    """
+    digits = v.lstrip("+-")
+    if len(digits) > 1 and digits[0] == "0" and digits[1].isdigit():
+        raise ValueError(f"{v} has leading zeros.")
+    return float(v)
+
+
+def fields_to_dict(fields: Mapping) -> Dict:
+    """Convert the given fields to a JSON-serialisable dict, i.e. with any
+    dates converted to strings in ISO format.
+
+    Args:
+        fields (Mapping): The fields.
+
+    Returns:
+        Dict: The fields as a dict.
+    """
+    return {
+        k: v.isoformat() if isinstance(v, date) else v
+        for k, v in fields.items()
+    }
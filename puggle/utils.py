@@ -1,5 +1,11 @@
 """Utility functions such as normalising annotation formats, etc."""
-from typing import Dict
+import bz2
+import gzip
+import lzma
+from typing import IO, Dict
+
+from .Annotation import Annotation
+from .size_limits import Limits
 
 
 def validate_anns_format(anns_format: str):
@@ -33,6 +39,31 @@ def normalise_annotation_format(doc: Dict, anns_format: str):
     return _normalise_spert(doc)
 
 
+def build_annotation(
+    doc: Dict, anns_format: str, limits: Limits = None
+) -> Annotation:
+    """Build an Annotation directly from the given document (as a dict),
+    without normalising it first. Equivalent to (but faster than) calling
+    :func:`normalise_annotation_format` followed by
+    :func:`puggle.Annotation.Annotation.from_dict`. The document is not
+    modified.
+
+    Args:
+        doc (Dict): The document.
+        anns_format (str): The annotation format.
+        limits (Limits, optional): The limits to validate the document
+           against. Defaults to the global limits.
+
+    Returns:
+        Annotation: The Annotation.
+    """
+    validate_anns_format(anns_format)
+
+    if anns_format == "quickgraph":
+        return Annotation.from_quickgraph(doc, limits)
+    return Annotation.from_spert(doc, limits)
+
+
 def _normalise_spert(doc: Dict):
     """Normalise the spert-formatted JSON to be parsable by puggle.
 
@@ -92,3 +123,45 @@ def _normalise_quickgraph(doc: Dict):
             del r["id"]
 
     return doc
+
+
+# The stdlib module used to read and write each kind of compressed file
+COMPRESSION_MODULES = {".gz": gzip, ".bz2": bz2, ".xz": lzma}
+
+
+def strip_compression_suffix(filename: str) -> str:
+    """Remove the compression suffix (.gz, .bz2 or .xz), if any, from the
+    given filename, e.g. "annotations.json.gz" becomes "annotations.json".
+
+    Args:
+        filename (str): The filename.
+
+    Returns:
+        str: The filename without its compression suffix.
+    """
+    filename = str(filename)
+    for suffix in COMPRESSION_MODULES:
+        if filename.endswith(suffix):
+            return filename[: -len(suffix)]
+    return filename
+
+
+def open_file(filename: str, mode: str = "r", newline: str = None) -> IO:
+    """Open the given file in text mode with utf-8 encoding. If the filename
+    ends in .gz, .bz2 or .xz the file is transparently (de)compressed as it
+    is read or written, without ever holding the whole file in memory.
+
+    Args:
+        filename (str): The filename to open.
+        mode (str, optional): "r" to read, or "w" to write.
+        newline (str, optional): Passed through to open().
+
+    Returns:
+        IO: The text file object.
+    """
+    for suffix, module in COMPRESSION_MODULES.items():
+        if str(filename).endswith(suffix):
+            return module.open(
+                filename, mode + "t", encoding="utf-8", newline=newline
+            )
+    return open(filename, mode, encoding="utf-8", newline=newline)
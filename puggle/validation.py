@@ -0,0 +1,136 @@
+"""Handling of records that fail validation when loading a Dataset, which
+may either abort the load, be skipped, or be skipped and written to a
+quarantine file (see :func:`puggle.Dataset.Dataset.load_documents`)."""
+import json
+import os
+from collections import Counter
+from typing import Dict, Union
+
+from .logger import logger
+from .utils import open_file
+
+# The ways of handling a record that fails validation
+ON_ERROR = ("raise", "skip", "quarantine")
+
+
+def validate_on_error(on_error: str):
+    """Helper function to ensure on_error is valid.
+
+    Args:
+        on_error (str): The way of handling invalid records.
+
+    Raises:
+        ValueError: If on_error is not valid.
+    """
+    if on_error not in ON_ERROR:
+        raise ValueError(f"on_error must be one of {ON_ERROR}.")
+
+
+class Rejected:
+    """A record that failed validation, which takes the place of its
+    Annotation when loading with `on_error="skip"` or
+    `on_error="quarantine"`.
+
+    :var reason: Why the record was rejected.
+    :var record: The record, either as a dict or as an undecoded line of a
+       JSON Lines file.
+    :var category: The kind of reason (such as the name of the limit that
+       the record exceeded), by which rejected records are counted.
+    """
+
+    __slots__ = ("reason", "record", "category")
+
+    def __init__(
+        self, reason: str, record: Union[Dict, str], category: str = None
+    ):
+        """Create a new Rejected record.
+
+        Args:
+            reason (str): Why the record was rejected.
+            record (Union[Dict, str]): The record.
+            category (str, optional): The kind of reason. Defaults to the
+               reason itself.
+        """
+        self.reason = reason
+        self.record = record
+        self.category = reason if category is None else category
+
+    def __repr__(self):
+        return f"<Rejected: {self.reason}>"
+
+
+class Quarantine:
+    """Collects the records that failed validation, writing each one (with
+    the reason it was rejected) as a line of a JSON Lines file if a filename
+    is given. Should be used as a context manager.
+
+    :var filename: The file to write the rejected records to, or None.
+    :var reasons: The number of records rejected for each category of
+       reason (see :class:`Rejected`).
+    """
+
+    def __init__(self, filename: os.path = None):
+        """Create a new Quarantine.
+
+        Args:
+            filename (os.path, optional): The file to write the rejected
+               records to. If not given, rejected records are only counted.
+        """
+        self.filename = filename
+        self.reasons = Counter()
+        self._file = None
+
+    def __enter__(self):
+        if self.filename is not None:
+            self._file = open_file(self.filename, "w")
+        return self
+
+    def __exit__(self, *exc_info):
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+        self.log_summary()
+
+    def add(self, index: int, rejected: Rejected):
+        """Record the given rejected record.
+
+        Args:
+            index (int): The position of the record in its file.
+            rejected (Rejected): The rejected record.
+        """
+        self.reasons[rejected.category] += 1
+        if self._file is None:
+            return
+        record = rejected.record
+        if isinstance(record, str):
+            # Undecoded lines may not be valid JSON, so are kept as strings
+            record = record.rstrip("\n")
+        line = {
+            "index": index,
+            "category": rejected.category,
+            "reason": rejected.reason,
+            "record": record,
+        }
+        self._file.write(json.dumps(line, ensure_ascii=False) + "\n")
+
+    def __len__(self) -> int:
+        return sum(self.reasons.values())
+
+    def log_summary(self):
+        """Log the number of rejected records, and the most common reasons
+        they were rejected."""
+        if not self.reasons:
+            return
+        destination = (
+            f" and written to {self.filename}"
+            if self.filename is not None
+            else ""
+        )
+        logger.warning(
+            f"{len(self)} invalid records were skipped{destination}. "
+            "Most common reasons: "
+            + "; ".join(
+                f"{reason} ({n})"
+                for reason, n in self.reasons.most_common(5)
+            )
+        )
@@ -0,0 +1,87 @@
+"""Views of a subset of the Documents of a Dataset, which are stored as the
+indexes of the Documents rather than as copies of them."""
+from array import array
+from collections.abc import Sequence
+from typing import Iterable
+
+from .Document import Document
+
+
+class DocumentSubset(Sequence):
+    """A view of some of the Documents of another sequence of Documents
+    (such as the documents of a Dataset), in the given order.
+
+    Documents are copied on write: the view's Documents are shared with the
+    source until :func:`writable` is called, which replaces the Document in
+    this view (only) with a copy that may be changed.
+
+    :var source: The sequence of Documents.
+    :var ids: The indexes of the Documents of the view in the source.
+    """
+
+    def __init__(self, source: Sequence, ids: Iterable[int]):
+        """Create a new DocumentSubset. If the source is itself a
+        DocumentSubset, the view is of the source of that subset instead
+        (sharing any Documents that the subset has copied).
+
+        Args:
+            source (Sequence): The sequence of Documents.
+            ids (Iterable[int]): The indexes of the Documents of the view in
+               the source.
+        """
+        ids = array("I", ids)
+        # Documents that this view has copied, by index in the view
+        self._copies = {}
+        # The indexes of the copies that are not shared with another view
+        self._owned = set()
+        if isinstance(source, DocumentSubset):
+            self._copies = {
+                i: source._copies[j]
+                for i, j in enumerate(ids)
+                if j in source._copies
+            }
+            source._owned.clear()
+            ids = array("I", (source.ids[j] for j in ids))
+            source = source.source
+        self.source = source
+        self.ids = ids
+
+    def writable(self, i: int) -> Document:
+        """Return the Document at the given index, first replacing it with a
+        copy if it is shared with the source or another view.
+
+        Args:
+            i (int): The index of the Document.
+
+        Returns:
+            Document: The Document, which may be changed.
+        """
+        if i < 0:
+            i += len(self.ids)
+        if i not in self._owned:
+            self._copies[i] = self[i].copy()
+            self._owned.add(i)
+        return self._copies[i]
+
+    def __len__(self) -> int:
+        return len(self.ids)
+
+    def __getitem__(self, i):
+        if isinstance(i, slice):
+            return DocumentSubset(self, range(len(self.ids))[i])
+        if i < 0:
+            i += len(self.ids)
+        copy = self._copies.get(i)
+        if copy is not None:
+            return copy
+        return self.source[self.ids[i]]
+
+    def __iter__(self):
+        copies = self._copies
+        source = self.source
+        for i, j in enumerate(self.ids):
+            copy = copies.get(i)
+            yield source[j] if copy is None else copy
+
+    def __repr__(self):
+        return f"<DocumentSubset of {len(self)} documents>"
@@ -0,0 +1,143 @@
+"""A vocabulary of the tokens and labels of a Dataset, which interns each
+distinct string so that it is only stored once, and maps it to an integer
+id."""
+from array import array
+from typing import Dict, Iterator, List, Union
+
+from .Annotation import Annotation
+from .Mention import Mention
+from .Relation import Relation
+
+
+class Vocabulary:
+    """A mapping between strings (tokens and labels) and integer ids.
+    Ids are assigned in the order that strings are first added, starting
+    from 0.
+    """
+
+    def __init__(self, strings: List[str] = None):
+        """Create a new Vocabulary.
+
+        Args:
+            strings (List[str], optional): Strings to add to the vocabulary.
+        """
+        self._ids: Dict[str, int] = {}
+        self._strings: List[str] = []
+        for s in strings or []:
+            self.add(s)
+
+    def add(self, s: str) -> int:
+        """Add the given string to the vocabulary (if it is not already
+        present) and return its id.
+
+        Args:
+            s (str): The string.
+
+        Returns:
+            int: The id of the string.
+        """
+        i = self._ids.get(s)
+        if i is None:
+            i = self._ids[s] = len(self._strings)
+            self._strings.append(s)
+        return i
+
+    def intern(self, s: str) -> str:
+        """Return the copy of the given string that is stored in the
+        vocabulary, adding it if it is not already present.
+
+        Args:
+            s (str): The string.
+
+        Returns:
+            str: The interned string.
+        """
+        return self._strings[self.add(s)]
+
+    def id(self, s: str) -> int:
+        """Return the id of the given string.
+
+        Args:
+            s (str): The string.
+
+        Returns:
+            int: The id, or None if the string is not in the vocabulary.
+        """
+        return self._ids.get(s)
+
+    def string(self, i: int) -> str:
+        """Return the string with the given id.
+
+        Args:
+            i (int): The id.
+
+        Returns:
+            str: The string.
+
+        Raises:
+            IndexError: If there is no string with that id.
+        """
+        return self._strings[i]
+
+    def add_annotation(self, annotation: Annotation, token_ids: array = None):
+        """Intern the tokens and labels of the given Annotation, and set the
+        ids of its tokens (see :attr:`puggle.Annotation.Annotation.token_ids`)
+        and the label ids of its Mentions and Relations.
+
+        Args:
+            annotation (Annotation): The Annotation.
+            token_ids (array, optional): The ids of the tokens, if they are
+               already known, in which case the tokens must already be
+               interned (e.g. because they were taken from another
+               Annotation in this Vocabulary), and are not looked up again.
+        """
+        ids = self._ids
+        strings = self._strings
+
+        if token_ids is not None:
+            annotation.token_ids = token_ids
+        else:
+            token_ids = array("I")
+            tokens = []
+            for t in annotation.tokens:
+                i = ids.get(t)
+                if i is None:
+                    i = self.add(t)
+                token_ids.append(i)
+                tokens.append(strings[i])
+            annotation.tokens = tokens
+            annotation.token_ids = token_ids
+            for m in annotation._mention_ids_map.values():
+                m.sentence = tokens
+
+        mentions = annotation._mention_ids_map.values()
+        for obj in [*mentions, *annotation.mentions, *annotation.relations]:
+            label_id = ids.get(obj.label)
+            if label_id is None:
+                label_id = self.add(obj.label)
+            obj.label = strings[label_id]
+            obj.label_id = label_id
+
+    def set_label(self, obj: Union[Mention, Relation], label: str):
+        """Set the label of the given Mention or Relation to the interned
+        copy of the given label, and set its label_id.
+
+        Args:
+            obj (Union[Mention, Relation]): The Mention or Relation.
+            label (str): The label.
+        """
+        label_id = self.add(label)
+        obj.label = self._strings[label_id]
+        obj.label_id = label_id
+
+    def __len__(self) -> int:
+        return len(self._strings)
+
+    def __contains__(self, s: str) -> bool:
+        return s in self._ids
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self._strings)
+
+    def __repr__(self):
+        return f"<Vocabulary of {len(self)} strings>"
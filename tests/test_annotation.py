@@ -1,3 +1,5 @@
+import pickle
+
 import pytest
 from puggle import Annotation
 
@@ -14,3 +16,138 @@ def test_annotation_repr():
     }
     a = Annotation.from_dict(d)
     assert str(a).startswith("Tokens: one two\nMentions")
+
+
+def test_annotation_mention_tokens_are_views():
+    """Test that the tokens of each mention are read from the tokens of the
+    annotation, rather than being copied."""
+    d = {
+        "tokens": ["air", "freight", "for", "pump"],
+        "entities": [
+            {"start": 0, "end": 2, "label": "Activity"},
+            {"start": 3, "end": 4, "label": "Item"},
+        ],
+        "relations": [{"start": 0, "end": 1, "type": "hasParticipant"}],
+    }
+    a = Annotation.from_dict(d)
+    m = a.mentions[0]
+    assert m.sentence is a.tokens
+    assert m.tokens == ["air", "freight"]
+    assert m.text == "air freight"
+    assert m.text is m.text
+    assert str(a.relations[0]) == "(air freight)-[hasParticipant]->(pump)"
+
+    m.tokens = ["a", "b"]
+    assert m.sentence is None
+    assert m.text == "a b"
+    assert m.to_dict()["tokens"] == ["a", "b"]
+
+
+def test_annotation_mention_and_relation_equality():
+    d = {
+        "tokens": ["one", "two", "three"],
+        "entities": [
+            {"start": 0, "end": 1, "label": "number"},
+            {"start": 1, "end": 2, "label": "number"},
+            {"start": 2, "end": 3, "label": "number"},
+        ],
+        "relations": [
+            {"start": 0, "end": 1, "type": "smaller_than"},
+            {"start": 0, "end": 1, "type": "smaller_than"},
+            {"start": 0, "end": 1, "type": "bigger_than"},
+            {"start": 0, "end": 2, "type": "smaller_than"},
+        ],
+    }
+    a = Annotation.from_dict(d)
+    b = Annotation.from_dict(d)
+    assert a.mentions == b.mentions
+    assert a.mentions[0] != a.mentions[1]
+    assert set(a.mentions) == set(b.mentions)
+    assert a.relations[0] == a.relations[1] == b.relations[0]
+    assert a.relations[0] != a.relations[2]
+    assert a.relations[0] != a.relations[3]
+    assert len(set(a.relations)) == 3
+
+    assert a.remove_duplicate_relations() == 1
+    assert a.relations == [b.relations[0], b.relations[2], b.relations[3]]
+    assert a.remove_duplicate_relations() == 0
+
+
+def test_annotation_indexes():
+    d = {
+        "tokens": ["air", "freight", "for", "pump", ".", "pump", "leak"],
+        "entities": [
+            {"start": 3, "end": 4, "label": "Item"},
+            {"start": 0, "end": 2, "label": "Activity"},
+            {"start": 5, "end": 6, "label": "Item"},
+            {"start": 6, "end": 7, "label": "State"},
+        ],
+        "relations": [
+            {"start": 1, "end": 0, "type": "hasParticipant"},
+            {"start": 3, "end": 2, "type": "hasPatient"},
+            {"start": 1, "end": 2, "type": "hasParticipant"},
+        ],
+    }
+    a = Annotation.from_dict(d)
+    item, activity, item2, state = a.mentions
+    r1, r2, r3 = a.relations
+
+    assert a.mentions_in_span(0, 4) == [item, activity]
+    assert a.mentions_in_span(0, 3) == [activity]
+    assert a.mentions_in_span(5, 7) == [item2, state]
+    assert a.mentions_with_label("Item") == [item, item2]
+    assert a.mentions_with_label("Other") == []
+    assert a.relations_in_span(0, 4) == [r1]
+    assert a.relations_in_span(0, 7) == [r1, r2, r3]
+    assert a.relations_from(activity) == [r1, r3]
+    assert a.relations_to(item2) == [r2, r3]
+    assert a.relations_from(item) == []
+
+    # Reassigning the mentions or relations clears the indexes
+    a.mentions = [activity, item2]
+    assert a.mentions_with_label("Item") == [item2]
+    a.relations = [r2]
+    assert a.relations_from(activity) == []
+    assert a.relations_to(item2) == [r2]
+
+    # Changes made in place require the indexes to be cleared
+    item2.label = "Other"
+    a.clear_indexes()
+    assert a.mentions_with_label("Other") == [item2]
+
+
+def test_annotation_relation_between_equal_mentions():
+    """Relations may link distinct Mentions that are equal, but not a
+    Mention to itself."""
+    annotation = Annotation(
+        ["a", "b"],
+        [
+            {"start": 0, "end": 1, "label": "X"},
+            {"start": 0, "end": 1, "label": "X"},
+        ],
+        [{"start": 0, "end": 1, "type": "r"}],
+    )
+    assert len(annotation.relations) == 1
+    with pytest.raises(ValueError):
+        Annotation(
+            ["a"],
+            [{"start": 0, "end": 1, "label": "X"}],
+            [{"start": 0, "end": 0, "type": "r"}],
+        )
+
+    # Mentions that become equal after being relabelled can still be
+    # pickled (e.g. sent to a worker process or saved to the cache)
+    annotation = Annotation(
+        ["a", "b"],
+        [
+            {"start": 0, "end": 1, "label": "X"},
+            {"start": 0, "end": 1, "label": "Y"},
+        ],
+        [{"start": 0, "end": 1, "type": "r"}],
+    )
+    annotation.mentions[1].label = "X"
+    copy = pickle.loads(pickle.dumps(annotation))
+    assert copy.to_dict() == annotation.to_dict()
+    assert [(r.start.label, r.end.label) for r in copy.relations] == [
+        ("X", "X")
+    ]
@@ -0,0 +1,89 @@
+import struct
+
+import pytest
+from puggle import Dataset, Document, Annotation
+from puggle.binary_format import SECTIONS
+
+
+@pytest.mark.parametrize(
+    "dataset",
+    ["empty", "small", "medium", "quickgraph_multiple_annotators"],
+    indirect=["dataset"],
+)
+def test_binary_format_round_trip(dataset, tmp_path):
+    out_path = tmp_path / "out.pgl"
+    dataset.save_to_file(out_path, output_format="binary")
+
+    d = Dataset()
+    d.load_binary(out_path)
+    assert d.to_list() == dataset.to_list()
+    assert len(d.documents) == len(dataset.documents)
+
+
+@pytest.mark.parametrize(
+    "dataset_json_path, dataset_csv_path",
+    [("medium", "medium")],
+    indirect=["dataset_json_path", "dataset_csv_path"],
+)
+def test_binary_format_fields_and_document_index(
+    dataset_json_path, dataset_csv_path, tmp_path
+):
+    dataset = Dataset()
+    dataset.load_documents(
+        sd_filename=dataset_csv_path,
+        anns_filename=dataset_json_path,
+        anns_format="spert",
+    )
+    dataset.add_document(
+        Document({"x": "1"}, None, document_index=7, token_offset=3)
+    )
+    out_path = tmp_path / "out.pgl"
+    dataset.save_to_file(out_path, output_format="binary")
+
+    d = Dataset()
+    d.load_binary(out_path)
+    assert d.to_list() == dataset.to_list()
+    assert d.documents[-1].annotation is None
+    assert [doc.document_index for doc in d.documents] == [None, None, 7]
+    assert [doc.token_offset for doc in d.documents] == [None, None, 3]
+
+    # Files saved before the token_offset section was added are still read
+    data = bytearray(out_path.read_bytes())
+    struct.pack_into("<I", data, 9, len(SECTIONS) - 1)
+    out_path.write_bytes(data)
+    d = Dataset()
+    d.load_binary(out_path)
+    assert d.to_list() == dataset.to_list()
+    assert [doc.token_offset for doc in d.documents] == [None, None, None]
+
+
+@pytest.mark.parametrize("dataset", ["medium"], indirect=["dataset"])
+def test_binary_format_lazy_documents(dataset, tmp_path):
+    """Ensure that documents are only built when they are accessed, and
+    that changes to them (and to the list of documents) are kept."""
+    out_path = tmp_path / "out.pgl"
+    dataset.save_to_file(out_path, output_format="binary")
+
+    d = Dataset()
+    d.load_binary(out_path)
+    assert len(d.documents._built) == 0
+
+    d.documents[1].annotation.mentions[0].label = "pingu"
+    assert len(d.documents._built) == 1
+    assert d.documents[1].annotation.mentions[0].label == "pingu"
+
+    new_doc = Document(None, Annotation(["test"], []))
+    d.add_document(new_doc)
+    d.documents.insert(0, new_doc)
+    del d.documents[1]
+    assert d.documents[0] is new_doc and d.documents[-1] is new_doc
+    assert len(d.documents) == 3
+    assert d.documents[0].annotation.mentions == []
+    assert d.documents[0].annotation.tokens == ["test"]
+
+
+def test_binary_format_invalid_file(tmp_path):
+    path = tmp_path / "out.pgl"
+    path.write_bytes(b"not a binary file")
+    with pytest.raises(ValueError):
+        Dataset().load_binary(path)
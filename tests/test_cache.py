@@ -0,0 +1,82 @@
+import os
+import shutil
+import pytest
+from puggle import Dataset
+from puggle.cache import ParseCache
+from puggle.binary_format import LazyDocumentList
+
+
+@pytest.fixture
+def anns_path(tmp_path):
+    """A copy of the medium dataset, so that it can be modified."""
+    path = tmp_path / "medium.json"
+    shutil.copy(
+        os.path.join(os.path.dirname(__file__), "test_dataset", "medium.json"),
+        path,
+    )
+    return str(path)
+
+
+def _load(anns_path, cache):
+    d = Dataset()
+    d.load_documents(anns_filename=anns_path, anns_format="spert", cache=cache)
+    return d
+
+
+def test_cache_hit_and_miss(anns_path, tmp_path):
+    cache = ParseCache(tmp_path / "cache")
+    d = _load(anns_path, cache)
+    assert isinstance(d.documents, list)
+    assert len(cache._keys()) == 1
+
+    d_cached = _load(anns_path, cache)
+    assert isinstance(d_cached.documents, LazyDocumentList)
+    assert d_cached.to_list() == d.to_list()
+
+    # Changing the file should result in a miss
+    os.utime(anns_path, ns=(0, 0))
+    assert isinstance(_load(anns_path, cache).documents, list)
+    assert len(cache._keys()) == 2
+
+
+@pytest.mark.parametrize("hash_contents", [False, True])
+def test_cache_key(anns_path, tmp_path, monkeypatch, hash_contents):
+    cache = ParseCache(tmp_path / "cache", hash_contents=hash_contents)
+    key = cache.key([None, anns_path], "spert")
+    assert cache.key([None, anns_path], "spert") == key
+    assert cache.key([None, anns_path], "quickgraph") != key
+    assert cache.key([anns_path, None], "spert") != key
+
+    monkeypatch.setattr("puggle.size_limits.MAX_WORD_LENGTH", 5)
+    assert cache.key([None, anns_path], "spert") != key
+
+
+def test_cache_invalidate(anns_path, tmp_path):
+    cache = ParseCache(tmp_path / "cache")
+    other_path = str(tmp_path / "other.json")
+    shutil.copy(anns_path, other_path)
+    _load(anns_path, cache)
+    _load(other_path, cache)
+    assert len(cache._keys()) == 2
+
+    assert cache.invalidate(anns_path) == 1
+    assert len(cache._keys()) == 1
+    assert cache.invalidate() == 1
+    assert cache.size() == 0
+
+
+def test_cache_eviction(anns_path, tmp_path):
+    cache = ParseCache(tmp_path / "cache")
+    _load(anns_path, cache)
+    entry_size = cache.size()
+
+    cache.max_size = entry_size
+    other_path = str(tmp_path / "other.json")
+    shutil.copy(anns_path, other_path)
+    first_key = cache._keys()[0]
+    os.utime(cache._path(first_key), (0, 0))
+    _load(other_path, cache)
+
+    # Only the most recently used entry should be kept
+    assert cache.size() == entry_size
+    assert len(cache._keys()) == 1 and cache._keys()[0] != first_key
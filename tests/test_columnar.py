@@ -0,0 +1,102 @@
+import pytest
+from puggle import Dataset, Document, Annotation
+from puggle.columnar import ColumnarDocumentList
+
+DATASETS = ["empty", "small", "medium", "hierarchical", "quickgraph"]
+
+
+@pytest.mark.parametrize("dataset", DATASETS, indirect=["dataset"])
+def test_columnar_round_trip(dataset):
+    expected = dataset.to_list()
+    dataset.to_columnar()
+    assert isinstance(dataset.documents, ColumnarDocumentList)
+    assert dataset.to_list() == expected
+    dataset.to_objects()
+    assert isinstance(dataset.documents, list)
+    assert dataset.to_list() == expected
+
+
+@pytest.mark.parametrize(
+    "dataset, dataset_after",
+    [(name, name) for name in DATASETS],
+    indirect=["dataset", "dataset_after"],
+)
+@pytest.mark.parametrize(
+    "operation, args",
+    [
+        ("drop_entity_class", ["number"]),
+        ("drop_entity_class", ["Item"]),
+        ("drop_relation_class", ["bigger_than"]),
+        ("convert_entity_class", ["number", "pingu"]),
+        ("convert_relation_class", ["bigger_than", "pingu"]),
+        ("flatten_all_entities", []),
+        ("flatten_all_relations", []),
+    ],
+)
+def test_columnar_manipulation(dataset, dataset_after, operation, args):
+    """Test that each manipulation gives the same result with the columnar
+    backend as with Document objects."""
+    getattr(dataset_after, operation)(*args)
+
+    dataset.to_columnar()
+    getattr(dataset, operation)(*args)
+    assert dataset.to_list() == dataset_after.to_list()
+    assert dataset.get_entity_label_counts() == (
+        dataset_after.get_entity_label_counts()
+    )
+    assert dataset.get_entity_label_counts(document_level=True) == (
+        dataset_after.get_entity_label_counts(document_level=True)
+    )
+    assert dataset.get_unique_tokens_count() == (
+        dataset_after.get_unique_tokens_count()
+    )
+
+    dataset.to_objects()
+    assert dataset.to_list() == dataset_after.to_list()
+
+
+@pytest.mark.parametrize("dataset", ["medium"], indirect=["dataset"])
+def test_columnar_views(dataset):
+    dataset.to_columnar()
+    a = dataset.documents[0].annotation
+    m = a.mentions[0]
+    assert a.tokens[m.start : m.end] == m.tokens
+
+    m.label = "changed"
+    assert dataset.documents[0].annotation.mentions[0].label == "changed"
+
+    a.mentions = a.mentions[1:]
+    assert m not in a.mentions
+    assert len(dataset.documents[0].annotation.mentions) == len(a.mentions)
+
+    with pytest.raises(ValueError):
+        a.mentions = list(reversed(a.mentions))
+    with pytest.raises(ValueError):
+        a.tokens = ["a"]
+
+
+@pytest.mark.parametrize("dataset", ["medium"], indirect=["dataset"])
+def test_columnar_add_document(dataset):
+    dataset.to_columnar()
+    n_documents = len(dataset.documents)
+    a = Annotation.from_dict(
+        {
+            "tokens": ["one", "two"],
+            "entities": [
+                {"start": 0, "end": 1, "label": "number"},
+                {"start": 1, "end": 2, "label": "number"},
+            ],
+            "relations": [{"start": 0, "end": 1, "type": "smaller_than"}],
+        }
+    )
+    doc = Document({"x": "1"}, a)
+    dataset.add_document(doc)
+    assert len(dataset.documents) == n_documents + 1
+    assert dataset.documents[-1].to_dict() == doc.to_dict()
+
+
+@pytest.mark.parametrize("dataset", ["medium"], indirect=["dataset"])
+def test_columnar_memory_usage(dataset):
+    usage = dataset.memory_usage()
+    dataset.to_columnar()
+    assert dataset.memory_usage()["per_document"] < usage["per_document"]
@@ -1,8 +1,13 @@
 import json
 import pytest
 import os
+import sys
+import gc
+import gzip
+import bz2
 from pathlib import Path
 from puggle import Dataset
+from puggle.size_limits import Limits
 
 
 @pytest.mark.parametrize(
@@ -190,3 +195,237 @@ def test_dataset_loading_quickgraph(dataset_json_path, num_documents):
 def test_dataset_repr():
     d = Dataset()
     assert str(d) == "Dataset containing 0 documents."
+
+
+@pytest.mark.parametrize(
+    "dataset_json_path, anns_format",
+    [
+        ("medium", "spert"),
+        ("quickgraph", "quickgraph"),
+        ("quickgraph_multiple_annotators", "quickgraph"),
+    ],
+    indirect=["dataset_json_path"],
+)
+def test_dataset_loading_parallel(
+    dataset_json_path, anns_format, tmp_path, monkeypatch
+):
+    """Ensure that loading with multiple workers gives the same documents,
+    in the same order, as loading with a single process."""
+    monkeypatch.setattr(
+        sys.modules["puggle.Dataset"], "PARALLEL_BATCH_SIZE", 1
+    )
+
+    d = Dataset()
+    d.load_documents(anns_filename=dataset_json_path, anns_format=anns_format)
+
+    jsonl_path = tmp_path / "out.jsonl"
+    d.save_to_file(jsonl_path, output_format=anns_format)
+
+    for path in [dataset_json_path, str(jsonl_path)]:
+        d_parallel = Dataset()
+        d_parallel.load_documents(
+            anns_filename=path, anns_format=anns_format, workers=2
+        )
+        assert d_parallel.to_list() == d.to_list()
+
+
+def test_dataset_loading_parallel_gc(monkeypatch):
+    """Ensure that garbage collection is only disabled while the results
+    of the workers are unpickled, not while the caller consumes them."""
+    module = sys.modules["puggle.Dataset"]
+    monkeypatch.setattr(module, "PARALLEL_BATCH_SIZE", 2)
+    assert gc.isenabled()
+    results = module._map_in_pool(sorted, [3, 1, 4, 2, 5], (), 2)
+    assert next(results) == 1
+    assert gc.isenabled()
+    assert list(results) == [3, 2, 4, 5]
+    assert gc.isenabled()
+
+
+@pytest.mark.parametrize(
+    "dataset_json_path, error_type",
+    [
+        ("invalid_mentions_1_missing_keys", KeyError),
+        ("invalid_document_1_long_word", ValueError),
+    ],
+    indirect=["dataset_json_path"],
+)
+def test_dataset_loading_parallel_invalid(dataset_json_path, error_type):
+    d = Dataset()
+    with pytest.raises(error_type):
+        d.load_documents(
+            anns_filename=dataset_json_path, anns_format="spert", workers=2
+        )
+
+
+@pytest.mark.parametrize(
+    "dataset_json_path, dataset_csv_path, suffix",
+    [("medium", "medium", ".gz"), ("medium", "medium", ".bz2")],
+    indirect=["dataset_json_path", "dataset_csv_path"],
+)
+def test_dataset_loading_compressed(
+    dataset_json_path, dataset_csv_path, suffix, tmp_path
+):
+    """Ensure that compressed structured data and annotations can be
+    loaded."""
+    module = {".gz": gzip, ".bz2": bz2}[suffix]
+    paths = []
+    for path in [dataset_csv_path, dataset_json_path]:
+        compressed_path = str(tmp_path / (os.path.basename(path) + suffix))
+        with open(path, "rb") as f_in, module.open(compressed_path, "wb") as f:
+            f.write(f_in.read())
+        paths.append(compressed_path)
+
+    d = Dataset()
+    d.load_documents(
+        sd_filename=dataset_csv_path,
+        anns_filename=dataset_json_path,
+        anns_format="spert",
+    )
+    d_compressed = Dataset()
+    d_compressed.load_documents(
+        sd_filename=paths[0], anns_filename=paths[1], anns_format="spert"
+    )
+    assert d_compressed.to_list() == d.to_list()
+
+
+@pytest.mark.parametrize("dedup_relations, expected", [(False, 3), (True, 1)])
+def test_dataset_loading_dedup_relations(dedup_relations, expected, tmp_path):
+    path = tmp_path / "duplicates.json"
+    with open(path, "w") as f:
+        json.dump(
+            [
+                {
+                    "tokens": ["one", "two", "three"],
+                    "entities": [
+                        {"start": 0, "end": 1, "type": "number"},
+                        {"start": 1, "end": 2, "type": "number"},
+                        # A duplicate of the first entity, so the last
+                        # relation is also a duplicate of the first
+                        {"start": 0, "end": 1, "type": "number"},
+                    ],
+                    "relations": [
+                        {"head": 0, "tail": 1, "type": "smaller_than"},
+                        {"head": 0, "tail": 1, "type": "smaller_than"},
+                        {"head": 2, "tail": 1, "type": "smaller_than"},
+                    ],
+                }
+            ],
+            f,
+        )
+    d = Dataset()
+    d.load_documents(
+        anns_filename=path,
+        anns_format="spert",
+        dedup_relations=dedup_relations,
+    )
+    assert len(d.documents[0].annotation.relations) == expected
+
+
+def _write_dirty_dataset(tmp_path):
+    """Write a JSON Lines file of annotations (and a CSV file of structured
+    data) in which the second, third and fourth records are invalid."""
+    good = {"tokens": ["one", "two"], "entities": [], "relations": []}
+    lines = [
+        json.dumps(good),
+        '{"tokens": ["one", "tw',
+        json.dumps({**good, "tokens": ["x" * 101]}),
+        json.dumps({"entities": [], "relations": []}),
+        json.dumps({**good, "tokens": ["three"]}),
+    ]
+    anns_path = tmp_path / "dirty.jsonl"
+    anns_path.write_text("\n".join(lines) + "\n")
+    sd_path = tmp_path / "dirty.csv"
+    sd_path.write_text("row\n" + "\n".join(map(str, range(5))) + "\n")
+    return str(anns_path), str(sd_path)
+
+
+@pytest.mark.parametrize("workers", [1, 2])
+def test_dataset_loading_quarantine(workers, tmp_path):
+    anns_path, sd_path = _write_dirty_dataset(tmp_path)
+    quarantine_path = tmp_path / "rejected.jsonl"
+
+    d = Dataset()
+    with pytest.raises(ValueError):
+        d.load_documents(anns_filename=anns_path, anns_format="spert")
+
+    d.load_documents(
+        sd_filename=sd_path,
+        anns_filename=anns_path,
+        anns_format="spert",
+        workers=workers,
+        on_error="quarantine",
+        quarantine_filename=quarantine_path,
+    )
+    # The rows of the rejected records are skipped too
+    assert [doc.fields["row"] for doc in d.documents] == ["0", "4"]
+    assert [doc.annotation.tokens for doc in d.documents] == [
+        ["one", "two"],
+        ["three"],
+    ]
+
+    with open(quarantine_path) as f:
+        rejected = [json.loads(line) for line in f]
+    assert [r["index"] for r in rejected] == [1, 2, 3]
+    assert rejected[0]["record"] == '{"tokens": ["one", "tw'
+    assert "Word must be at most" in rejected[1]["reason"]
+    assert "must contain tokens" in rejected[2]["reason"]
+
+
+def test_dataset_loading_skip_invalid(tmp_path):
+    anns_path, _ = _write_dirty_dataset(tmp_path)
+    d = Dataset()
+    d.load_documents(
+        anns_filename=anns_path, anns_format="spert", on_error="skip"
+    )
+    assert len(d.documents) == 2
+
+    with pytest.raises(ValueError):
+        d.load_documents(
+            anns_filename=anns_path, anns_format="spert", on_error="ignore"
+        )
+    with pytest.raises(ValueError):
+        d.load_documents(
+            anns_filename=anns_path, anns_format="spert", on_error="quarantine"
+        )
+
+
+@pytest.mark.parametrize(
+    "dataset_json_path, dataset_csv_path",
+    [("medium", "medium")],
+    indirect=["dataset_json_path", "dataset_csv_path"],
+)
+def test_dataset_loading_limits(dataset_json_path, dataset_csv_path):
+    # The second document has five tokens
+    limits = Limits(max_sent_length=3)
+    with pytest.raises(ValueError):
+        Dataset().load_documents(
+            anns_filename=dataset_json_path, anns_format="spert", limits=limits
+        )
+    d = Dataset()
+    d.load_documents(
+        anns_filename=dataset_json_path,
+        anns_format="spert",
+        limits=limits,
+        on_error="skip",
+    )
+    assert len(d.documents) == 1
+
+    limits = Limits(max_rows=1)
+    with pytest.raises(ValueError):
+        Dataset().load_documents(
+            sd_filename=dataset_csv_path,
+            anns_filename=dataset_json_path,
+            anns_format="spert",
+            limits=limits,
+        )
+    d = Dataset()
+    d.load_documents(
+        sd_filename=dataset_csv_path,
+        anns_filename=dataset_json_path,
+        anns_format="spert",
+        limits=limits,
+        on_error="skip",
+    )
+    assert len(d.documents) == 1
+    assert d.documents[0].fields["text"] == "one three two"
@@ -1,8 +1,12 @@
 import json
 import pytest
 import os
+import sys
 from pathlib import Path
 
+from puggle import LabelMap, Pipeline
+from puggle.inverted_index import InvertedIndex
+
 
 @pytest.mark.parametrize(
     "dataset, drop_class, dataset_after",
@@ -108,3 +112,127 @@ def test_dataset_manip_flatten_all_entities(dataset, dataset_after):
 def test_dataset_manip_flatten_all_relations(dataset, dataset_after):
     dataset.flatten_all_relations()
     assert dataset.to_list() == dataset_after.to_list()
+
+
+@pytest.mark.parametrize(
+    "dataset, dataset_after",
+    [
+        ("empty", "empty"),
+        ("small", "small"),
+        ("medium", "medium"),
+        ("hierarchical", "hierarchical"),
+    ],
+    indirect=["dataset", "dataset_after"],
+)
+@pytest.mark.parametrize("columnar", [False, True])
+@pytest.mark.parametrize("index", [False, True])
+def test_dataset_manip_pipeline(
+    dataset, dataset_after, columnar, index, monkeypatch
+):
+    """Ensure that applying a Pipeline gives the same Dataset and per-step
+    counts as applying its manipulations one after another."""
+    manipulation = sys.modules["puggle.data_utils.manipulation"]
+    logged = []
+    monkeypatch.setattr(
+        manipulation,
+        "_log_step",
+        lambda operation, args, counts: logged.append(
+            {"operation": operation, "args": args, **counts}
+        ),
+    )
+    pipeline = (
+        Pipeline()
+        .convert_entity_class("number/two", "noise")
+        .flatten_all_relations()
+        .drop_relation_class("sounds_like")
+        .convert_entity_class("number", "pingu")
+        .flatten_all_entities()
+        .convert_relation_class("bigger_than", "smaller_than")
+        .drop_entity_class("noise")
+        .convert_entity_class("noise", "number")
+        .drop_entity_class("pingu")
+    )
+    for d in (dataset, dataset_after):
+        if columnar:
+            d.to_columnar()
+        if index:
+            d.build_index()
+
+    for operation, args in pipeline.steps:
+        getattr(dataset, operation)(*args)
+    results = dataset_after.apply_pipeline(pipeline)
+
+    assert dataset_after.to_list() == dataset.to_list()
+    assert results == logged
+    if index:
+        # The index matches one built from scratch
+        rebuilt = InvertedIndex(dataset_after.documents)
+        for kind in ("entities", "relations", "triples"):
+            assert {
+                key: list(dataset_after.index.lookup(kind, key))
+                for key in dataset_after.index.keys(kind)
+            } == {
+                key: list(rebuilt.lookup(kind, key))
+                for key in rebuilt.keys(kind)
+            }
+
+
+def test_label_map():
+    label_map = LabelMap(
+        mapping={"state": "condition", "junk": None},
+        prefixes={"state/": "condition/", "state/un": None},
+        patterns=[(r"(\w+)_(\w+)", r"\2/\1"), (r"tmp.*", None)],
+    )
+    assert label_map("state") == "condition"
+    assert label_map("junk") is None
+    assert label_map("state/desirable") == "condition/desirable"
+    # The longest prefix takes precedence
+    assert label_map("state/undesirable") is None
+    assert label_map("has_part") == "part/has"
+    assert label_map("tmp1") is None
+    # Patterns must match the whole label
+    assert label_map("xtmp") == "xtmp"
+    assert label_map("other") == "other"
+    with pytest.raises(ValueError):
+        LabelMap(patterns={"(": "x"})
+
+
+@pytest.mark.parametrize(
+    "dataset, dataset_after, n_entities",
+    [
+        ("hierarchical", "hierarchical", (2, 1, 0)),
+        ("medium", "medium", (4, 0, 0)),
+    ],
+    indirect=["dataset", "dataset_after"],
+)
+@pytest.mark.parametrize("columnar", [False, True])
+def test_dataset_manip_remap_labels(
+    dataset, dataset_after, n_entities, columnar
+):
+    """Ensure that remapping labels gives the same Dataset as the
+    equivalent conversions and drops."""
+    if columnar:
+        dataset.to_columnar()
+        dataset_after.to_columnar()
+
+    dataset.drop_entity_class("number/one")
+    dataset.convert_entity_class("number/two", "num/two")
+    dataset.convert_entity_class("number/three", "num/three")
+    dataset.convert_entity_class("noise", "sound")
+    dataset.convert_relation_class("bigger_than/by_one", "by_one")
+    dataset.drop_relation_class("sounds_like")
+
+    results = dataset_after.remap_entity_labels(
+        mapping={"number/one": None, "noise": "sound"},
+        prefixes={"number/": "num/"},
+    )
+    dataset_after.remap_relation_labels(
+        patterns={r"\w+/(\w+)": r"\1", "sounds_.*": None}
+    )
+
+    assert dataset_after.to_list() == dataset.to_list()
+    assert (
+        results["entities_modified"],
+        results["entities_removed"],
+        results["relations_removed"],
+    ) == n_entities
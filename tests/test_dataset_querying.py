@@ -0,0 +1,98 @@
+import pytest
+from puggle import Dataset, Document, Annotation
+from puggle.views import DocumentSubset
+
+
+def _make_dataset():
+    d = Dataset()
+    docs = [
+        (
+            {"id": "1", "site": "A"},
+            ["replace", "the", "pump"],
+            [("Activity", 0, 1), ("Item", 2, 3)],
+            [(0, 1, "hasParticipant")],
+        ),
+        (
+            {"id": "2", "site": "B"},
+            ["pump", "is", "leaking"],
+            [("Item", 0, 1), ("State", 2, 3)],
+            [(1, 0, "hasPatient")],
+        ),
+        (
+            {"id": "3", "site": "A"},
+            ["replace", "seal", "on", "the", "pump"],
+            [("Activity", 0, 1), ("Item", 1, 2), ("Item", 4, 5)],
+            [(0, 1, "hasParticipant"), (1, 2, "isPartOf")],
+        ),
+        ({"id": "4", "site": "B"}, None, [], []),
+    ]
+    for fields, tokens, entities, relations in docs:
+        annotation = None
+        if tokens is not None:
+            annotation = Annotation.from_dict(
+                {
+                    "tokens": tokens,
+                    "entities": [
+                        {"start": s, "end": e, "label": label}
+                        for label, s, e in entities
+                    ],
+                    "relations": [
+                        {"start": s, "end": e, "type": t}
+                        for s, e, t in relations
+                    ],
+                }
+            )
+        d.add_document(Document(fields, annotation))
+    return d
+
+
+QUERIES = [
+    ({}, [0, 1, 2, 3]),
+    ({"entities": ["Item"]}, [0, 1, 2]),
+    ({"entities": ["Item", "Activity"]}, [0, 2]),
+    ({"relations": ["isPartOf"]}, [2]),
+    ({"triples": [("Activity", "hasParticipant", "Item")]}, [0, 2]),
+    ({"triples": [("Item", "hasParticipant", "Activity")]}, []),
+    ({"tokens": ["the", "pump"]}, [0, 2]),
+    ({"phrase": ["the", "pump"]}, [0, 2]),
+    ({"phrase": ["replace", "the"]}, [0]),
+    ({"fields": {"site": "A"}}, [0, 2]),
+    ({"fields": {"site": "B"}}, [1, 3]),
+    ({"fields": {"id": lambda v: int(v) > 1}, "entities": ["Item"]}, [1, 2]),
+    ({"min_length": 4}, [2]),
+    ({"max_length": 3}, [0, 1]),
+    ({"predicate": lambda doc: doc.annotation is None}, [3]),
+]
+
+
+@pytest.mark.parametrize("criteria, expected", QUERIES)
+@pytest.mark.parametrize("index", [False, True])
+@pytest.mark.parametrize("columnar", [False, True])
+def test_query(criteria, expected, index, columnar):
+    d = _make_dataset()
+    if columnar:
+        d.to_columnar()
+    if index:
+        d.build_index()
+    assert list(d.query(**criteria)) == expected
+
+
+def test_filter_returns_view():
+    d = _make_dataset()
+    d.build_index()
+    f = d.filter(entities=["Item"], fields={"site": "A"})
+    assert isinstance(f.documents, DocumentSubset)
+    assert [doc.fields["id"] for doc in f.documents] == ["1", "3"]
+    assert f.documents[1] is d.documents[2]
+    assert f.vocab is d.vocab
+
+    # Filtering a view gives a view of the original Documents
+    f2 = f.filter(min_length=4)
+    assert f2.documents.source is d.documents
+    assert list(f2.documents.ids) == [2]
+
+    # Adding a Document to a view copies the list of Documents
+    f.add_document(d.documents[1])
+    assert isinstance(f.documents, list)
+    assert len(f.documents) == 3
+    assert len(d.documents) == 4
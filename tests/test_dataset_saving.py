@@ -3,6 +3,7 @@ import pytest
 import os
 from pathlib import Path
 from puggle import Dataset
+from puggle.utils import open_file
 
 
 @pytest.mark.parametrize(
@@ -38,3 +39,68 @@ def test_dataset_saving_invalid_format(dataset, output_format, tmp_path):
     out_path = tmp_path / "out.json"
     with pytest.raises(ValueError):
         dataset.save_to_file(out_path, output_format=output_format)
+
+
+@pytest.mark.parametrize(
+    "dataset, output_format, anns_format",
+    [
+        ("medium", "spert", "spert"),
+        ("medium", "quickgraph", "quickgraph"),
+        ("quickgraph_multiple_annotators", "quickgraph", "quickgraph"),
+    ],
+    indirect=["dataset"],
+)
+def test_dataset_saving_jsonl(dataset, output_format, anns_format, tmp_path):
+    """Ensure that saving to a .jsonl file writes one document per line, and
+    that the output can be loaded back in unchanged."""
+    out_path = tmp_path / "out.jsonl"
+    json_path = tmp_path / "out.json"
+    dataset.save_to_file(out_path, output_format=output_format)
+    dataset.save_to_file(json_path, output_format=output_format)
+
+    with open(out_path, "r", encoding="utf-8") as f:
+        lines = f.readlines()
+    assert len(lines) == len(dataset.documents)
+    assert [json.loads(line) for line in lines] == json.load(
+        open(json_path, "r", encoding="utf-8")
+    )
+
+    d = Dataset()
+    d.load_documents(anns_filename=str(out_path), anns_format=anns_format)
+    assert d.to_list() == dataset.to_list()
+
+
+@pytest.mark.parametrize(
+    "dataset, filename, output_format",
+    [
+        ("medium", "out.json.gz", "json"),
+        ("medium", "out.jsonl.bz2", "spert"),
+        ("medium", "out.json.xz", "quickgraph"),
+        ("medium", "out.jsonl.gz", "quickgraph"),
+    ],
+    indirect=["dataset"],
+)
+def test_dataset_saving_compressed(dataset, filename, output_format, tmp_path):
+    """Ensure that compressed files are written compressed, and contain the
+    same data as the uncompressed output."""
+    out_path = tmp_path / filename
+    plain_path = tmp_path / filename.rsplit(".", 1)[0]
+    dataset.save_to_file(out_path, output_format=output_format)
+    dataset.save_to_file(plain_path, output_format=output_format)
+
+    assert open(out_path, "rb").read() != open(plain_path, "rb").read()
+    with open_file(out_path) as f:
+        assert f.read() == open(plain_path, "r", encoding="utf-8").read()
+
+    if output_format != "json":
+        d = Dataset()
+        d.load_documents(
+            anns_filename=str(out_path), anns_format=output_format
+        )
+        assert d.to_list() == dataset.to_list()
+
+
+@pytest.mark.parametrize("dataset", ["medium"], indirect=["dataset"])
+def test_dataset_saving_compressed_binary(dataset, tmp_path):
+    with pytest.raises(ValueError):
+        dataset.save_to_file(tmp_path / "out.pgl.gz", output_format="binary")
@@ -1,7 +1,8 @@
 import json
 import pytest
 import os
-from puggle import Dataset
+import sys
+from puggle import Annotation, Dataset, Document
 
 
 @pytest.mark.parametrize(
@@ -51,3 +52,237 @@ def test_dataset_saving(
     assert json.load(open(out_path, "r", encoding="utf-8")) == json.load(
         open(dataset_json_path, "r", encoding="utf-8")
     )
+
+
+def test_document_split_sentences_edge_cases():
+    """Ensure that empty sentences, mentions across sentences and a
+    trailing delimiter are handled in the same way as they always have
+    been."""
+    annotation = Annotation(
+        ["a", "b", ".", "c", ".", ".", "d", "."],
+        [
+            {"start": 0, "end": 2, "label": "X"},
+            # Crosses the first delimiter, so is removed
+            {"start": 1, "end": 3, "label": "Y"},
+            {"start": 3, "end": 4, "label": "X"},
+            # The last sentence includes the trailing delimiter
+            {"start": 6, "end": 8, "label": "Z"},
+            {"start": 6, "end": 7, "label": "W"},
+        ],
+        [
+            {"start": 2, "end": 0, "type": "r"},
+            {"start": 3, "end": 4, "type": "s"},
+        ],
+    )
+    doc = Document({"id": "1"}, annotation)
+    sentences, removed = doc.split_sentences(".")
+
+    assert [s.annotation.tokens for s in sentences] == [
+        ["a", "b"],
+        ["c"],
+        [],
+        ["d"],
+    ]
+    assert [
+        [(m.start, m.end, m.label) for m in s.annotation.mentions]
+        for s in sentences
+    ] == [[(0, 2, "X")], [(0, 1, "X")], [], [(0, 2, "Z"), (0, 1, "W")]]
+    assert [
+        [(r.start.label, r.end.label, r.label) for r in s.annotation.relations]
+        for s in sentences
+    ] == [[], [], [], [("Z", "W", "s")]]
+    assert all(s.fields is doc.fields for s in sentences)
+    assert removed == [annotation.relations[0]]
+
+    empty = Document(None, Annotation([], []))
+    assert empty.split_sentences(".") == ([], [])
+
+
+@pytest.mark.parametrize(
+    "dataset",
+    ["sentence_splitting/sentence_splitting_before_spert_complex", "medium"],
+    indirect=True,
+)
+@pytest.mark.parametrize("columnar", [False, True])
+def test_dataset_split_sentences_parallel(dataset, columnar, monkeypatch):
+    """Ensure that splitting with multiple workers gives the same sentences,
+    in the same order, as splitting in a single process."""
+    monkeypatch.setattr(
+        sys.modules["puggle.Dataset"], "PARALLEL_BATCH_SIZE", 1
+    )
+    if columnar:
+        dataset.to_columnar()
+
+    expected, expected_results = dataset.split_sentences()
+    split, results = dataset.split_sentences(workers=2)
+
+    assert split.to_list() == expected.to_list()
+    assert [d.document_index for d in split.documents] == [
+        d.document_index for d in expected.documents
+    ]
+    assert results == expected_results
+    for d in split.documents:
+        tokens = list(map(split.vocab.string, d.annotation.token_ids))
+        assert tokens == d.annotation.tokens
+
+
+def test_document_split_windows():
+    """Ensure that windows end at sentence boundaries where possible, and
+    keep the mentions and relations that fit within them."""
+    annotation = Annotation(
+        "a b . c d e . f g h i j k l . m".split(),
+        [
+            {"start": 0, "end": 2, "label": "X"},
+            {"start": 3, "end": 5, "label": "Y"},
+            {"start": 8, "end": 12, "label": "Z"},
+            {"start": 15, "end": 16, "label": "W"},
+        ],
+        [
+            {"start": 0, "end": 1, "type": "r"},
+            {"start": 1, "end": 3, "type": "s"},
+        ],
+    )
+    doc = Document({"id": "1"}, annotation)
+
+    windows, removed = doc.split_windows(5)
+    # The third sentence is longer than 5 tokens, so is cut
+    assert [(w.token_offset, w.annotation.tokens) for w in windows] == [
+        (0, ["a", "b", "."]),
+        (3, ["c", "d", "e", "."]),
+        (7, ["f", "g", "h", "i", "j"]),
+        (12, ["k", "l", ".", "m"]),
+    ]
+    assert [
+        [(m.start, m.end, m.label) for m in w.annotation.mentions]
+        for w in windows
+    ] == [[(0, 2, "X")], [(0, 2, "Y")], [(1, 5, "Z")], [(3, 4, "W")]]
+    assert removed == annotation.relations
+    assert all(w.fields is doc.fields for w in windows)
+
+    windows, removed = doc.split_windows(8, overlap=4)
+    assert [(w.token_offset, len(w.annotation.tokens)) for w in windows] == [
+        (0, 7),
+        (3, 8),
+        (7, 8),
+        (15, 1),
+    ]
+    assert [
+        [(r.start.label, r.end.label, r.label) for r in w.annotation.relations]
+        for w in windows
+    ] == [[("X", "Y", "r")], [], [], []]
+    assert removed == [annotation.relations[1]]
+
+    # Any token can end a sentence, via a function
+    windows, _ = doc.split_windows(4, delimiters=lambda t: t in {".", "g"})
+    assert windows[2].annotation.tokens == ["f", "g"]
+
+    windows, removed = doc.split_windows(100, delimiters=None)
+    assert [w.annotation.to_dict() for w in windows] == [
+        annotation.to_dict()
+    ]
+    assert removed == []
+
+    with pytest.raises(ValueError):
+        doc.split_windows(0)
+    with pytest.raises(ValueError):
+        doc.split_windows(4, overlap=4)
+    assert Document(None, Annotation([], [])).split_windows(4) == ([], [])
+
+
+@pytest.mark.parametrize(
+    "dataset",
+    ["sentence_splitting/sentence_splitting_before_spert_complex", "medium"],
+    indirect=True,
+)
+@pytest.mark.parametrize("columnar", [False, True])
+def test_dataset_split_windows(dataset, columnar, tmp_path):
+    """Ensure that each window is a slice of its original document of at
+    most max_tokens tokens, whose mentions are those of the document."""
+    if columnar:
+        dataset.to_columnar()
+
+    split, results = dataset.split_windows(6, overlap=2)
+
+    windowed = set()
+    for w in split.documents:
+        doc = dataset.documents[w.document_index]
+        start = w.token_offset
+        tokens = w.annotation.tokens
+        assert 0 < len(tokens) <= 6
+        assert tokens == doc.annotation.tokens[start : start + len(tokens)]
+        assert list(map(split.vocab.string, w.annotation.token_ids)) == tokens
+        for m in w.annotation.mentions:
+            assert m.tokens == tokens[m.start : m.end]
+        windowed.update(
+            (
+                w.document_index,
+                r.start.start + start,
+                r.end.start + start,
+                r.label,
+            )
+            for r in w.annotation.relations
+        )
+    n_relations = sum(len(d.annotation.relations) for d in dataset.documents)
+    assert results["relations_removed"] == n_relations - len(windowed)
+
+    out_path = tmp_path / "out.json"
+    split.save_to_file(out_path, output_format="spert")
+    with open(out_path, "r", encoding="utf-8") as f:
+        saved = json.load(f)
+    assert [d["token_offset"] for d in saved] == [
+        w.token_offset for w in split.documents
+    ]
+
+
+@pytest.mark.parametrize(
+    "dataset",
+    ["sentence_splitting/sentence_splitting_before_spert_complex", "medium"],
+    indirect=True,
+)
+@pytest.mark.parametrize("columnar", [False, True])
+def test_dataset_merge_sentences(dataset, columnar):
+    """Ensure that merging the sentences of a Dataset (and reattaching the
+    relations removed when splitting it) gives back the original
+    documents."""
+
+    def spans(annotation):
+        mentions = sorted(
+            (m.start, m.end, m.label) for m in annotation.mentions
+        )
+        relations = sorted(
+            ((r.start.start, r.start.end), (r.end.start, r.end.end), r.label)
+            for r in annotation.relations
+        )
+        return mentions, relations
+
+    if columnar:
+        dataset.to_columnar()
+    split, split_results = dataset.split_sentences()
+    merged, results = split.merge_sentences(
+        removed_relations=split_results["removed_relations"]
+    )
+
+    assert results["relations_reattached"] == split_results[
+        "relations_removed"
+    ]
+    assert len(merged.documents) == len(dataset.documents)
+    for original, doc in zip(dataset.documents, merged.documents):
+        tokens = original.annotation.tokens
+        # A delimiter at the very end is not restored
+        if tokens[-1] == ".":
+            tokens = tokens[:-1]
+        assert doc.annotation.tokens == tokens
+        assert spans(doc.annotation) == spans(original.annotation)
+        assert doc.fields == original.fields
+        assert doc.document_index is None
+
+    # Without the removed relations, only those within sentences are kept
+    merged, results = split.merge_sentences()
+    assert results["relations_reattached"] == 0
+    assert sum(len(d.annotation.relations) for d in merged.documents) == sum(
+        len(d.annotation.relations) for d in split.documents
+    )
+
+    # Documents without a document_index are kept as they are
+    merged, _ = dataset.merge_sentences()
+    assert merged.to_list() == dataset.to_list()
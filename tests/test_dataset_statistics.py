@@ -37,3 +37,31 @@ def test_dataset_stats_get_entity_label_counts(dataset, expected):
 )
 def test_dataset_stats_get_entity_label_counts_dl(dataset, expected):
     assert dataset.get_entity_label_counts(document_level=True) == expected
+
+
+@pytest.mark.parametrize(
+    "dataset",
+    ["empty", "medium"],
+    indirect=["dataset"],
+)
+def test_dataset_stats_memory_usage(dataset):
+    usage = dataset.memory_usage()
+    parts = ["documents", "annotations", "mentions", "relations", "strings"]
+    assert usage["total"] == sum(usage[k] for k in parts)
+    if len(dataset.documents) == 0:
+        assert usage["total"] == 0
+        return
+    assert all(usage[k] > 0 for k in parts)
+    assert usage["per_document"] == usage["total"] / len(dataset.documents)
+
+
+@pytest.mark.parametrize("dataset", ["medium"], indirect=["dataset"])
+def test_dataset_objects_have_no_dict(dataset):
+    doc = dataset.documents[0]
+    for obj in [
+        doc,
+        doc.annotation,
+        doc.annotation.mentions[0],
+        doc.annotation.relations[0],
+    ]:
+        assert not hasattr(obj, "__dict__")
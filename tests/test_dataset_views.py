@@ -0,0 +1,72 @@
+import pytest
+from puggle import DatasetView
+
+
+def _labels(dataset):
+    return [
+        [m.label for m in doc.annotation.mentions]
+        for doc in dataset.documents
+    ]
+
+
+@pytest.mark.parametrize("dataset", ["medium"], indirect=["dataset"])
+@pytest.mark.parametrize("columnar", [False, True])
+def test_view_copy_on_write(dataset, columnar):
+    if columnar:
+        dataset.to_columnar()
+    expected = dataset.to_list()
+    a = dataset.view([0])
+    b = dataset.view([1, 0])
+    assert isinstance(a, DatasetView)
+    assert a.vocab is dataset.vocab
+
+    # Changing a view only changes the Documents of that view
+    a.convert_entity_class("number", "pingu")
+    assert _labels(a) == [["pingu"] * 3]
+    assert dataset.to_list() == expected
+    assert b.to_list() == [expected[1], expected[0]]
+
+    # Documents that were not changed are still shared
+    b.drop_entity_class("noise")
+    if not columnar:
+        assert b.documents[1] is dataset.documents[0]
+
+    # Changing the original Dataset does not change its views
+    b.drop_entity_class("number")
+    dataset.drop_entity_class("number")
+    assert _labels(a) == [["pingu"] * 3]
+    assert _labels(b) == [[], []]
+    assert _labels(dataset) == [[], ["noise"] * 4]
+
+
+@pytest.mark.parametrize("dataset", ["medium"], indirect=["dataset"])
+def test_view_of_view(dataset):
+    a = dataset.view([0, 1])
+    a.convert_entity_class("number", "pingu")
+
+    # A view of a view includes the changes made to that view...
+    b = a.filter(entities=["noise"])
+    assert b.documents.source is dataset.documents
+    assert _labels(b) == [["noise"] * 4 + ["pingu"]]
+
+    # ...but neither is affected by changes to the other
+    b.drop_entity_class("pingu")
+    assert _labels(b) == [["noise"] * 4]
+    assert _labels(a)[1] == ["noise"] * 4 + ["pingu"]
+    a.convert_entity_class("noise", "number")
+    assert _labels(b) == [["noise"] * 4]
+    assert _labels(dataset)[1] == ["noise"] * 4 + ["number"]
+
+
+@pytest.mark.parametrize("dataset", ["medium"], indirect=["dataset"])
+def test_snapshot_and_splits(dataset):
+    snapshot = dataset.snapshot()
+    expected = snapshot.to_list()
+    train, dev, test = dataset.random_split()
+    assert len(train.documents) + len(dev.documents) + len(test.documents) == 2
+    for split in [train, dev, test]:
+        split.drop_entity_class("number")
+    dataset.convert_relation_class("bigger_than", "pingu")
+    assert snapshot.to_list() == expected
+    assert not any("number" in labels for labels in _labels(train))
+    assert any("number" in labels for labels in _labels(dataset))
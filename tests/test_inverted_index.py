@@ -0,0 +1,90 @@
+import pytest
+from puggle import Dataset, Document, Annotation
+from puggle.inverted_index import KINDS
+
+DATASETS = ["empty", "small", "medium", "hierarchical", "quickgraph"]
+
+
+def _postings(index):
+    return {
+        kind: {key: list(index.lookup(kind, key)) for key in index.keys(kind)}
+        for kind in KINDS
+    }
+
+
+def _document(tokens, entities, relations):
+    return Document(
+        {},
+        Annotation.from_dict(
+            {"tokens": tokens, "entities": entities, "relations": relations}
+        ),
+    )
+
+
+def test_inverted_index_lookups():
+    d = Dataset()
+    d.add_document(
+        _document(
+            ["pump", "leak"],
+            [
+                {"start": 0, "end": 1, "label": "Item"},
+                {"start": 1, "end": 2, "label": "State"},
+            ],
+            [{"start": 1, "end": 0, "type": "hasPatient"}],
+        )
+    )
+    d.add_document(
+        _document(
+            ["replace", "pump"], [{"start": 1, "end": 2, "label": "Item"}], []
+        )
+    )
+    index = d.build_index()
+    assert list(index.documents_with_token("pump")) == [0, 1]
+    assert list(index.documents_with_token("leak")) == [0]
+    assert list(index.documents_with_entity("Item")) == [0, 1]
+    assert list(index.documents_with_relation("hasPatient")) == [0]
+    triple = ("State", "hasPatient", "Item")
+    assert list(index.documents_with_triple(*triple)) == [0]
+    assert not index.documents_with_triple("Item", "hasPatient", "State")
+    assert list(index.documents_with_entity("missing")) == []
+    with pytest.raises(ValueError):
+        index.lookup("bad kind", "Item")
+
+    # The index is updated as documents are added
+    d.add_document(
+        _document(["leak"], [{"start": 0, "end": 1, "label": "State"}], [])
+    )
+    assert list(index.documents_with_token("leak")) == [0, 2]
+    assert len(index) == 3
+
+
+@pytest.mark.parametrize(
+    "dataset, dataset_after",
+    [(name, name) for name in DATASETS],
+    indirect=["dataset", "dataset_after"],
+)
+@pytest.mark.parametrize(
+    "operation, args",
+    [
+        ("drop_entity_class", ["number"]),
+        ("drop_entity_class", ["Item"]),
+        ("drop_relation_class", ["bigger_than"]),
+        ("convert_entity_class", ["number", "pingu"]),
+        ("convert_relation_class", ["bigger_than", "pingu"]),
+        ("flatten_all_entities", []),
+        ("flatten_all_relations", []),
+    ],
+)
+@pytest.mark.parametrize("columnar", [False, True])
+def test_inverted_index_manipulation(
+    dataset, dataset_after, operation, args, columnar
+):
+    """Test that the index is kept up to date by each manipulation, and that
+    the manipulation gives the same result with an index as without."""
+    if columnar:
+        dataset.to_columnar()
+    dataset.build_index()
+    getattr(dataset, operation)(*args)
+    getattr(dataset_after, operation)(*args)
+    assert dataset.to_list() == dataset_after.to_list()
+    assert _postings(dataset.index) == _postings(dataset_after.build_index())
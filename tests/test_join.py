@@ -0,0 +1,89 @@
+import json
+import pytest
+from puggle import Dataset
+from puggle.join import join_key
+
+
+def _write_files(tmp_path, csv_ids, anns_ids):
+    """Write a CSV with the given ids, and a SPERT annotations file with the
+    given ids, where the only token of each annotation is its id."""
+    csv_path = tmp_path / "docs.csv"
+    with open(csv_path, "w", encoding="utf-8") as f:
+        f.write("id,name\n")
+        for i in csv_ids:
+            f.write(f"{i},doc {i}\n")
+
+    anns_path = tmp_path / "anns.json"
+    with open(anns_path, "w", encoding="utf-8") as f:
+        json.dump(
+            [
+                {"doc_id": i, "tokens": [str(i)], "entities": []}
+                for i in anns_ids
+            ],
+            f,
+        )
+    return str(csv_path), str(anns_path)
+
+
+def _load(csv_path, anns_path, join_method):
+    d = Dataset()
+    d.load_documents(
+        sd_filename=csv_path,
+        anns_filename=anns_path,
+        anns_format="spert",
+        join_on="id",
+        anns_join_key="doc_id",
+        join_method=join_method,
+    )
+    return [
+        (doc.annotation.tokens[0], doc.fields and doc.fields["name"])
+        for doc in d.documents
+    ]
+
+
+@pytest.mark.parametrize(
+    "join_method, csv_ids, anns_ids",
+    [
+        ("hash", [5, 2, 10, 3], [10, 2, 4, 5]),
+        ("merge", [2, 3, 5, 10], [2, 4, 5, 10]),
+    ],
+)
+def test_join(tmp_path, join_method, csv_ids, anns_ids):
+    csv_path, anns_path = _write_files(tmp_path, csv_ids, anns_ids)
+    assert _load(csv_path, anns_path, join_method) == [
+        (str(i), None if i == 4 else f"doc {i}") for i in anns_ids
+    ]
+
+
+@pytest.mark.parametrize(
+    "join_method, csv_ids, anns_ids",
+    [
+        ("hash", [1, 2, 1], [1, 2]),
+        ("merge", [1, 3, 2], [1, 2]),
+        ("merge", [1, 2, 3], [2, 1]),
+        ("merge", [1, 2, 3], [1, 1]),
+    ],
+)
+def test_join_invalid(tmp_path, join_method, csv_ids, anns_ids):
+    csv_path, anns_path = _write_files(tmp_path, csv_ids, anns_ids)
+    with pytest.raises(ValueError):
+        _load(csv_path, anns_path, join_method)
+
+
+def test_join_missing_key(tmp_path):
+    csv_path, anns_path = _write_files(tmp_path, [1], [1])
+    d = Dataset()
+    with pytest.raises(ValueError):
+        d.load_documents(
+            sd_filename=csv_path,
+            anns_filename=anns_path,
+            anns_format="spert",
+            join_on="id",
+        )
+
+
+def test_join_key():
+    assert join_key("12") == join_key(12)
+    assert join_key("2") < join_key("10")
+    assert join_key("012") != join_key(12)
+    assert join_key(5) < join_key("abc")
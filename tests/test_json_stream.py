@@ -0,0 +1,63 @@
+import io
+import json
+import pytest
+from puggle import Dataset
+from puggle.json_stream import JSONStreamReader, iter_json_records
+
+
+@pytest.mark.parametrize("chunk_size", [1, 3, 7, 1 << 16])
+def test_json_stream_reader_iter_array(chunk_size):
+    """Ensure that records are parsed correctly regardless of where the
+    chunk boundaries fall."""
+    records = [
+        {"tokens": ["one", "two"], "n": 12345, "x": 1.5e10},
+        {"tokens": ["été", 'quote"d'], "n": -7, "x": None},
+        [],
+        123456789,
+        True,
+    ]
+    f = io.StringIO(json.dumps(records, indent=2))
+    reader = JSONStreamReader(f, chunk_size=chunk_size)
+    assert list(reader.iter_array()) == records
+
+
+@pytest.mark.parametrize(
+    "text, expected",
+    [
+        ("[]", []),
+        ("{}", []),
+        ('[{"a": 1}, {"a": 2}]', [(None, {"a": 1}), (None, {"a": 2})]),
+        (
+            '{"x": [{"a": 1}], "y": [{"a": 2}, {"a": 3}]}',
+            [("x", {"a": 1}), ("y", {"a": 2}), ("y", {"a": 3})],
+        ),
+    ],
+)
+def test_iter_json_records(text, expected):
+    assert list(iter_json_records(io.StringIO(text))) == expected
+
+
+@pytest.mark.parametrize(
+    "text",
+    ['[{"a": 1},', '[{"a": 1} {"a": 2}]', '"test"', '{"x": 5}', "[] []"],
+)
+def test_iter_json_records_invalid(text):
+    with pytest.raises(ValueError):
+        list(iter_json_records(io.StringIO(text)))
+
+
+@pytest.mark.parametrize(
+    "dataset_json_path",
+    ["medium"],
+    indirect=["dataset_json_path"],
+)
+def test_dataset_iter_documents(dataset_json_path):
+    """Ensure that iter_documents yields the same Documents as
+    load_documents, without adding them to the Dataset."""
+    d = Dataset()
+    docs = d.iter_documents(dataset_json_path, "spert")
+    first = next(docs)
+    assert len(d.documents) == 0
+
+    d.load_documents(anns_filename=dataset_json_path, anns_format="spert")
+    assert [first.to_dict()] + [doc.to_dict() for doc in docs] == d.to_list()
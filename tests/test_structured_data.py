@@ -0,0 +1,76 @@
+import io
+import json
+import pytest
+from datetime import date
+from puggle import Dataset
+from puggle.structured_data import StructuredData
+
+CSV = (
+    "id,name,score,when,code\n"
+    "1,pump,1.5,2020-05-12,007\n"
+    "2,valve,2,2021-01-30,008\n"
+    "3,pump,-3.25,2019-12-01,009\n"
+)
+
+
+def test_structured_data_strings():
+    sd = StructuredData.from_csv(io.StringIO(CSV))
+    assert len(sd) == 3
+    assert sd.fieldnames == ["id", "name", "score", "when", "code"]
+    assert dict(sd.row(0)) == {
+        "id": "1",
+        "name": "pump",
+        "score": "1.5",
+        "when": "2020-05-12",
+        "code": "007",
+    }
+    assert list(sd.column("name")) == ["pump", "valve", "pump"]
+    assert sd.row(0)["name"] is sd.row(2)["name"]
+    with pytest.raises(KeyError):
+        sd.row(0)["missing"]
+
+
+def test_structured_data_infer_types():
+    sd = StructuredData.from_csv(io.StringIO(CSV), infer_types=True)
+    assert list(sd.column("id")) == [1, 2, 3]
+    assert list(sd.column("score")) == [1.5, 2.0, -3.25]
+    assert sd.row(1)["when"] == date(2021, 1, 30)
+    # Values with leading zeros should not be converted to ints
+    assert list(sd.column("code")) == ["007", "008", "009"]
+
+
+def test_structured_data_where():
+    sd = StructuredData.from_csv(io.StringIO(CSV), infer_types=True)
+    assert sd.where("name", lambda v: v == "pump") == [0, 2]
+    assert sd.where("score", lambda v: v > 1) == [0, 1]
+
+
+def test_structured_data_missing_values():
+    sd = StructuredData.from_csv(io.StringIO("a,b\n1,2\n3\n"))
+    assert dict(sd.row(1)) == {"a": "3", "b": None}
+
+
+@pytest.mark.parametrize(
+    "dataset_json_path, dataset_csv_path",
+    [("medium", "medium")],
+    indirect=["dataset_json_path", "dataset_csv_path"],
+)
+def test_dataset_loading_typed_fields(
+    dataset_json_path, dataset_csv_path, tmp_path
+):
+    d = Dataset()
+    d.load_documents(
+        sd_filename=dataset_csv_path,
+        anns_filename=dataset_json_path,
+        anns_format="spert",
+        infer_field_types=True,
+    )
+    fields = d.documents[0].fields
+    assert fields["x"] == 4 and fields["date"] == date(2020, 5, 12)
+
+    # Typed fields should survive being saved in each format
+    json.dumps(d.to_list())
+    d.save_to_file(tmp_path / "out.pgl", output_format="binary")
+    d_binary = Dataset()
+    d_binary.load_binary(tmp_path / "out.pgl")
+    assert dict(d_binary.documents[0].fields) == dict(fields)
@@ -49,3 +49,30 @@ def test_normalise_annotation_format():
     # Spert doc.
     for qg_doc, spert_doc in zip(qg_docs_norm, spert_docs_norm):
         assert qg_doc == spert_doc
+
+
+@pytest.mark.parametrize(
+    "path, anns_format",
+    [("quickgraph_docs.json", "quickgraph"), ("spert_docs.json", "spert")],
+)
+def test_build_annotation(path, anns_format):
+    """Test that build_annotation gives the same Annotations as normalising
+    the documents and then calling Annotation.from_dict, and does not
+    modify the documents."""
+    docs = _load_from_json_file(path)
+    expected = [
+        Annotation.from_dict(normalise_annotation_format(doc, anns_format))
+        for doc in _load_from_json_file(path)
+    ]
+
+    for doc, expected_ann in zip(docs, expected):
+        ann = build_annotation(doc, anns_format)
+        assert ann.to_dict() == expected_ann.to_dict()
+        assert [str(m) for m in ann.mentions] == [
+            str(m) for m in expected_ann.mentions
+        ]
+        assert [str(r) for r in ann.relations] == [
+            str(r) for r in expected_ann.relations
+        ]
+
+    assert docs == _load_from_json_file(path)
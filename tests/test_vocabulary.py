@@ -0,0 +1,82 @@
+import pytest
+from puggle import Dataset
+from puggle.vocabulary import Vocabulary
+
+
+def test_vocabulary_ids():
+    v = Vocabulary(["pump", "seal"])
+    assert v.add("pump") == 0
+    assert v.add("motor") == 2
+    assert v.id("seal") == 1
+    assert v.id("missing") is None
+    assert v.string(2) == "motor"
+    assert "motor" in v and "missing" not in v
+    assert list(v) == ["pump", "seal", "motor"]
+    assert len(v) == 3
+
+
+def test_vocabulary_intern():
+    v = Vocabulary()
+    a = "".join(["pu", "mp"])
+    b = "".join(["pum", "p"])
+    assert a is not b
+    assert v.intern(a) is v.intern(b)
+
+
+@pytest.mark.parametrize("dataset", ["medium"], indirect=["dataset"])
+def test_dataset_interns_documents(dataset):
+    vocab = dataset.vocab
+    seen_tokens = {}
+    for doc in dataset.documents:
+        a = doc.annotation
+        assert [vocab.string(i) for i in a.token_ids] == a.tokens
+        for t in a.tokens:
+            assert seen_tokens.setdefault(t, t) is t
+        for m in a.mentions:
+            assert vocab.string(m.label_id) == m.label
+            assert m.label is vocab.string(m.label_id)
+        for r in a.relations:
+            assert vocab.string(r.label_id) == r.label
+
+
+@pytest.mark.parametrize("dataset", ["medium"], indirect=["dataset"])
+def test_vocabulary_ids_cleared_on_change(dataset):
+    a = dataset.documents[0].annotation
+    m = a.mentions[0]
+    m.label = "other"
+    assert m.label_id is None
+    a.tokens = list(a.tokens)
+    assert a.token_ids is None
+
+
+@pytest.mark.parametrize("dataset", ["medium"], indirect=["dataset"])
+def test_vocabulary_after_convert_entity_class(dataset):
+    dataset.convert_entity_class("number", "digit")
+    digit_id = dataset.vocab.id("digit")
+    labels = [
+        (m.label, m.label_id)
+        for doc in dataset.documents
+        for m in doc.annotation.mentions
+    ]
+    assert ("digit", digit_id) in labels
+    assert all(
+        label_id == dataset.vocab.id(label) for label, label_id in labels
+    )
+
+
+@pytest.mark.parametrize("dataset", ["medium"], indirect=["dataset"])
+def test_vocabulary_shared_with_samples(dataset):
+    sample = dataset.random_sample(1)
+    assert sample.vocab is dataset.vocab
+
+
+@pytest.mark.parametrize("dataset", ["medium"], indirect=["dataset"])
+def test_vocabulary_lazy_documents(dataset, tmp_path):
+    out_path = tmp_path / "out.pgl"
+    dataset.save_to_file(out_path, output_format="binary")
+
+    d = Dataset()
+    d.load_binary(out_path)
+    assert len(d.vocab) == 0
+    a = d.documents[0].annotation
+    assert [d.vocab.string(i) for i in a.token_ids] == a.tokens